@@ -11,7 +11,10 @@ export const Thumbnail = (props: ThumbnailProps) => {
 
   useEffect(() => {
     const fetchThumbnail = async () => {
-      const url = `${import.meta.env.VITE_API_URL}${props.mediaUrl}?thumbnail=true`
+      // The API links the thumbnail size it signed, older responses link none
+      const mediaUrl = new URL(`${import.meta.env.VITE_API_URL}${props.mediaUrl}`, window.location.origin);
+      if (!mediaUrl.searchParams.has("thumbnail")) mediaUrl.searchParams.set("thumbnail", "256");
+      const url = mediaUrl.toString();
       try {
         const response = await fetch(url, {
           credentials: 'include',
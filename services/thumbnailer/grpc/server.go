@@ -5,27 +5,36 @@ import (
 	"context"
 	"image/png"
 	"io"
+	"os"
+	"runtime"
+	"sync"
 
 	thumbnailer "github.com/bakape/thumbnailer/v2"
 )
 
+const (
+	defaultWidth  = 400
+	defaultHeight = 200
+)
+
 type Server struct {
 	UnimplementedThumbnailServiceServer
 }
 
-func (s *Server) GenerateThumbnail(ctx context.Context, req *ThumbnailRequest) (*ThumbnailResponse, error) {
-
+func generateThumbnail(source io.ReadSeeker, options *ThumbnailOptions) ([]byte, error) {
 	opts := thumbnailer.Options{
 		ThumbDims: thumbnailer.Dims{
-			Width:  400,
-			Height: 200,
+			Width:  defaultWidth,
+			Height: defaultHeight,
 		},
 	}
 
-	reader := bytes.NewReader(req.Content)
-	var readSeeker io.ReadSeeker = reader
+	if options.GetWidth() > 0 && options.GetHeight() > 0 {
+		opts.ThumbDims.Width = uint(options.GetWidth())
+		opts.ThumbDims.Height = uint(options.GetHeight())
+	}
 
-	_, thumbnail, err := thumbnailer.Process(readSeeker, opts)
+	_, thumbnail, err := thumbnailer.Process(source, opts)
 
 	if err != nil {
 		return nil, err
@@ -38,7 +47,106 @@ func (s *Server) GenerateThumbnail(ctx context.Context, req *ThumbnailRequest) (
 		return nil, err
 	}
 
+	return buff.Bytes(), nil
+}
+
+func (s *Server) GenerateThumbnail(ctx context.Context, req *ThumbnailRequest) (*ThumbnailResponse, error) {
+
+	reader := bytes.NewReader(req.Content)
+	var readSeeker io.ReadSeeker = reader
+
+	thumbnail, err := generateThumbnail(readSeeker, nil)
+
+	if err != nil {
+		return nil, err
+	}
+
 	return &ThumbnailResponse{
-		Thumbnail: buff.Bytes(),
+		Thumbnail: thumbnail,
+	}, nil
+}
+
+// GenerateThumbnailStream receives the source in chunks and spools it to a
+// temporary file, as the thumbnailer needs to seek in it, so large sources are
+// never held in memory.
+func (s *Server) GenerateThumbnailStream(stream ThumbnailService_GenerateThumbnailStreamServer) error {
+	source, err := os.CreateTemp("", "thumbnailer-*")
+	if err != nil {
+		return err
+	}
+	defer os.Remove(source.Name())
+	defer source.Close()
+
+	var options *ThumbnailOptions
+
+	for {
+		chunk, err := stream.Recv()
+		if err == io.EOF {
+			break
+		}
+		if err != nil {
+			return err
+		}
+
+		if options == nil {
+			options = chunk.GetOptions()
+		}
+
+		if _, err := source.Write(chunk.GetContent()); err != nil {
+			return err
+		}
+	}
+
+	if _, err := source.Seek(0, io.SeekStart); err != nil {
+		return err
+	}
+
+	thumbnail, err := generateThumbnail(source, options)
+
+	if err != nil {
+		return err
+	}
+
+	return stream.SendAndClose(&ThumbnailResponse{
+		Thumbnail: thumbnail,
+	})
+}
+
+// GenerateThumbnails generates the thumbnails of many small sources at once,
+// using up to one goroutine per CPU. Items that fail carry the error in their
+// result instead of failing the whole batch.
+func (s *Server) GenerateThumbnails(ctx context.Context, req *BatchThumbnailRequest) (*BatchThumbnailResponse, error) {
+	items := req.GetItems()
+	results := make([]*ThumbnailResult, len(items))
+
+	var wg sync.WaitGroup
+	semaphore := make(chan struct{}, runtime.NumCPU())
+
+	for i, item := range items {
+		wg.Add(1)
+		semaphore <- struct{}{}
+
+		go func(i int, item *ThumbnailItem) {
+			defer wg.Done()
+			defer func() { <-semaphore }()
+
+			result := &ThumbnailResult{Id: item.GetId()}
+
+			if err := ctx.Err(); err != nil {
+				result.Error = err.Error()
+			} else if thumbnail, err := generateThumbnail(bytes.NewReader(item.GetContent()), req.GetOptions()); err != nil {
+				result.Error = err.Error()
+			} else {
+				result.Thumbnail = thumbnail
+			}
+
+			results[i] = result
+		}(i, item)
+	}
+
+	wg.Wait()
+
+	return &BatchThumbnailResponse{
+		Results: results,
 	}, nil
 }
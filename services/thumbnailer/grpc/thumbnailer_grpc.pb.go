@@ -23,6 +23,8 @@ const _ = grpc.SupportPackageIsVersion7
 // For semantics around ctx use and closing/ending streaming RPCs, please refer to https://pkg.go.dev/google.golang.org/grpc/?tab=doc#ClientConn.NewStream.
 type ThumbnailServiceClient interface {
 	GenerateThumbnail(ctx context.Context, in *ThumbnailRequest, opts ...grpc.CallOption) (*ThumbnailResponse, error)
+	GenerateThumbnailStream(ctx context.Context, opts ...grpc.CallOption) (ThumbnailService_GenerateThumbnailStreamClient, error)
+	GenerateThumbnails(ctx context.Context, in *BatchThumbnailRequest, opts ...grpc.CallOption) (*BatchThumbnailResponse, error)
 }
 
 type thumbnailServiceClient struct {
@@ -42,11 +44,56 @@ func (c *thumbnailServiceClient) GenerateThumbnail(ctx context.Context, in *Thum
 	return out, nil
 }
 
+func (c *thumbnailServiceClient) GenerateThumbnailStream(ctx context.Context, opts ...grpc.CallOption) (ThumbnailService_GenerateThumbnailStreamClient, error) {
+	stream, err := c.cc.NewStream(ctx, &ThumbnailService_ServiceDesc.Streams[0], "/thumbnailer.ThumbnailService/GenerateThumbnailStream", opts...)
+	if err != nil {
+		return nil, err
+	}
+	x := &thumbnailServiceGenerateThumbnailStreamClient{stream}
+	return x, nil
+}
+
+type ThumbnailService_GenerateThumbnailStreamClient interface {
+	Send(*ThumbnailChunk) error
+	CloseAndRecv() (*ThumbnailResponse, error)
+	grpc.ClientStream
+}
+
+type thumbnailServiceGenerateThumbnailStreamClient struct {
+	grpc.ClientStream
+}
+
+func (x *thumbnailServiceGenerateThumbnailStreamClient) Send(m *ThumbnailChunk) error {
+	return x.ClientStream.SendMsg(m)
+}
+
+func (x *thumbnailServiceGenerateThumbnailStreamClient) CloseAndRecv() (*ThumbnailResponse, error) {
+	if err := x.ClientStream.CloseSend(); err != nil {
+		return nil, err
+	}
+	m := new(ThumbnailResponse)
+	if err := x.ClientStream.RecvMsg(m); err != nil {
+		return nil, err
+	}
+	return m, nil
+}
+
+func (c *thumbnailServiceClient) GenerateThumbnails(ctx context.Context, in *BatchThumbnailRequest, opts ...grpc.CallOption) (*BatchThumbnailResponse, error) {
+	out := new(BatchThumbnailResponse)
+	err := c.cc.Invoke(ctx, "/thumbnailer.ThumbnailService/GenerateThumbnails", in, out, opts...)
+	if err != nil {
+		return nil, err
+	}
+	return out, nil
+}
+
 // ThumbnailServiceServer is the server API for ThumbnailService service.
 // All implementations must embed UnimplementedThumbnailServiceServer
 // for forward compatibility
 type ThumbnailServiceServer interface {
 	GenerateThumbnail(context.Context, *ThumbnailRequest) (*ThumbnailResponse, error)
+	GenerateThumbnailStream(ThumbnailService_GenerateThumbnailStreamServer) error
+	GenerateThumbnails(context.Context, *BatchThumbnailRequest) (*BatchThumbnailResponse, error)
 	mustEmbedUnimplementedThumbnailServiceServer()
 }
 
@@ -57,6 +104,12 @@ type UnimplementedThumbnailServiceServer struct {
 func (UnimplementedThumbnailServiceServer) GenerateThumbnail(context.Context, *ThumbnailRequest) (*ThumbnailResponse, error) {
 	return nil, status.Errorf(codes.Unimplemented, "method GenerateThumbnail not implemented")
 }
+func (UnimplementedThumbnailServiceServer) GenerateThumbnailStream(ThumbnailService_GenerateThumbnailStreamServer) error {
+	return status.Errorf(codes.Unimplemented, "method GenerateThumbnailStream not implemented")
+}
+func (UnimplementedThumbnailServiceServer) GenerateThumbnails(context.Context, *BatchThumbnailRequest) (*BatchThumbnailResponse, error) {
+	return nil, status.Errorf(codes.Unimplemented, "method GenerateThumbnails not implemented")
+}
 func (UnimplementedThumbnailServiceServer) mustEmbedUnimplementedThumbnailServiceServer() {}
 
 // UnsafeThumbnailServiceServer may be embedded to opt out of forward compatibility for this service.
@@ -88,6 +141,50 @@ func _ThumbnailService_GenerateThumbnail_Handler(srv interface{}, ctx context.Co
 	return interceptor(ctx, in, info, handler)
 }
 
+func _ThumbnailService_GenerateThumbnailStream_Handler(srv interface{}, stream grpc.ServerStream) error {
+	return srv.(ThumbnailServiceServer).GenerateThumbnailStream(&thumbnailServiceGenerateThumbnailStreamServer{stream})
+}
+
+type ThumbnailService_GenerateThumbnailStreamServer interface {
+	SendAndClose(*ThumbnailResponse) error
+	Recv() (*ThumbnailChunk, error)
+	grpc.ServerStream
+}
+
+type thumbnailServiceGenerateThumbnailStreamServer struct {
+	grpc.ServerStream
+}
+
+func (x *thumbnailServiceGenerateThumbnailStreamServer) SendAndClose(m *ThumbnailResponse) error {
+	return x.ServerStream.SendMsg(m)
+}
+
+func (x *thumbnailServiceGenerateThumbnailStreamServer) Recv() (*ThumbnailChunk, error) {
+	m := new(ThumbnailChunk)
+	if err := x.ServerStream.RecvMsg(m); err != nil {
+		return nil, err
+	}
+	return m, nil
+}
+
+func _ThumbnailService_GenerateThumbnails_Handler(srv interface{}, ctx context.Context, dec func(interface{}) error, interceptor grpc.UnaryServerInterceptor) (interface{}, error) {
+	in := new(BatchThumbnailRequest)
+	if err := dec(in); err != nil {
+		return nil, err
+	}
+	if interceptor == nil {
+		return srv.(ThumbnailServiceServer).GenerateThumbnails(ctx, in)
+	}
+	info := &grpc.UnaryServerInfo{
+		Server:     srv,
+		FullMethod: "/thumbnailer.ThumbnailService/GenerateThumbnails",
+	}
+	handler := func(ctx context.Context, req interface{}) (interface{}, error) {
+		return srv.(ThumbnailServiceServer).GenerateThumbnails(ctx, req.(*BatchThumbnailRequest))
+	}
+	return interceptor(ctx, in, info, handler)
+}
+
 // ThumbnailService_ServiceDesc is the grpc.ServiceDesc for ThumbnailService service.
 // It's only intended for direct use with grpc.RegisterService,
 // and not to be introspected or modified (even as a copy)
@@ -99,7 +196,17 @@ var ThumbnailService_ServiceDesc = grpc.ServiceDesc{
 			MethodName: "GenerateThumbnail",
 			Handler:    _ThumbnailService_GenerateThumbnail_Handler,
 		},
+		{
+			MethodName: "GenerateThumbnails",
+			Handler:    _ThumbnailService_GenerateThumbnails_Handler,
+		},
+	},
+	Streams: []grpc.StreamDesc{
+		{
+			StreamName:    "GenerateThumbnailStream",
+			Handler:       _ThumbnailService_GenerateThumbnailStream_Handler,
+			ClientStreams: true,
+		},
 	},
-	Streams:  []grpc.StreamDesc{},
 	Metadata: "thumbnailer.proto",
 }
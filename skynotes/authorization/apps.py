@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class AuthorizationConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "authorization"
+
+    def ready(self) -> None:
+        import authorization.signals  # noqa: F401
+        from authorization.cache import evict_local_user
+        from common.bus import bus
+
+        bus.register_listener("user:changed", evict_local_user)
+        return super().ready()
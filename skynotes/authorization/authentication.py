@@ -1,5 +1,22 @@
+from authorization.cache import build_user, get_user
 from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.utils.translation import gettext_lazy as _
 from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+User = get_user_model()
+
+
+def add_user_claims(token, user):
+    """
+    Add the `AUTH_USER_TOKEN_CLAIMS` fields of the user to the token, copied to the
+    access tokens it issues.
+    """
+    for field in settings.AUTH_USER_TOKEN_CLAIMS:
+        token[field] = getattr(user, field)
+    return token
 
 
 class JWTCookiesAuthentication(JWTAuthentication):
@@ -15,3 +32,30 @@ class JWTCookiesAuthentication(JWTAuthentication):
 
         validated_token = self.get_validated_token(raw_token)
         return self.get_user(validated_token), validated_token
+
+    def get_user(self, validated_token):
+        """
+        Get the user of the token from its trusted claims, see
+        `AUTH_USER_TOKEN_CLAIMS`, or from the user cache.
+
+        Users built from claims are not checked for being active, the fields not
+        in the claims are loaded from the database when accessed.
+        """
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        claims = settings.AUTH_USER_TOKEN_CLAIMS
+        if claims and all(claim in validated_token for claim in claims):
+            fields = {claim: validated_token[claim] for claim in claims}
+            return build_user({"id": User._meta.pk.to_python(user_id), **fields})
+
+        user = get_user(user_id)
+        if user is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        return user
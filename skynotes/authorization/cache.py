@@ -0,0 +1,138 @@
+import threading
+import time
+from collections import OrderedDict
+
+from common.bus import bus
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+User = get_user_model()
+
+USER_KEY = "auth:user:{}"
+
+# Fields needed to authenticate requests, check permissions and describe the user,
+# the others are deferred and loaded from the database when accessed. That is
+# `storage_used`, which is updated in place without invalidating the cache
+USER_FIELDS = (
+    "id",
+    "email",
+    "is_active",
+    "is_staff",
+    "is_superuser",
+    "created_at",
+    "storage_limit",
+)
+
+# Cached in place of missing rows, so tokens of deleted users do not hit the database
+MISSING = {}
+
+
+class LocalCache:
+    """
+    Thread-safe LRU cache of the process, whose entries expire after `timeout`
+    seconds.
+    """
+
+    def __init__(self, size: int, timeout: int):
+        self.size = size
+        self.timeout = timeout
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+
+            expires, value = entry
+            if expires < time.monotonic():
+                del self.entries[key]
+                return None
+
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.timeout, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+local_cache = LocalCache(
+    settings.AUTH_USER_LOCAL_CACHE_SIZE, settings.AUTH_USER_LOCAL_CACHE_TIMEOUT
+)
+
+
+def build_user(fields: dict):
+    """
+    Build a user instance from some of its fields, the others are deferred.
+
+    Parameters:
+        fields (dict): The values of the fields, by attribute name.
+
+    Returns:
+        User: The user.
+    """
+    values = [
+        fields[field.attname]
+        for field in User._meta.concrete_fields
+        if field.attname in fields
+    ]
+    return User.from_db(DEFAULT_DB_ALIAS, list(fields), values)
+
+
+def get_user(user_id: str):
+    """
+    Get the user authenticating with a token, from the cache of the process, then
+    from Redis, then from the database.
+
+    Parameters:
+        user_id (str): The ID of the user.
+
+    Returns:
+        User | None: The user, with the fields other than `USER_FIELDS` deferred,
+        or None if the user does not exist.
+    """
+    user_id = str(user_id)
+    fields = local_cache.get(user_id)
+
+    if fields is None:
+        key = USER_KEY.format(user_id)
+        fields = cache.get(key)
+
+        if fields is None:
+            fields = (
+                User.objects.filter(id=user_id).values(*USER_FIELDS).first() or MISSING
+            )
+            cache.set(key, fields, settings.AUTH_USER_CACHE_TIMEOUT)
+
+        local_cache.set(user_id, fields)
+
+    return build_user(fields) if fields else None
+
+
+def invalidate_user(*user_ids):
+    """
+    Remove the users from the caches of Redis and, through the `user:changed` event,
+    of the processes.
+    """
+    cache.delete_many([USER_KEY.format(user_id) for user_id in user_ids])
+    for user_id in user_ids:
+        bus.emit("user:changed", str(user_id))
+
+
+def evict_local_user(user_id: str):
+    local_cache.delete(str(user_id))
@@ -0,0 +1,36 @@
+# Generated by Django 5.0 on 2026-10-18 09:46
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def calculate_storage_used(apps, schema_editor):
+    User = apps.get_model("authorization", "User")
+    File = apps.get_model("storage", "File")
+    UploadSession = apps.get_model("storage", "UploadSession")
+
+    def get_size_sum(queryset):
+        sizes = queryset.filter(owner=models.OuterRef("pk")).order_by()
+        sizes = sizes.values("owner").annotate(total=models.Sum("size"))
+        return Coalesce(models.Subquery(sizes.values("total")), 0)
+
+    User.objects.update(
+        storage_used=get_size_sum(File.objects)
+        + get_size_sum(UploadSession.objects.filter(status="pending"))
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("authorization", "0002_alter_user_groups"),
+        ("storage", "0002_upload_session"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="user",
+            name="storage_used",
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.RunPython(calculate_storage_used, migrations.RunPython.noop),
+    ]
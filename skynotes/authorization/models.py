@@ -42,6 +42,7 @@ class User(AbstractBaseUser, PermissionsMixin):
     is_superuser = models.BooleanField(default=False)
 
     storage_limit = models.BigIntegerField(default=DEFAULT_STORAGE_LIMIT)  # 5 GB
+    storage_used = models.BigIntegerField(default=0)  # in bytes, incl. reservations
 
     objects = UserManager()
 
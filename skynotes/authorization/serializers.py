@@ -1,12 +1,11 @@
+from authorization.authentication import add_user_claims
 from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError
-from django.db import models
 from rest_framework import serializers, status
 from rest_framework_simplejwt.exceptions import AuthenticationFailed
 from rest_framework_simplejwt.serializers import TokenObtainSerializer
 from rest_framework_simplejwt.tokens import RefreshToken, UntypedToken
-from storage.models import File
 
 User = get_user_model()
 
@@ -19,7 +18,6 @@ class InActiveUser(AuthenticationFailed):
 
 class UserSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, required=True)
-    storage_used = serializers.SerializerMethodField()
 
     class Meta:
         model = User
@@ -42,9 +40,6 @@ class UserSerializer(serializers.ModelSerializer):
             "is_staff",
         )
 
-    def get_storage_used(self, obj):
-        return File.objects.filter(owner=obj).aggregate(models.Sum("size"))["size__sum"]
-
     def validate(self, data):
         password = data.get("password")
 
@@ -76,7 +71,7 @@ class CustomTokenObtainPairSerializer(TokenObtainSerializer):
 
     @classmethod
     def get_token(cls, user):
-        return RefreshToken.for_user(user)
+        return add_user_claims(RefreshToken.for_user(user), user)
 
     def validate(self, attrs):
         data = super().validate(attrs)
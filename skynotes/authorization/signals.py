@@ -0,0 +1,15 @@
+from functools import partial
+
+from authorization.cache import invalidate_user
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+User = get_user_model()
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_user_cache(sender, instance: User, **kwargs):
+    # Once committed, so concurrent requests do not cache the previous row again
+    transaction.on_commit(partial(invalidate_user, instance.id))
@@ -0,0 +1,82 @@
+from authorization.authentication import JWTCookiesAuthentication
+from authorization.cache import local_cache
+from authorization.serializers import CustomTokenObtainPairSerializer
+from authorization.tests.common import force_authenticate
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import RefreshToken
+
+User = get_user_model()
+
+
+class UserCacheTests(APITestCase):
+    def setUp(self):
+        local_cache.clear()
+        self.user = User.objects.create_user(email="test@test.com", password="password")
+        self.token = RefreshToken.for_user(self.user).access_token
+        self.authentication = JWTCookiesAuthentication()
+
+    def test_user_cached(self):
+        with self.assertNumQueries(1):
+            self.authentication.get_user(self.token)
+
+        local_cache.clear()
+        with self.assertNumQueries(0):
+            user = self.authentication.get_user(self.token)
+
+        self.assertEqual(user.id, self.user.id)
+        self.assertEqual(user.email, self.user.email)
+
+    def test_deferred_fields_loaded(self):
+        User.objects.filter(id=self.user.id).update(storage_used=100)
+        self.authentication.get_user(self.token)
+        force_authenticate(self.user, client=self.client)
+
+        response = self.client.get(reverse("user-me"))
+
+        self.assertEqual(response.data["storage_used"], 100)
+
+    def test_me_queries(self):
+        force_authenticate(self.user, client=self.client)
+        self.client.get(reverse("user-me"))
+
+        # Only the fields updated in place, e.g. `storage_used`, are loaded
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("user-me"))
+
+        self.assertEqual(response.data["email"], self.user.email)
+
+    def test_invalidated_on_change(self):
+        self.authentication.get_user(self.token)
+
+        self.user.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+
+        with self.assertRaises(AuthenticationFailed):
+            self.authentication.get_user(self.token)
+
+    def test_invalidated_on_delete(self):
+        self.authentication.get_user(self.token)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.delete()
+
+        with self.assertRaises(AuthenticationFailed):
+            self.authentication.get_user(self.token)
+
+    @override_settings(AUTH_USER_TOKEN_CLAIMS=["is_staff"])
+    def test_trusted_claims(self):
+        refresh = CustomTokenObtainPairSerializer.get_token(self.user)
+
+        with self.assertNumQueries(0):
+            user = self.authentication.get_user(refresh.access_token)
+            self.assertFalse(user.is_staff)
+
+        self.assertEqual(user.id, self.user.id)
+        # Claims missing from tokens issued before are looked up
+        with self.assertNumQueries(1):
+            self.authentication.get_user(self.token)
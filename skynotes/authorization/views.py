@@ -36,7 +36,11 @@ class UserMeView(RetrieveAPIView):
     permission_classes = [IsAuthenticated]
 
     def get_object(self):
-        return self.request.user
+        user = self.request.user
+        # Cached users have some fields deferred, loaded at once instead of one by one
+        if deferred := user.get_deferred_fields():
+            user.refresh_from_db(fields=deferred)
+        return user
 
 
 # Cookie JWT
@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+
+
+class CommonConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "common"
+
+    def ready(self) -> None:
+        from common.bus import bus
+
+        bus.transport.start()
+        return super().ready()
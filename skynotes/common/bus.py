@@ -1,11 +1,242 @@
-from typing import Callable
+import asyncio
+import inspect
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from fnmatch import fnmatchcase
+from functools import partial
+from typing import Callable, NamedTuple
 
+from asgiref.sync import async_to_sync
+from common.models import OutboxEvent
 from common.singleton import SingletonMeta
+from common.transport import RedisTransport
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import F
+
+logger = logging.getLogger(__name__)
+
+
+class Invocation(NamedTuple):
+    event_type: str
+    listener: Callable  # the registered listener, counters are kept by it
+    func: Callable  # the listener itself, or its `batch`
+    args: tuple
+    kwargs: dict
+
+
+def get_listener_name(listener: Callable) -> str:
+    module = getattr(listener, "__module__", None)
+    name = getattr(listener, "__qualname__", None) or repr(listener)
+    return f"{module}.{name}" if module else name
+
+
+class ListenerStats:
+    """
+    Counters of the dispatched events and the listener calls by event type, with
+    their latencies in seconds.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._events = {}
+
+    def _get_counters(self, event_type: str, listener: Callable = None) -> dict:
+        event = self._events.setdefault(
+            event_type,
+            {"events": 0, "total_time": 0.0, "max_time": 0.0, "listeners": {}},
+        )
+        if listener is None:
+            return event
+
+        return event["listeners"].setdefault(
+            get_listener_name(listener),
+            {
+                "calls": 0,
+                "errors": 0,
+                "timeouts": 0,
+                "total_time": 0.0,
+                "max_time": 0.0,
+            },
+        )
+
+    def record_event(self, event_type: str, duration: float, events: int = 1):
+        with self._lock:
+            counters = self._get_counters(event_type)
+            counters["events"] += events
+            counters["total_time"] += duration
+            counters["max_time"] = max(counters["max_time"], duration)
+
+    def record_call(self, invocation: Invocation, duration: float, error=None):
+        with self._lock:
+            counters = self._get_counters(invocation.event_type, invocation.listener)
+            counters["calls"] += 1
+            counters["errors"] += error is not None
+            counters["total_time"] += duration
+            counters["max_time"] = max(counters["max_time"], duration)
+
+    def record_timeout(self, invocation: Invocation):
+        with self._lock:
+            self._get_counters(invocation.event_type, invocation.listener)[
+                "timeouts"
+            ] += 1
+
+    def get(self) -> dict:
+        with self._lock:
+            return {
+                event_type: {
+                    **counters,
+                    "listeners": {
+                        name: dict(listener_counters)
+                        for name, listener_counters in counters["listeners"].items()
+                    },
+                }
+                for event_type, counters in self._events.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._events = {}
+
+
+class InlineDispatcher:
+    """
+    Calls the listeners one after another in the emitting thread. Timeouts cannot
+    be enforced, slow calls only show in the counters.
+    """
+
+    def run(self, bus, invocations: list) -> list:
+        return [bus.invoke(invocation) for invocation in invocations]
+
+
+class ThreadPoolDispatcher:
+    """
+    Calls the listeners concurrently in a thread pool and waits for them up to
+    `EVENT_BUS_LISTENER_TIMEOUT`. Listeners that time out keep running in the pool.
+    """
+
+    def __init__(self):
+        self.executor = ThreadPoolExecutor(
+            settings.EVENT_BUS_MAX_WORKERS, thread_name_prefix="event-bus"
+        )
+
+    def run(self, bus, invocations: list) -> list:
+        futures = [
+            self.executor.submit(self._invoke, bus, invocation)
+            for invocation in invocations
+        ]
+        deadline = time.monotonic() + settings.EVENT_BUS_LISTENER_TIMEOUT
+
+        errors = []
+        for invocation, future in zip(invocations, futures):
+            try:
+                errors.append(future.result(max(0, deadline - time.monotonic())))
+            except TimeoutError:
+                bus.stats.record_timeout(invocation)
+                errors.append(TimeoutError(f"{invocation.func!r} timed out"))
+        return errors
+
+    @staticmethod
+    def _invoke(bus, invocation: Invocation):
+        try:
+            return bus.invoke(invocation)
+        finally:
+            # Connections are per thread, and pool threads are never recycled
+            connections.close_all()
+
+
+class AsyncioDispatcher:
+    """
+    Calls the listeners concurrently on an event loop, coroutine listeners natively
+    and others in a thread pool, each cancelled (or, in threads, abandoned) after
+    `EVENT_BUS_LISTENER_TIMEOUT`.
+
+    Events emitted from a running loop do not block it, their listeners are
+    scheduled on it instead and reported as successful.
+    """
+
+    def __init__(self):
+        self.executor = ThreadPoolExecutor(
+            settings.EVENT_BUS_MAX_WORKERS, thread_name_prefix="event-bus"
+        )
+        self.tasks = set()
+
+    def run(self, bus, invocations: list) -> list:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self._run(bus, invocations))
+
+        task = loop.create_task(self._run(bus, invocations))
+        # The loop only keeps weak references to its tasks
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+        return []
+
+    async def _run(self, bus, invocations: list) -> list:
+        return await asyncio.gather(
+            *(self._invoke(bus, invocation) for invocation in invocations)
+        )
+
+    async def _invoke(self, bus, invocation: Invocation):
+        if inspect.iscoroutinefunction(invocation.func):
+            call = bus.ainvoke(invocation)
+        else:
+            call = asyncio.get_running_loop().run_in_executor(
+                self.executor,
+                partial(ThreadPoolDispatcher._invoke, bus, invocation),
+            )
+
+        try:
+            return await asyncio.wait_for(call, settings.EVENT_BUS_LISTENER_TIMEOUT)
+        except TimeoutError:
+            bus.stats.record_timeout(invocation)
+            return TimeoutError(f"{invocation.func!r} timed out")
+
+
+DISPATCHERS = {
+    "inline": InlineDispatcher,
+    "thread": ThreadPoolDispatcher,
+    "asyncio": AsyncioDispatcher,
+}
 
 
 class EventBus(metaclass=SingletonMeta):
+    """
+    Dispatches emitted events to the listeners registered for them, with the
+    strategy of `EVENT_BUS_DISPATCH`. A listener raising is logged and does not
+    affect the other listeners nor the emitter.
+
+    Events emitted in a transaction are only dispatched once it commits, so
+    listeners, e.g. Celery tasks, never see uncommitted rows, and events of a
+    rolled back transaction are dropped. With `EVENT_BUS_OUTBOX`, they are also
+    stored in the transaction of the emitter, so no event is lost if the process
+    dies in between, see `relay`.
+
+    Events of the types matching `EVENT_BUS_BROADCAST` are also dispatched to the
+    listeners of all other processes, see `RedisTransport`.
+    """
+
     def __init__(self):
         self.listeners = {}
+        self.stats = ListenerStats()
+        self.transport = RedisTransport(self)
+        self._dispatchers = {}
+        self._dispatchers_lock = threading.Lock()
+
+        os.register_at_fork(after_in_child=self.transport.after_fork)
+
+    @property
+    def dispatcher(self):
+        strategy = settings.EVENT_BUS_DISPATCH
+        with self._dispatchers_lock:
+            if strategy not in self._dispatchers:
+                self._dispatchers[strategy] = DISPATCHERS[strategy]()
+            return self._dispatchers[strategy]
 
     def listener(self, event_type: str):
         def wrapper(func: Callable):
@@ -15,17 +246,175 @@ class EventBus(metaclass=SingletonMeta):
         return wrapper
 
     def register_listener(self, event_type: str, func: Callable):
+        """
+        Register the function, or coroutine function, to be called with the
+        arguments of the events of the given type, which may be a shell-style
+        wildcard pattern, e.g. `file:*`.
+
+        Listeners having a `batch` attribute, e.g. the ones of `wrap_celery_task`,
+        are called with `batch(calls)` instead once for all the events of the type
+        relayed together, where `calls` is a list of `(args, kwargs)` tuples.
+        """
         if event_type not in self.listeners:
             self.listeners[event_type] = []
         self.listeners[event_type].append(func)
 
     def emit(self, event_type: str, *args, **kwargs):
-        def invoke_listeners():
-            if event_type in self.listeners:
-                for listener in self.listeners[event_type]:
-                    listener(*args, **kwargs)
+        if not settings.EVENT_BUS_OUTBOX:
+            dispatch = partial(self.dispatch, event_type, [(args, kwargs)])
+            if transaction.get_connection().in_atomic_block:
+                transaction.on_commit(dispatch)
+            else:
+                dispatch()
+            return
+
+        OutboxEvent.objects.create(event_type=event_type, args=args, kwargs=kwargs)
+
+        # Relayed once per transaction, however many events it emits
+        connection = transaction.get_connection()
+        if not any(
+            callback == self._relay_on_commit
+            for _, callback, _ in connection.run_on_commit
+        ):
+            transaction.on_commit(self._relay_on_commit)
+
+    def get_listeners(self, event_type: str) -> list:
+        return [
+            listener
+            for pattern, listeners in self.listeners.items()
+            if pattern == event_type or fnmatchcase(event_type, pattern)
+            for listener in listeners
+        ]
+
+    def is_broadcast(self, event_type: str) -> bool:
+        return any(
+            fnmatchcase(event_type, pattern) for pattern in settings.EVENT_BUS_BROADCAST
+        )
+
+    def dispatch(self, event_type: str, calls: list, remote: bool = False) -> bool:
+        """
+        Call the listeners of the event type with the arguments of the given events,
+        and publish them to the other processes if the type is broadcast.
+
+        Parameters:
+            event_type (str): The type of the events.
+            calls (list): The `(args, kwargs)` tuples of the events.
+            remote (bool): Whether the events were received from another process.
+
+        Returns:
+            bool: True if the events were published and all listeners succeeded,
+            False otherwise.
+        """
+        published = True
+        if not remote and self.is_broadcast(event_type):
+            try:
+                self.transport.publish(event_type, calls)
+            except Exception:
+                logger.exception("Could not publish %s events", event_type)
+                published = False
+
+        invocations = []
+        for listener in self.get_listeners(event_type):
+            if hasattr(listener, "batch"):
+                invocations.append(
+                    Invocation(event_type, listener, listener.batch, (calls,), {})
+                )
+                continue
+
+            invocations += [
+                Invocation(event_type, listener, listener, args, kwargs)
+                for args, kwargs in calls
+            ]
+
+        start = time.perf_counter()
+        errors = self.dispatcher.run(self, invocations)
+        self.stats.record_event(event_type, time.perf_counter() - start, len(calls))
+
+        return published and not any(errors)
+
+    def invoke(self, invocation: Invocation):
+        """
+        Call the listener of the invocation, recording its latency.
+
+        Returns:
+            Exception | None: The exception raised by the listener, if any.
+        """
+        start = time.perf_counter()
+        error = None
+        try:
+            if inspect.iscoroutinefunction(invocation.func):
+                async_to_sync(invocation.func)(*invocation.args, **invocation.kwargs)
+            else:
+                invocation.func(*invocation.args, **invocation.kwargs)
+        except Exception as e:
+            logger.exception("Listener of %s failed", invocation.event_type)
+            error = e
+
+        self.stats.record_call(invocation, time.perf_counter() - start, error)
+        return error
+
+    async def ainvoke(self, invocation: Invocation):
+        """
+        Async version of `invoke`, for coroutine listeners.
+        """
+        start = time.perf_counter()
+        error = None
+        try:
+            await invocation.func(*invocation.args, **invocation.kwargs)
+        except Exception as e:
+            logger.exception("Listener of %s failed", invocation.event_type)
+            error = e
+
+        self.stats.record_call(invocation, time.perf_counter() - start, error)
+        return error
+
+    def _relay_on_commit(self):
+        try:
+            self.relay()
+        except Exception:
+            # Left to the periodic relay, the emitter already committed
+            logger.exception("Could not relay outbox events")
+
+    def relay(self, batch_size: int = None) -> int:
+        """
+        Dispatch a batch of stored events, in the order they were emitted for each
+        event type.
+
+        Rows are locked with `SKIP LOCKED`, so relays of several processes never
+        dispatch the same events. Events of a type whose listener failed stay stored
+        and are retried, up to `EVENT_BUS_OUTBOX_MAX_ATTEMPTS` times, so listeners
+        have to tolerate receiving an event more than once.
+
+        Returns:
+            int: The number of dispatched events.
+        """
+        batch_size = batch_size or settings.EVENT_BUS_OUTBOX_BATCH_SIZE
+
+        with transaction.atomic():
+            events = list(
+                OutboxEvent.objects.select_for_update(skip_locked=True).filter(
+                    attempts__lt=settings.EVENT_BUS_OUTBOX_MAX_ATTEMPTS
+                )[:batch_size]
+            )
+
+            events_by_type = defaultdict(list)
+            for event in events:
+                events_by_type[event.event_type].append(event)
+
+            dispatched, failed = [], []
+            for event_type, typed_events in events_by_type.items():
+                ids = [event.id for event in typed_events]
+                if self.dispatch(
+                    event_type, [(event.args, event.kwargs) for event in typed_events]
+                ):
+                    dispatched += ids
+                else:
+                    failed += ids
+
+            OutboxEvent.objects.filter(id__in=dispatched).delete()
+            OutboxEvent.objects.filter(id__in=failed).update(attempts=F("attempts") + 1)
 
-        invoke_listeners()
+        return len(dispatched)
 
 
 bus = EventBus()
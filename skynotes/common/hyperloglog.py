@@ -0,0 +1,71 @@
+import hashlib
+import math
+
+
+class HyperLogLog:
+    """
+    HyperLogLog sketch estimating the number of distinct values.
+
+    With the default precision the sketch takes 1 KiB, has a standard error of about
+    3% and can be stored in a binary field and merged with other sketches, so
+    distinct counts of longer periods can be computed from shorter ones.
+    """
+
+    def __init__(self, precision: int = 10, registers: bytes = None):
+        self.precision = precision
+        self.size = 1 << precision
+
+        if registers is None:
+            self.registers = bytearray(self.size)
+        elif len(registers) != self.size:
+            raise ValueError(
+                f"Expected {self.size} registers, got {len(registers)} instead."
+            )
+        else:
+            self.registers = bytearray(registers)
+
+    @classmethod
+    def from_bytes(cls, value: bytes):
+        size = len(value)
+        if not size or size & (size - 1):
+            raise ValueError("The number of registers must be a power of two.")
+
+        return cls(precision=size.bit_length() - 1, registers=bytes(value))
+
+    def to_bytes(self) -> bytes:
+        return bytes(self.registers)
+
+    def add(self, value: str):
+        digest = hashlib.blake2b(value.encode(), digest_size=8).digest()
+        hashed = int.from_bytes(digest, "big")
+
+        index = hashed >> (64 - self.precision)
+        rest = hashed & ((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - rest.bit_length() + 1
+
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other: "HyperLogLog"):
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge sketches with different precision.")
+
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    def count(self) -> int:
+        alpha = 0.7213 / (1 + 1.079 / self.size)
+        estimate = (
+            alpha
+            * self.size**2
+            / sum(2.0**-register for register in self.registers)
+        )
+
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * self.size and zeros:
+            # Linear counting is more accurate for small cardinalities
+            estimate = self.size * math.log(self.size / zeros)
+
+        return round(estimate)
+
+    def __len__(self):
+        return self.count()
@@ -0,0 +1,17 @@
+from django.db import models
+
+
+class OutboxEvent(models.Model):
+    """
+    Event emitted on the bus in outbox mode, stored in the transaction of the
+    emitter and deleted once dispatched to the listeners, see `EventBus.relay`.
+    """
+
+    event_type = models.CharField(max_length=255)
+    args = models.JSONField(default=list)
+    kwargs = models.JSONField(default=dict)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["id"]
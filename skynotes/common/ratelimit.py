@@ -0,0 +1,78 @@
+from typing import NamedTuple
+
+from common.redis_client import get_redis_client
+
+
+class Bucket(NamedTuple):
+    key: str
+    rate: float  # tokens added per second
+    burst: int  # tokens the bucket holds at most
+    cost: int  # tokens taken by the request
+    # Only requires the bucket not to be empty, so a single request may take more
+    # tokens than the burst and the following ones wait until the debt is repaid
+    debt: bool = False
+
+
+# Takes the tokens from all buckets or from none of them. Buckets are refilled lazily
+# from the time of the last request, and expire once they would be full again
+CONSUME_SCRIPT = """
+local time = redis.call("TIME")
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local tokens = {}
+local wait = 0
+
+for i, key in ipairs(KEYS) do
+    local rate = tonumber(ARGV[i * 4 - 3])
+    local burst = tonumber(ARGV[i * 4 - 2])
+    local cost = tonumber(ARGV[i * 4 - 1])
+
+    local available = burst
+    local state = redis.call("HMGET", key, "tokens", "time")
+    if state[1] then
+        local elapsed = math.max(0, now - tonumber(state[2]))
+        available = math.min(burst, tonumber(state[1]) + elapsed * rate)
+    end
+
+    local missing = cost - available
+    if ARGV[i * 4] == "1" then
+        missing = cost > 0 and 1 - available or 0
+    end
+    if missing > 0 then
+        wait = math.max(wait, missing / rate)
+    end
+    tokens[i] = available - cost
+end
+
+if wait > 0 then
+    return math.ceil(wait)
+end
+
+for i, key in ipairs(KEYS) do
+    local rate = tonumber(ARGV[i * 4 - 3])
+    local burst = tonumber(ARGV[i * 4 - 2])
+    redis.call("HSET", key, "tokens", tokens[i], "time", now)
+    redis.call("EXPIRE", key, math.ceil((burst - tokens[i]) / rate) + 1)
+end
+return 0
+"""
+
+
+def consume_tokens(buckets: list) -> int:
+    """
+    Take the cost of a request from the given token buckets kept in Redis, all at
+    once or none at all if any of them lacks tokens.
+
+    Parameters:
+        buckets (list[Bucket]): The buckets limiting the request.
+
+    Returns:
+        int: 0 if the tokens were taken, otherwise the number of seconds until the
+        request would be allowed.
+    """
+    args = []
+    for bucket in buckets:
+        args += [bucket.rate, bucket.burst, bucket.cost, int(bucket.debt)]
+
+    return get_redis_client().eval(
+        CONSUME_SCRIPT, len(buckets), *[bucket.key for bucket in buckets], *args
+    )
@@ -0,0 +1,16 @@
+import redis
+from django.conf import settings
+
+_client = None
+
+
+def get_redis_client() -> redis.Redis:
+    """
+    Get the process-wide client connected to the Redis instance backing the default
+    cache, for data structures the Django cache API does not expose.
+    """
+    global _client
+
+    if _client is None:
+        _client = redis.Redis.from_url(settings.CACHES["default"]["LOCATION"])
+    return _client
@@ -0,0 +1,8 @@
+from celery import shared_task
+from common.bus import bus
+
+
+@shared_task
+def relay_outbox_events():
+    while bus.relay():
+        pass
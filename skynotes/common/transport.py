@@ -0,0 +1,97 @@
+import json
+import logging
+import time
+import uuid
+
+from common.redis_client import get_redis_client
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class RedisTransport:
+    """
+    Fans events out to the buses of all processes over Redis pub/sub, on the Redis
+    instance backing the default cache.
+
+    Each event type is published on a channel of its own, and processes subscribe
+    to the patterns of `EVENT_BUS_BROADCAST`. Messages carry the ID of the
+    publishing process, which already dispatched the events to its own listeners.
+    """
+
+    # Between reconnection attempts, so a Redis outage does not spin the thread
+    RECONNECT_INTERVAL = 1  # in seconds
+    POLL_TIMEOUT = 1  # in seconds
+
+    def __init__(self, bus):
+        self.bus = bus
+        self.node_id = uuid.uuid4().hex
+        self.thread = None
+
+    def get_channel(self, event_type: str) -> str:
+        return f"{settings.EVENT_BUS_CHANNEL_PREFIX}{event_type}"
+
+    def publish(self, event_type: str, calls: list):
+        """
+        Publish the events to the other processes, in a single message.
+
+        Parameters:
+            event_type (str): The type of the events.
+            calls (list): The `(args, kwargs)` tuples of the events.
+        """
+        message = json.dumps({"node": self.node_id, "calls": calls})
+        get_redis_client().publish(self.get_channel(event_type), message)
+
+    def handle_message(self, message: dict):
+        try:
+            data = json.loads(message["data"])
+        except (TypeError, ValueError):
+            logger.warning("Invalid event message on %s", message["channel"])
+            return
+
+        if data["node"] == self.node_id:
+            return
+
+        event_type = message["channel"].decode()
+        event_type = event_type.removeprefix(settings.EVENT_BUS_CHANNEL_PREFIX)
+        self.bus.dispatch(
+            event_type,
+            [(args, kwargs) for args, kwargs in data["calls"]],
+            remote=True,
+        )
+
+    def handle_exception(self, exception, pubsub, thread):
+        logger.warning("Event subscription failed: %s", exception)
+        time.sleep(self.RECONNECT_INTERVAL)
+
+    def start(self):
+        """
+        Subscribe to the broadcast event types in a background thread, unless
+        already subscribed.
+        """
+        if self.thread is not None or not settings.EVENT_BUS_BROADCAST:
+            return
+
+        pubsub = get_redis_client().pubsub(ignore_subscribe_messages=True)
+        pubsub.psubscribe(
+            **{
+                self.get_channel(pattern): self.handle_message
+                for pattern in settings.EVENT_BUS_BROADCAST
+            }
+        )
+        self.thread = pubsub.run_in_thread(
+            sleep_time=self.POLL_TIMEOUT,
+            daemon=True,
+            exception_handler=self.handle_exception,
+        )
+
+    def stop(self):
+        if self.thread is not None:
+            self.thread.stop()
+            self.thread = None
+
+    def after_fork(self):
+        # Threads do not survive forks, and the child is another node
+        self.thread = None
+        self.node_id = uuid.uuid4().hex
+        self.start()
@@ -1,6 +1,47 @@
+import atexit
+import json
+import os
+import threading
+
 import grpc
 from thumbnailer import thumbnailer_pb2, thumbnailer_pb2_grpc
 
+# Retry transient failures with exponential backoff, see
+# https://github.com/grpc/proposal/blob/master/A6-client-retries.md
+SERVICE_CONFIG = {
+    "methodConfig": [
+        {
+            "name": [{"service": "thumbnailer.ThumbnailService"}],
+            "retryPolicy": {
+                "maxAttempts": 4,
+                "initialBackoff": "0.2s",
+                "maxBackoff": "5s",
+                "backoffMultiplier": 2,
+                "retryableStatusCodes": ["UNAVAILABLE", "RESOURCE_EXHAUSTED"],
+            },
+        }
+    ]
+}
+
+CHANNEL_OPTIONS = [
+    ("grpc.keepalive_time_ms", 30_000),
+    ("grpc.keepalive_timeout_ms", 10_000),
+    ("grpc.keepalive_permit_without_calls", 1),
+    ("grpc.http2.max_pings_without_data", 0),
+    ("grpc.enable_retries", 1),
+    # Batches of thumbnails easily exceed the default limit of 4 MB
+    ("grpc.max_receive_message_length", 64 * 1024 * 1024),
+    ("grpc.service_config", json.dumps(SERVICE_CONFIG)),
+]
+
+DEFAULT_TIMEOUT = 30  # in seconds
+
+STREAM_CHUNK_SIZE = 1024 * 1024  # well below the default 4 MB message size limit
+
+
+class ThumbnailError(Exception):
+    pass
+
 
 class Certs:
     root = None
@@ -13,15 +54,112 @@ class Certs:
         self.key = open(key, "rb").read()
 
 
+class ChannelPool:
+    """
+    Process-wide pool of gRPC channels, one per address.
+
+    Channels multiplex calls over a single HTTP/2 connection, so sharing them
+    avoids a new connection per call. Channels must not be used across `fork()`,
+    so the pool starts over in a forked process, e.g. a Celery worker child.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._channels = {}
+        self._pid = os.getpid()
+
+    def get(self, addr: str) -> grpc.Channel:
+        with self._lock:
+            if self._pid != os.getpid():
+                self._channels = {}
+                self._pid = os.getpid()
+
+            channel = self._channels.get(addr)
+            if channel is None:
+                # creds = grpc.ssl_channel_credentials(crt.root, crt.key, crt.cert)
+                channel = grpc.insecure_channel(addr, options=CHANNEL_OPTIONS)
+                self._channels[addr] = channel
+            return channel
+
+    def close(self):
+        with self._lock:
+            channels, self._channels = self._channels, {}
+
+        if self._pid == os.getpid():
+            for channel in channels.values():
+                channel.close()
+
+
+channel_pool = ChannelPool()
+atexit.register(channel_pool.close)
+
+
 class Client:
     thumbnailer = None
 
-    def __init__(self, addr: str):  # crt: Certs
-        # creds = grpc.ssl_channel_credentials(crt.root, crt.key, crt.cert)
-        channel = grpc.insecure_channel(addr)  # , creds
-        self.thumbnailer = thumbnailer_pb2_grpc.ThumbnailServiceStub(channel)
+    def __init__(self, addr: str, timeout: float = DEFAULT_TIMEOUT):  # crt: Certs
+        self.timeout = timeout
+        self.thumbnailer = thumbnailer_pb2_grpc.ThumbnailServiceStub(
+            channel_pool.get(addr)
+        )
 
     def generate_thumbnail(self, content: bytes) -> bytes:
         return self.thumbnailer.GenerateThumbnail(
-            thumbnailer_pb2.ThumbnailRequest(content=content)
+            thumbnailer_pb2.ThumbnailRequest(content=content), timeout=self.timeout
         ).thumbnail
+
+    def generate_thumbnail_stream(
+        self, file, content_type: str = None, width: int = 0, height: int = 0
+    ) -> bytes:
+        """
+        Generate the thumbnail of the source read from the file-like object.
+
+        The source is sent in chunks, so it is never fully read into memory and
+        is not limited by the maximum gRPC message size.
+        """
+
+        def chunks():
+            yield thumbnailer_pb2.ThumbnailChunk(
+                options=thumbnailer_pb2.ThumbnailOptions(
+                    content_type=content_type or "", width=width, height=height
+                )
+            )
+            while content := file.read(STREAM_CHUNK_SIZE):
+                yield thumbnailer_pb2.ThumbnailChunk(content=content)
+
+        return self.thumbnailer.GenerateThumbnailStream(
+            chunks(), timeout=self.timeout
+        ).thumbnail
+
+    def generate_thumbnails(
+        self, sources: dict, width: int = 0, height: int = 0
+    ) -> dict:
+        """
+        Generate the thumbnails of many small sources in a single call.
+
+        Parameters:
+            sources (dict): The contents of the sources by their IDs.
+            width (int): The maximum width of the thumbnails, or 0 for the default.
+            height (int): The maximum height of the thumbnails, or 0 for the default.
+
+        Returns:
+            dict: The thumbnails by the IDs of the sources, or `ThumbnailError` for
+            the sources the thumbnail could not be generated for.
+        """
+        response = self.thumbnailer.GenerateThumbnails(
+            thumbnailer_pb2.BatchThumbnailRequest(
+                items=[
+                    thumbnailer_pb2.ThumbnailItem(id=str(source_id), content=content)
+                    for source_id, content in sources.items()
+                ],
+                options=thumbnailer_pb2.ThumbnailOptions(width=width, height=height),
+            ),
+            timeout=self.timeout,
+        )
+
+        return {
+            result.id: ThumbnailError(result.error)
+            if result.error
+            else result.thumbnail
+            for result in response.results
+        }
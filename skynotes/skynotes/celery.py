@@ -1,6 +1,7 @@
 import os
 
 from celery import Celery
+from celery.signals import worker_process_shutdown
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "skynotes.settings")
 
@@ -8,3 +9,10 @@ app = Celery("skynotes")
 app.config_from_object("django.conf:settings", namespace="CELERY")
 
 app.autodiscover_tasks()
+
+
+@worker_process_shutdown.connect
+def close_grpc_channels(**kwargs):
+    from services.grpc_client import channel_pool
+
+    channel_pool.close()
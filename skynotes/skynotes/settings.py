@@ -38,7 +38,7 @@ THIRD_PARTY_APPS = [
     "corsheaders",
 ]
 
-APPLICATIONS = ["storage", "authorization"]
+APPLICATIONS = ["common", "storage", "authorization"]
 
 INSTALLED_APPS = CORE_APPS + APPLICATIONS + THIRD_PARTY_APPS
 
@@ -61,6 +61,19 @@ REFRESH_TOKEN_LIFETIME = timedelta(days=15)
 AUTH_COOKIE = "access_token"
 REFRESH_COOKIE = "refresh_token"
 
+# Users authenticating with tokens are cached in the process for a few seconds, and
+# in Redis until they change or time out. With "user:*" in EVENT_BUS_BROADCAST,
+# changes also evict them from the caches of all processes at once
+
+AUTH_USER_CACHE_TIMEOUT = 60 * 15
+AUTH_USER_LOCAL_CACHE_TIMEOUT = 5
+AUTH_USER_LOCAL_CACHE_SIZE = 1024
+
+# User fields, e.g. "is_staff", copied into issued tokens and trusted without a
+# database query. Changes only apply to tokens issued afterwards
+
+AUTH_USER_TOKEN_CLAIMS = env.list("AUTH_USER_TOKEN_CLAIMS", default=[])
+
 # JWT
 
 SIMPLE_JWT = {
@@ -202,6 +215,150 @@ STATIC_URL = "static/"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = os.path.join(BASE_DIR, "media/")
 
+# Object storage
+# With "s3", files are kept in an S3-compatible bucket (e.g. MinIO) instead of
+# MEDIA_ROOT, MediaView redirects to presigned URLs once it has checked the access,
+# and upload sessions with a SHA-256 digest are uploaded directly to the bucket
+
+STORAGE_BACKEND = env.str("STORAGE_BACKEND", default="filesystem")
+
+if STORAGE_BACKEND == "s3":
+    STORAGES = {
+        "default": {"BACKEND": "storages.backends.s3.S3Storage"},
+        "staticfiles": {
+            "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"
+        },
+    }
+
+AWS_STORAGE_BUCKET_NAME = env.str("S3_BUCKET_NAME", default=None)
+AWS_S3_ENDPOINT_URL = env.str("S3_ENDPOINT_URL", default=None)
+AWS_S3_ACCESS_KEY_ID = env.str("S3_ACCESS_KEY_ID", default=None)
+AWS_S3_SECRET_ACCESS_KEY = env.str("S3_SECRET_ACCESS_KEY", default=None)
+AWS_S3_REGION_NAME = env.str("S3_REGION_NAME", default=None)
+AWS_S3_ADDRESSING_STYLE = env.str("S3_ADDRESSING_STYLE", default=None)
+AWS_S3_SIGNATURE_VERSION = "s3v4"
+AWS_DEFAULT_ACL = "private"
+# Names queued for deletion must never be reused, see StorageDeletion
+AWS_S3_FILE_OVERWRITE = False
+
+MEDIA_PRESIGNED_URL_EXPIRE = 60 * 5  # in seconds
+DIRECT_UPLOAD_URL_EXPIRE = 60 * 60  # in seconds
+DIRECT_UPLOAD_MAX_SIZE = 5 * 1024 * 1024 * 1024  # 5GB, the limit of a single PUT
+
+# Media serving
+# Set to "x-accel-redirect" (nginx) or "x-sendfile" (apache, lighttpd) to let the
+# web server transfer media files once MediaView has checked the access
+
+MEDIA_OFFLOAD = env.str("MEDIA_OFFLOAD", default=None)
+MEDIA_OFFLOAD_PREFIX = "/protected-media/"
+
+# Serve media with AsyncMediaView, only worth it when running under ASGI (uvicorn)
+MEDIA_ASYNC = env.bool("MEDIA_ASYNC", default=False)
+
+# Uploads are hashed while received, for content-addressed storage of files
+FILE_UPLOAD_HANDLERS = [
+    "storage.uploadhandler.HashingMemoryFileUploadHandler",
+    "storage.uploadhandler.HashingTemporaryFileUploadHandler",
+]
+
+# Media URLs returned to owners are signed, so they are served without JWT
+# authentication or database queries. Expiry times are rounded up to the bucket,
+# keeping URLs stable, and cacheable, for that long
+
+MEDIA_SIGNED_URLS = env.bool("MEDIA_SIGNED_URLS", default=True)
+MEDIA_SIGNED_URL_EXPIRE = 60 * 15  # in seconds
+MEDIA_SIGNED_URL_BUCKET = 60 * 5  # in seconds
+
+# Access-decision metadata of files and shares cached by MediaView, invalidated
+# whenever the underlying rows change
+MEDIA_METADATA_CACHE_TIMEOUT = 60 * 15
+
+# Event bus
+# Listeners are called "inline" one after another, in a "thread" pool or on an
+# "asyncio" event loop, the last two concurrently and with timeouts
+
+EVENT_BUS_DISPATCH = env.str("EVENT_BUS_DISPATCH", default="inline")
+EVENT_BUS_LISTENER_TIMEOUT = 10  # in seconds
+EVENT_BUS_MAX_WORKERS = 8  # threads of the "thread" and "asyncio" dispatch
+
+# Events of the types matching these patterns (e.g. "cache:*") are also dispatched to
+# the listeners of all app and Celery processes, over Redis pub/sub
+
+EVENT_BUS_BROADCAST = env.list("EVENT_BUS_BROADCAST", default=[])
+EVENT_BUS_CHANNEL_PREFIX = "events:"
+
+# In outbox mode, emitted events are stored in the transaction of the emitter and
+# relayed to the listeners once it commits, or by a periodic task if that failed.
+# No event is lost then, but every emit costs an INSERT, and the relay after commit
+# (locking, dispatching and deleting the events) runs on the request thread, so it
+# is opt-in. Otherwise, events emitted in a transaction are dispatched after it
+# commits, and are lost if the process dies in between
+
+EVENT_BUS_OUTBOX = env.bool("EVENT_BUS_OUTBOX", default=False)
+EVENT_BUS_OUTBOX_BATCH_SIZE = 1000  # events relayed together
+EVENT_BUS_OUTBOX_MAX_ATTEMPTS = 5  # events whose listeners fail are kept after that
+EVENT_BUS_OUTBOX_RELAY_INTERVAL = 10  # in seconds
+
+# Media rate limiting
+# Token buckets in Redis refilled at `rate` per second up to `burst`, of requests and
+# of transferred bytes. Downloads with share links are limited per share and client
+# IP, others per user. Transfers only need bytes left in the bucket and may overdraw
+# it, so large files are served and the following downloads wait instead
+
+MEDIA_RATE_LIMITING = env.bool("MEDIA_RATE_LIMITING", default=True)
+MEDIA_RATE_LIMITS = {
+    "user": {
+        "requests": {"rate": 20, "burst": 500},
+        "bytes": {"rate": 50 * 1024 * 1024, "burst": 5 * 1024 * 1024 * 1024},
+    },
+    "share": {
+        "requests": {"rate": 10, "burst": 200},
+        "bytes": {"rate": 10 * 1024 * 1024, "burst": 1024 * 1024 * 1024},
+    },
+    "ip": {
+        "requests": {"rate": 5, "burst": 100},
+        "bytes": {"rate": 5 * 1024 * 1024, "burst": 512 * 1024 * 1024},
+    },
+}
+
+# Thumbnails
+# Renditions of every thumbnail, served by MediaView with `?thumbnail=<size>` in the
+# format given with `&format=` or negotiated from the `Accept` header
+
+THUMBNAIL_SIZES = (64, 256, 1024)  # in pixels, the renditions fit squares of this size
+THUMBNAIL_FORMATS = ("avif", "webp", "png")  # skipped unless supported by Pillow
+THUMBNAIL_URL_SIZE = 256  # linked as `thumbnail` by the file API
+
+# Share analytics
+# Downloads are queued in Redis and stored in batches by a Celery task
+
+FILE_ANALYTICS_BUFFERED = True
+FILE_ANALYTICS_BATCH_SIZE = 500
+FILE_ANALYTICS_QUEUE_MAX_SIZE = 100_000  # events over this limit are dropped
+FILE_ANALYTICS_FLUSH_INTERVAL = 10  # in seconds
+
+# Hourly and daily rollups served by the analytics API
+FILE_ANALYTICS_ROLLUP_LAG = timedelta(minutes=1)
+FILE_ANALYTICS_ROLLUP_MAX_WINDOW = timedelta(days=1)
+FILE_ANALYTICS_ROLLUP_TOP = 20  # number of top referers and user agents kept
+
+# Bulk file operations
+
+FILE_BULK_MAX_SIZE = 10_000  # files moved, tagged or deleted by a single request
+
+# Deletion of stored files
+# Queued in the same transaction as the rows are deleted and processed by a task
+
+STORAGE_DELETION_BATCH_SIZE = 500
+STORAGE_ORPHAN_GRACE_PERIOD = timedelta(days=1)  # files younger are never swept
+
+# Chunked uploads
+# Partial chunks are kept outside of MEDIA_ROOT until the session is finalized
+
+UPLOAD_SESSIONS_ROOT = os.path.join(BASE_DIR, "uploads/")
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024  # 8MB
+UPLOAD_SESSION_LIFETIME = timedelta(days=1)
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
@@ -215,12 +372,40 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 CELERY_BROKER_URL = env("RABBITMQ_URL")
 # CELERY_RESULT_BACKEND = REDIS_URL
 
+CELERY_BEAT_SCHEDULE = {
+    "relay-outbox-events": {
+        "task": "common.tasks.relay_outbox_events",
+        "schedule": EVENT_BUS_OUTBOX_RELAY_INTERVAL,
+    },
+    "flush-file-analytics": {
+        "task": "storage.tasks.flush_file_analytics",
+        "schedule": FILE_ANALYTICS_FLUSH_INTERVAL,
+    },
+    "rollup-file-analytics": {
+        "task": "storage.tasks.rollup_file_analytics",
+        "schedule": timedelta(minutes=5),
+    },
+    "cleanup-upload-sessions": {
+        "task": "storage.tasks.cleanup_upload_sessions",
+        "schedule": timedelta(hours=1),
+    },
+    "process-storage-deletions": {
+        "task": "storage.tasks.process_storage_deletions",
+        "schedule": timedelta(minutes=1),
+    },
+    "sweep-orphaned-files": {
+        "task": "storage.tasks.sweep_orphaned_files",
+        "schedule": timedelta(days=1),
+    },
+}
+
 
 # GRPC
 
 # CERTS = Certs('../../certs/root.pem',
 # '../../certs/server.pem', '../../certs/server-key.pem')
 GRPC_ADDR = "thumbnailer:50051"
+GRPC_TIMEOUT = 30  # deadline of a single thumbnail call, in seconds
 
 if DEBUG:
     os.environ["GRPC_VERBOSITY"] = "debug"
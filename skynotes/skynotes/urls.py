@@ -1,7 +1,8 @@
+from django.conf import settings
 from django.contrib import admin
 from django.urls import include, path
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
-from storage.views import MediaView
+from storage.views import AsyncMediaView, MediaView
 
 urlpatterns = [
     path("admin/", admin.site.urls),
@@ -13,5 +14,9 @@ urlpatterns = [
         SpectacularSwaggerView.as_view(url_name="schema"),
         name="swagger-ui",
     ),
-    path("media/<file_path>", MediaView.as_view(), name="media"),
+    path(
+        "media/<file_path>",
+        (AsyncMediaView if settings.MEDIA_ASYNC else MediaView).as_view(),
+        name="media",
+    ),
 ]
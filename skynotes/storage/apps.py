@@ -6,8 +6,10 @@ class StorageConfig(AppConfig):
     name = "storage"
 
     def ready(self) -> None:
+        import storage.signals  # noqa: F401
         from common.bus import bus
         from storage.tasks import (
+            flush_file_analytics,
             handle_file_upload,
             handle_thumbnail_generation,
             wrap_celery_task,
@@ -17,4 +19,7 @@ class StorageConfig(AppConfig):
         bus.register_listener(
             "file:uploaded", wrap_celery_task(handle_thumbnail_generation)
         )
+        bus.register_listener(
+            "analytics:batch_ready", wrap_celery_task(flush_file_analytics)
+        )
         return super().ready()
@@ -0,0 +1,138 @@
+import base64
+import hashlib
+import mimetypes
+
+from django.core.files.storage import Storage
+from django.utils.http import content_disposition_header
+from storages.backends.s3 import S3Storage
+from storages.utils import clean_name
+
+
+def supports_presigned_urls(storage: Storage) -> bool:
+    """
+    Check if clients can transfer files of the storage directly with presigned
+    URLs, which is the case for S3 and compatible object storages (e.g. MinIO).
+    """
+    return isinstance(storage, S3Storage)
+
+
+def get_download_url(storage: Storage, name: str, *, expire: int):
+    """
+    Get a presigned URL downloading the file directly from the storage, served with
+    the same headers as `serve_media` would.
+
+    Parameters:
+        storage (Storage): The storage backend holding the file.
+        name (str): The name of the file in the storage.
+        expire (int): The number of seconds the URL is valid for.
+
+    Returns:
+        str | None: The URL, or None if the storage does not support presigned URLs.
+    """
+    if not supports_presigned_urls(storage):
+        return None
+
+    content_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+    parameters = {
+        "ResponseContentType": content_type,
+        "ResponseContentDisposition": content_disposition_header(False, name),
+    }
+    return storage.url(name, parameters=parameters, expire=expire)
+
+
+def get_upload_request(
+    storage: Storage,
+    name: str,
+    *,
+    size: int,
+    sha256: str,
+    content_type: str = None,
+    expire: int,
+):
+    """
+    Get a presigned request uploading the file directly to the storage.
+
+    The size and the SHA-256 digest are signed, so the storage rejects any other
+    content than the one announced by the client.
+
+    Parameters:
+        storage (Storage): The storage backend the file is uploaded to.
+        name (str): The name of the file in the storage.
+        size (int): The size of the file in bytes.
+        sha256 (str): The hex SHA-256 digest of the file.
+        content_type (str): The content type of the file, if known.
+        expire (int): The number of seconds the request is valid for.
+
+    Returns:
+        dict | None: The method, URL and headers of the request, or None if the
+        storage does not support presigned URLs.
+    """
+    if not supports_presigned_urls(storage):
+        return None
+
+    checksum = base64.b64encode(bytes.fromhex(sha256)).decode()
+    params = {
+        "Bucket": storage.bucket.name,
+        "Key": storage._normalize_name(clean_name(name)),
+        "ContentLength": size,
+        "ChecksumSHA256": checksum,
+    }
+    headers = {"Content-Length": str(size), "x-amz-checksum-sha256": checksum}
+    if content_type:
+        params["ContentType"] = content_type
+        headers["Content-Type"] = content_type
+
+    url = storage.bucket.meta.client.generate_presigned_url(
+        "put_object", Params=params, ExpiresIn=expire, HttpMethod="PUT"
+    )
+    return {"method": "PUT", "url": url, "headers": headers}
+
+
+def get_stored_sha256(storage: Storage, name: str, *, block_size: int = 1024 * 1024):
+    """
+    Get the SHA-256 digest of the stored file, as computed by the storage when it
+    was uploaded with a checksum, otherwise by reading it.
+
+    Parameters:
+        storage (Storage): The storage backend holding the file.
+        name (str): The name of the file in the storage.
+        block_size (int): The size of the blocks read when hashing the file.
+
+    Returns:
+        str: The hex SHA-256 digest of the file.
+    """
+    if supports_presigned_urls(storage):
+        head = storage.bucket.meta.client.head_object(
+            Bucket=storage.bucket.name,
+            Key=storage._normalize_name(clean_name(name)),
+            ChecksumMode="ENABLED",
+        )
+        # Checksums of multipart uploads are of the parts, suffixed with their count
+        checksum = head.get("ChecksumSHA256")
+        if checksum and "-" not in checksum:
+            return base64.b64decode(checksum).hex()
+
+    hasher = hashlib.sha256()
+    with storage.open(name, "rb") as f:
+        while data := f.read(block_size):
+            hasher.update(data)
+    return hasher.hexdigest()
+
+
+def copy_file(storage: Storage, source: str, target: str):
+    """
+    Copy the stored file to another name, within the storage when it supports it.
+    """
+    if supports_presigned_urls(storage):
+        storage.bucket.meta.client.copy(
+            {
+                "Bucket": storage.bucket.name,
+                "Key": storage._normalize_name(clean_name(source)),
+            },
+            storage.bucket.name,
+            storage._normalize_name(clean_name(target)),
+        )
+        return
+
+    with storage.open(source, "rb") as f:
+        storage.save(target, f)
@@ -0,0 +1,135 @@
+from django.conf import settings
+from django.core.cache import cache
+from storage.models import File, FileShare, Thumbnail
+
+FILE_METADATA_KEY = "storage:file:{}"
+SHARE_METADATA_KEY = "storage:share:{}"
+
+# Cached in place of missing rows, so lookups of unknown ids do not hit the database
+MISSING = {}
+
+
+def _get_or_set(key: str, fetch):
+    metadata = cache.get(key)
+
+    if metadata is None:
+        metadata = fetch() or MISSING
+        cache.set(key, metadata, settings.MEDIA_METADATA_CACHE_TIMEOUT)
+
+    return metadata or None
+
+
+async def _aget_or_set(key: str, fetch):
+    metadata = await cache.aget(key)
+
+    if metadata is None:
+        metadata = await fetch() or MISSING
+        await cache.aset(key, metadata, settings.MEDIA_METADATA_CACHE_TIMEOUT)
+
+    return metadata or None
+
+
+def _get_file_queryset(file_id: str):
+    return File.objects.filter(id=file_id).values(
+        "id", "owner_id", "file", "thumbnail", "size", "updated_at"
+    )
+
+
+def _get_thumbnails_queryset(file_id: str):
+    return Thumbnail.objects.filter(file_id=file_id).values_list(
+        "size", "format", "image"
+    )
+
+
+def _get_file_metadata(file: dict, thumbnails: list):
+    file["id"] = str(file["id"])
+    file["owner_id"] = str(file["owner_id"])
+    file["thumbnails"] = thumbnails
+    return file
+
+
+def _get_share_queryset(token: str):
+    return FileShare.objects.filter(token=token).values(
+        "id", "file_id", "is_active", "shared_until", "password"
+    )
+
+
+def _get_share_metadata(share: dict):
+    share["id"] = str(share["id"])
+    share["file_id"] = str(share["file_id"])
+    return share
+
+
+def get_file_metadata(file_id: str):
+    """
+    Get the metadata needed to decide about access to the file and to serve it.
+
+    Parameters:
+        file_id (str): The ID of the file.
+
+    Returns:
+        dict | None: The file metadata, or None if the file does not exist.
+    """
+
+    def fetch():
+        file = _get_file_queryset(file_id).first()
+        if file:
+            return _get_file_metadata(file, list(_get_thumbnails_queryset(file_id)))
+
+    return _get_or_set(FILE_METADATA_KEY.format(file_id), fetch)
+
+
+async def aget_file_metadata(file_id: str):
+    """
+    Async version of `get_file_metadata`.
+    """
+
+    async def fetch():
+        file = await _get_file_queryset(file_id).afirst()
+        if file:
+            return _get_file_metadata(
+                file,
+                [thumbnail async for thumbnail in _get_thumbnails_queryset(file_id)],
+            )
+
+    return await _aget_or_set(FILE_METADATA_KEY.format(file_id), fetch)
+
+
+def get_share_metadata(token: str):
+    """
+    Get the metadata needed to decide about access to the file shared with the token.
+
+    Parameters:
+        token (str): The share token.
+
+    Returns:
+        dict | None: The share metadata, or None if the share does not exist.
+    """
+
+    def fetch():
+        share = _get_share_queryset(token).first()
+        if share:
+            return _get_share_metadata(share)
+
+    return _get_or_set(SHARE_METADATA_KEY.format(token), fetch)
+
+
+async def aget_share_metadata(token: str):
+    """
+    Async version of `get_share_metadata`.
+    """
+
+    async def fetch():
+        share = await _get_share_queryset(token).afirst()
+        if share:
+            return _get_share_metadata(share)
+
+    return await _aget_or_set(SHARE_METADATA_KEY.format(token), fetch)
+
+
+def invalidate_file_metadata(*file_ids):
+    cache.delete_many([FILE_METADATA_KEY.format(file_id) for file_id in file_ids])
+
+
+def invalidate_share_metadata(*tokens):
+    cache.delete_many([SHARE_METADATA_KEY.format(token) for token in tokens])
@@ -0,0 +1,141 @@
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import grpc
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from services.grpc_client import Client, ThumbnailError
+from storage.models import File
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate the missing thumbnails of files. Small files are sent to the "
+        "thumbnailer in batches, larger ones are streamed one by one."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=32,
+            help="Maximum number of files sent in a single call.",
+        )
+        parser.add_argument(
+            "--max-batch-bytes",
+            type=int,
+            default=3 * 1024 * 1024,
+            help=(
+                "Maximum total size of files sent in a single call, larger files are "
+                "streamed on their own. Keep it below the 4 MB message size limit of "
+                "the thumbnailer."
+            ),
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=4,
+            help="Maximum number of calls in flight.",
+        )
+        parser.add_argument(
+            "--limit", type=int, help="Maximum number of files to process."
+        )
+
+    def handle(self, *args, **options):
+        self.verbosity = options["verbosity"]
+        self.max_batch_bytes = options["max_batch_bytes"]
+        self.generated = self.failed = 0
+        # Renditions are scaled down from the largest one
+        self.thumbnail_size = max(settings.THUMBNAIL_SIZES)
+
+        client = Client(settings.GRPC_ADDR, timeout=settings.GRPC_TIMEOUT)
+
+        files = (
+            File.objects.filter(Q(thumbnail="") | Q(thumbnail__isnull=True))
+            .exclude(file="")
+            .order_by("created_at")
+            .only("id", "file", "size", "thumbnail")
+        )
+        if options["limit"]:
+            files = files[: options["limit"]]
+
+        with ThreadPoolExecutor(max_workers=options["concurrency"]) as executor:
+            pending = set()
+
+            for batch in self._get_batches(files, options["batch_size"]):
+                if len(pending) >= options["concurrency"]:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    self._save_thumbnails(done)
+
+                pending.add(executor.submit(self._generate_thumbnails, client, batch))
+
+            self._save_thumbnails(wait(pending).done)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Generated {self.generated} thumbnails, {self.failed} failed"
+            )
+        )
+
+    def _get_batches(self, files, batch_size: int):
+        batch, batch_bytes = [], 0
+
+        for file in files.iterator(chunk_size=1000):
+            if file.size > self.max_batch_bytes:
+                yield [file]
+                continue
+
+            if (
+                len(batch) >= batch_size
+                or batch_bytes + file.size > self.max_batch_bytes
+            ):
+                yield batch
+                batch, batch_bytes = [], 0
+
+            batch.append(file)
+            batch_bytes += file.size
+
+        if batch:
+            yield batch
+
+    def _generate_thumbnails(self, client: Client, files: list):
+        """
+        Generate thumbnails of the files, run in the worker threads. Thumbnails are
+        saved by the main thread, so the workers do not touch the database.
+        """
+        try:
+            if len(files) == 1 and files[0].size > self.max_batch_bytes:
+                with files[0].file.open("rb") as f:
+                    return files, {
+                        str(files[0].id): client.generate_thumbnail_stream(
+                            f, width=self.thumbnail_size, height=self.thumbnail_size
+                        )
+                    }
+
+            sources = {}
+            for file in files:
+                with file.file.open("rb") as f:
+                    sources[str(file.id)] = f.read()
+
+            return files, client.generate_thumbnails(
+                sources, width=self.thumbnail_size, height=self.thumbnail_size
+            )
+        except (grpc.RpcError, OSError) as e:
+            error = ThumbnailError(str(e))
+            return files, {str(file.id): error for file in files}
+
+    def _save_thumbnails(self, futures):
+        for future in futures:
+            files, results = future.result()
+
+            for file in files:
+                result = results.get(str(file.id))
+
+                if isinstance(result, bytes):
+                    file.save_thumbnail(ContentFile(result))
+                    self.generated += 1
+                else:
+                    self.failed += 1
+                    if self.verbosity > 1:
+                        self.stderr.write(f"{file.id}: {result}")
@@ -0,0 +1,49 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from storage.services import FileService
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalculate the storage used by users from their files and pending upload "
+        "sessions, fixing counters that drifted."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--email", help="Only reconcile the user with the given email."
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report mismatched counters without fixing them.",
+        )
+
+    def handle(self, *args, email=None, dry_run=False, **options):
+        users = User.objects.order_by("pk")
+        if email:
+            users = users.filter(email=email)
+
+        fixed = 0
+        for user_id in users.values_list("pk", flat=True).iterator():
+            with transaction.atomic():
+                # Lock the user, so no reservation happens in the meantime
+                user = User.objects.select_for_update().get(pk=user_id)
+                storage_used = FileService.get_user_storage_size(user)
+
+                if user.storage_used == storage_used:
+                    continue
+
+                self.stdout.write(
+                    f"{user.email}: {user.storage_used} -> {storage_used} bytes"
+                )
+                if not dry_run:
+                    user.storage_used = storage_used
+                    user.save(update_fields=["storage_used"])
+                fixed += 1
+
+        action = "Found" if dry_run else "Fixed"
+        self.stdout.write(self.style.SUCCESS(f"{action} {fixed} mismatched counters"))
@@ -0,0 +1,34 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from storage.services import StorageService
+
+
+class Command(BaseCommand):
+    help = (
+        "Find stored files and upload session directories that no row references "
+        "and queue them for deletion."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--grace-period",
+            type=int,
+            help="Skip files modified within the given number of hours.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report orphaned files without deleting them.",
+        )
+
+    def handle(self, *args, grace_period=None, dry_run=False, **options):
+        if grace_period is not None:
+            grace_period = timedelta(hours=grace_period)
+
+        orphans = StorageService.sweep_orphans(grace_period, dry_run=dry_run)
+        for name in orphans:
+            self.stdout.write(name)
+
+        action = "Found" if dry_run else "Queued"
+        self.stdout.write(self.style.SUCCESS(f"{action} {len(orphans)} orphaned files"))
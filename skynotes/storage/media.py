@@ -0,0 +1,502 @@
+import hashlib
+import logging
+import mimetypes
+import re
+import time
+import uuid
+from collections import deque
+
+from asgiref.sync import sync_to_async
+from common.ratelimit import Bucket, consume_tokens
+from django.conf import settings
+from django.core.files.storage import Storage
+from django.http import HttpResponse, HttpResponseRedirect
+from django.http.response import FileResponse
+from django.utils.cache import get_conditional_response
+from django.utils.crypto import constant_time_compare, salted_hmac
+from django.utils.http import content_disposition_header, http_date, parse_http_date
+from redis import RedisError
+from storage.backends import get_download_url
+
+logger = logging.getLogger(__name__)
+
+RANGE_RE = re.compile(r"^\s*(\d*)\s*-\s*(\d*)\s*$")
+
+MAX_RANGES = 16
+
+# Responses of the content itself, 304 repeating the headers of the 200 it confirms
+CACHEABLE_STATUSES = {200, 206, 304}
+
+SIGNATURE_SALT = "storage.media.signed_url"
+
+# Query parameters selecting the served media, covered by signatures
+VARIANT_PARAMS = ("thumbnail", "format")
+
+# Each block is read in a thread of its own, so blocks are larger than FileResponse's
+ASYNC_BLOCK_SIZE = 64 * 1024
+
+
+class RangeReader:
+    """
+    File-like object reading the given parts of the file one after another.
+
+    Parts are either `(start, length)` tuples pointing into the file or plain bytes
+    (used for multipart boundaries), so a single range and `multipart/byteranges`
+    bodies can both be streamed by `FileResponse` with a bounded buffer.
+    """
+
+    def __init__(self, file, parts: list):
+        self.file = file
+        self.parts = deque(parts)
+
+    def read(self, size: int = -1) -> bytes:
+        chunks = []
+        remaining = size
+
+        while self.parts and remaining != 0:
+            part = self.parts.popleft()
+
+            if isinstance(part, bytes):
+                data, rest = (
+                    (part, b"")
+                    if remaining < 0
+                    else (part[:remaining], part[remaining:])
+                )
+                if rest:
+                    self.parts.appendleft(rest)
+            else:
+                start, length = part
+                to_read = length if remaining < 0 else min(length, remaining)
+                self.file.seek(start)
+                data = self.file.read(to_read)
+                if not data:
+                    break
+                if len(data) < length:
+                    self.parts.appendleft((start + len(data), length - len(data)))
+
+            chunks.append(data)
+            if remaining > 0:
+                remaining -= len(data)
+
+        return b"".join(chunks)
+
+    def close(self):
+        self.file.close()
+
+
+def get_media_signature(file_path: str, variant: dict, user_id, expires: int) -> str:
+    variant = "&".join(f"{param}={variant.get(param, '')}" for param in VARIANT_PARAMS)
+    value = f"{file_path}:{variant}:{user_id}:{expires}"
+    return salted_hmac(SIGNATURE_SALT, value, algorithm="sha256").hexdigest()
+
+
+def sign_media_path(file_path: str, user_id, variant: dict = None) -> dict:
+    """
+    Sign the media path for the user, so it can be served without authenticating
+    the request, see `MEDIA_SIGNED_URLS`.
+
+    Expiry times are rounded up to `MEDIA_SIGNED_URL_BUCKET`, so the signed URLs of
+    a file stay the same for that long and can be cached by clients.
+
+    Parameters:
+        file_path (str): The path of the media, which identifies the file.
+        user_id (UUID | str): The ID of the user granted access.
+        variant (dict): The `VARIANT_PARAMS` selecting the served media, e.g. the
+            thumbnail size, none for the file itself.
+
+    Returns:
+        dict: The query parameters to add to the media URL, including the variant.
+    """
+    variant = {param: str(value) for param, value in (variant or {}).items()}
+
+    bucket = settings.MEDIA_SIGNED_URL_BUCKET
+    expires = (
+        int(time.time()) // bucket + 1
+    ) * bucket + settings.MEDIA_SIGNED_URL_EXPIRE
+
+    return {
+        **variant,
+        "user": str(user_id),
+        "expires": expires,
+        "signature": get_media_signature(file_path, variant, user_id, expires),
+    }
+
+
+def verify_media_signature(file_path: str, query) -> tuple:
+    """
+    Verify the signature of the media path and variant, see `sign_media_path`.
+
+    Parameters:
+        file_path (str): The path of the media.
+        query (QueryDict): The query parameters of the request.
+
+    Returns:
+        tuple | None: The ID of the user granted access and the expiry timestamp,
+        or None if the signature is missing, invalid or expired.
+    """
+    user_id = query.get("user", "")
+    signature = query.get("signature", "")
+    variant = {param: query.get(param, "") for param in VARIANT_PARAMS}
+
+    try:
+        expires = int(query.get("expires", ""))
+    except ValueError:
+        return None
+
+    if not signature or expires < time.time():
+        return None
+
+    if not constant_time_compare(
+        signature, get_media_signature(file_path, variant, user_id, expires)
+    ):
+        return None
+
+    return user_id, expires
+
+
+def get_media_etag(name: str, updated_at) -> str:
+    value = f"{name}:{updated_at.timestamp()}".encode()
+    return f'"{hashlib.md5(value, usedforsecurity=False).hexdigest()}"'
+
+
+def parse_range_header(header: str, size: int):
+    """
+    Parse the `Range` header against the file size.
+
+    Parameters:
+        header (str): The value of the `Range` header.
+        size (int): The size of the file in bytes.
+
+    Returns:
+        list | None: A list of `(start, end)` tuples with inclusive bounds, an empty
+        list if none of the ranges can be satisfied, or None if the header is
+        malformed and should be ignored.
+    """
+    unit, _, ranges_spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or not ranges_spec:
+        return None
+
+    ranges = []
+    for spec in ranges_spec.split(","):
+        match = RANGE_RE.match(spec)
+        if not match:
+            return None
+
+        start, end = match.groups()
+        if not start and not end:
+            return None
+
+        if not start:
+            # Suffix range, e.g. `bytes=-500` for the last 500 bytes
+            length = int(end)
+            if length == 0:
+                continue
+            ranges.append((max(size - length, 0), size - 1))
+            continue
+
+        start = int(start)
+        end = int(end) if end else size - 1
+        if start > end:
+            return None
+        if start >= size:
+            continue
+        ranges.append((start, min(end, size - 1)))
+
+    if len(ranges) > MAX_RANGES:
+        return None
+
+    return ranges
+
+
+def is_range_continuation(request) -> bool:
+    """
+    Check if the request only asks for a later part of the file, e.g. when the media
+    player is seeking, so it should not be treated as a new download.
+    """
+    header = request.headers.get("Range")
+    if not header:
+        return False
+
+    _, _, ranges_spec = header.partition("=")
+    return not ranges_spec.strip().startswith("0-")
+
+
+def _if_range_passes(request, etag: str, last_modified: int) -> bool:
+    if_range = request.headers.get("If-Range")
+    if not if_range:
+        return True
+
+    if if_range.startswith(('"', "W/")):
+        return not if_range.startswith("W/") and if_range == etag
+
+    try:
+        return parse_http_date(if_range) == last_modified
+    except ValueError:
+        return False
+
+
+def _get_offload_response(storage: Storage, name: str, content_type: str):
+    response = HttpResponse(content_type=content_type)
+
+    if settings.MEDIA_OFFLOAD == "x-accel-redirect":
+        response.headers["X-Accel-Redirect"] = settings.MEDIA_OFFLOAD_PREFIX + name
+    elif settings.MEDIA_OFFLOAD == "x-sendfile":
+        response.headers["X-Sendfile"] = storage.path(name)
+    else:
+        raise ValueError(f"Unknown MEDIA_OFFLOAD value: {settings.MEDIA_OFFLOAD}")
+
+    return response
+
+
+def _get_range_response(storage: Storage, name: str, ranges: list, content_type: str):
+    size = storage.size(name)
+
+    if len(ranges) == 1:
+        start, end = ranges[0]
+        length = end - start + 1
+
+        response = FileResponse(
+            RangeReader(storage.open(name, "rb"), [(start, length)]),
+            status=206,
+            content_type=content_type,
+        )
+        response.headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        response.headers["Content-Length"] = str(length)
+        return response
+
+    boundary = uuid.uuid4().hex
+    parts = []
+    length = 0
+    for start, end in ranges:
+        header = (
+            f"\r\n--{boundary}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Range: bytes {start}-{end}/{size}\r\n\r\n"
+        ).encode()
+        parts += [header, (start, end - start + 1)]
+        length += len(header) + end - start + 1
+
+    closing = f"\r\n--{boundary}--\r\n".encode()
+    parts.append(closing)
+    length += len(closing)
+
+    response = FileResponse(
+        RangeReader(storage.open(name, "rb"), parts),
+        status=206,
+        content_type=f"multipart/byteranges; boundary={boundary}",
+    )
+    response.headers["Content-Length"] = str(length)
+    return response
+
+
+def serve_media(
+    request,
+    storage: Storage,
+    name: str,
+    *,
+    etag: str,
+    last_modified: int,
+    max_age: int = None,
+):
+    """
+    Build the response serving the given media file.
+
+    Handles conditional requests (`If-None-Match`, `If-Modified-Since`), byte range
+    requests (`Range`, `If-Range`), and, if `MEDIA_OFFLOAD` is set, hands the
+    transfer over to the web server instead of streaming the file from Python.
+
+    Parameters:
+        request (HttpRequest): The HTTP request object.
+        storage (Storage): The storage backend holding the file.
+        name (str): The name of the file in the storage.
+        etag (str): The quoted entity tag of the file.
+        last_modified (int): The modification time of the file as a timestamp.
+        max_age (int | None): How long shared caches may keep the response, only
+        for signed URLs. Otherwise, it is private and revalidated on every use,
+        since the access may be revoked at any time.
+
+    Returns:
+        HttpResponse: The response for the request.
+    """
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+
+    if response is None:
+        content_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+
+        ranges = None
+        range_header = request.headers.get("Range")
+        if (
+            range_header
+            and not settings.MEDIA_OFFLOAD
+            and _if_range_passes(request, etag, last_modified)
+        ):
+            ranges = parse_range_header(range_header, storage.size(name))
+
+        if settings.MEDIA_OFFLOAD:
+            response = _get_offload_response(storage, name, content_type)
+        elif ranges == []:
+            response = HttpResponse(status=416)
+            response.headers["Content-Range"] = f"bytes */{storage.size(name)}"
+        elif ranges:
+            response = _get_range_response(storage, name, ranges, content_type)
+        else:
+            response = FileResponse(storage.open(name, "rb"), content_type=content_type)
+
+        response.headers["Content-Disposition"] = content_disposition_header(
+            False, name
+        )
+        response.headers["Accept-Ranges"] = "bytes"
+
+    response.headers["ETag"] = etag
+    response.headers["Last-Modified"] = http_date(last_modified)
+    # Errors, e.g. unsatisfiable ranges, must not be cached like the content
+    if response.status_code in CACHEABLE_STATUSES:
+        if max_age is None:
+            response.headers["Cache-Control"] = "private, no-cache"
+        else:
+            response.headers["Cache-Control"] = f"public, max-age={max_age}"
+
+    return response
+
+
+def redirect_media(storage: Storage, name: str):
+    """
+    Build the response redirecting to a presigned URL of the media file, so it is
+    transferred directly from the object storage instead of through Python.
+
+    Parameters:
+        storage (Storage): The storage backend holding the file.
+        name (str): The name of the file in the storage.
+
+    Returns:
+        HttpResponse | None: The redirect, or None if the storage does not support
+        presigned URLs.
+    """
+    expire = settings.MEDIA_PRESIGNED_URL_EXPIRE
+    url = get_download_url(storage, name, expire=expire)
+    if url is None:
+        return None
+
+    response = HttpResponseRedirect(url)
+    # Reused by the browser while the URL is still valid, never by shared caches
+    response.headers["Cache-Control"] = f"private, max-age={expire // 2}"
+    return response
+
+
+def get_transfer_size(request, response, size: int) -> int:
+    """
+    Get the number of bytes the client receives for the media response.
+
+    Parameters:
+        request (HttpRequest): The HTTP request object.
+        response (HttpResponse): The response built for the request.
+        size (int): The size of the file, used when the transfer is left to the
+            web server or the object storage.
+
+    Returns:
+        int: The number of bytes of the file in the response.
+    """
+    if response.status_code not in (200, 206, 302):
+        return 0
+
+    if response.streaming and "Content-Length" in response.headers:
+        return int(response.headers["Content-Length"])
+
+    ranges = parse_range_header(request.headers.get("Range", ""), size)
+    if ranges:
+        return sum(end - start + 1 for start, end in ranges)
+    return size
+
+
+def discard_media(response):
+    """
+    Close the file opened for the media response that is not returned, without
+    sending `request_finished` like `response.close()` does.
+    """
+    # Registered when the file was set, it may have been replaced by an iterator
+    for closer in response._resource_closers:
+        closer()
+    response._resource_closers.clear()
+
+
+def limit_media_rate(identities: dict, size: int):
+    """
+    Take a request and the transferred bytes from the token buckets of the client,
+    with the policies of `MEDIA_RATE_LIMITS`.
+
+    The limiter fails open, so media is still served while Redis is unavailable.
+
+    Parameters:
+        identities (dict): The identities of the client by the scope of the policy
+            limiting them, e.g. the share token and IP address.
+        size (int): The number of bytes transferred by the response.
+
+    Returns:
+        HttpResponse | None: The response to return if a limit is exceeded,
+        otherwise None.
+    """
+    buckets = []
+    for scope, identity in identities.items():
+        policy = settings.MEDIA_RATE_LIMITS.get(scope)
+        if not policy or identity is None:
+            continue
+
+        for kind, cost, debt in (("requests", 1, False), ("bytes", size, True)):
+            if limit := policy.get(kind):
+                key = f"ratelimit:media:{scope}:{kind}:{identity}"
+                buckets.append(Bucket(key, limit["rate"], limit["burst"], cost, debt))
+
+    if not buckets:
+        return None
+
+    try:
+        retry_after = consume_tokens(buckets)
+    except RedisError:
+        logger.warning("Media rate limiting unavailable", exc_info=True)
+        return None
+
+    if not retry_after:
+        return None
+
+    response = HttpResponse("Too many requests.", status=429)
+    response.headers["Retry-After"] = str(retry_after)
+    return response
+
+
+async def _aiter_file(file, block_size: int):
+    read = sync_to_async(file.read, thread_sensitive=False)
+    while data := await read(block_size):
+        yield data
+
+
+async def aserve_media(
+    request,
+    storage: Storage,
+    name: str,
+    *,
+    etag: str,
+    last_modified: int,
+    max_age: int = None,
+):
+    """
+    Async version of `serve_media`.
+
+    The file is read one block at a time in the default executor, so no thread is
+    held while the client receives the data.
+    """
+    response = await sync_to_async(serve_media, thread_sensitive=False)(
+        request,
+        storage,
+        name,
+        etag=etag,
+        last_modified=last_modified,
+        max_age=max_age,
+    )
+
+    if isinstance(response, FileResponse):
+        # The file stays registered to be closed along with the response
+        response.streaming_content = _aiter_file(
+            response.file_to_stream, ASYNC_BLOCK_SIZE
+        )
+
+    return response
@@ -0,0 +1,105 @@
+# Generated by Django 5.0 on 2026-10-18 09:31
+
+import uuid
+
+import django.contrib.postgres.fields
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("storage", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UploadSession",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        primary_key=True,
+                        serialize=False,
+                        unique=True,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("name", models.CharField(max_length=512)),
+                (
+                    "description",
+                    models.CharField(blank=True, max_length=1024, null=True),
+                ),
+                (
+                    "tags",
+                    django.contrib.postgres.fields.ArrayField(
+                        base_field=models.CharField(
+                            blank=True, max_length=16, null=True
+                        ),
+                        blank=True,
+                        null=True,
+                        size=6,
+                    ),
+                ),
+                (
+                    "content_type",
+                    models.CharField(blank=True, max_length=255, null=True),
+                ),
+                ("size", models.PositiveBigIntegerField()),
+                ("chunk_size", models.PositiveIntegerField()),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[("pending", "pending"), ("completed", "completed")],
+                        default="pending",
+                    ),
+                ),
+                ("expires_at", models.DateTimeField()),
+                (
+                    "file",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        to="storage.file",
+                    ),
+                ),
+                (
+                    "group",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        to="storage.group",
+                    ),
+                ),
+                (
+                    "owner",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-created_at"],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="uploadsession",
+            constraint=models.CheckConstraint(
+                check=models.Q(("size__gt", 0)), name="storage_uploadsession_size_valid"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="uploadsession",
+            constraint=models.CheckConstraint(
+                check=models.Q(("status__in", ["pending", "completed"])),
+                name="storage_uploadsession_status_valid",
+            ),
+        ),
+    ]
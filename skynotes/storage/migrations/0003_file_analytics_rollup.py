@@ -0,0 +1,76 @@
+# Generated by Django 5.0 on 2026-10-18 09:42
+
+import uuid
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("storage", "0002_upload_session"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FileAnalyticsRollupCheckpoint",
+            fields=[
+                (
+                    "name",
+                    models.CharField(max_length=64, primary_key=True, serialize=False),
+                ),
+                ("processed_until", models.DateTimeField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name="FileAnalyticsRollup",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        primary_key=True,
+                        serialize=False,
+                        unique=True,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "period",
+                    models.CharField(
+                        choices=[("hour", "hour"), ("day", "day")], max_length=8
+                    ),
+                ),
+                ("bucket", models.DateTimeField()),
+                ("hits", models.PositiveBigIntegerField(default=0)),
+                ("ips_sketch", models.BinaryField()),
+                ("referers", models.JSONField(default=dict)),
+                ("user_agents", models.JSONField(default=dict)),
+                (
+                    "file_share",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="storage.fileshare",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-bucket"],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="fileanalyticsrollup",
+            constraint=models.UniqueConstraint(
+                fields=("file_share", "period", "bucket"),
+                name="storage_fileanalyticsrollup_unique_bucket",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="fileanalyticsrollup",
+            constraint=models.CheckConstraint(
+                check=models.Q(("period__in", ["hour", "day"])),
+                name="storage_fileanalyticsrollup_period_valid",
+            ),
+        ),
+    ]
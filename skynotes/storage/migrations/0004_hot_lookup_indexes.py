@@ -0,0 +1,73 @@
+# Generated by Django 5.0 on 2026-10-18 09:50
+
+import django.db.models.deletion
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Build the indexes without locking the tables against writes, and only then
+    # drop the foreign key indexes they make redundant
+    atomic = False
+
+    dependencies = [
+        ("storage", "0003_file_analytics_rollup"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="file",
+            index=models.Index(
+                fields=["owner", "group", "-created_at", "-id"],
+                name="storage_file_listing_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="file",
+            index=models.Index(
+                condition=models.Q(("group__isnull", True)),
+                fields=["owner", "-created_at", "-id"],
+                name="storage_file_ungrouped_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="fileanalytics",
+            index=models.Index(
+                fields=["file_share", "-created_at"], name="storage_analytics_share_idx"
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="fileanalytics",
+            index=models.Index(
+                fields=["created_at"], name="storage_analytics_created_idx"
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="fileshare",
+            index=models.Index(
+                condition=models.Q(("is_active", True)),
+                fields=["file", "token"],
+                name="storage_share_active_idx",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="file",
+            name="owner",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="fileanalytics",
+            name="file_share",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                to="storage.fileshare",
+            ),
+        ),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 5.0 on 2026-10-18 10:00
+
+import uuid
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("storage", "0004_hot_lookup_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Thumbnail",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        primary_key=True,
+                        serialize=False,
+                        unique=True,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("size", models.PositiveSmallIntegerField()),
+                (
+                    "format",
+                    models.CharField(
+                        choices=[("png", "png"), ("webp", "webp"), ("avif", "avif")],
+                        max_length=8,
+                    ),
+                ),
+                ("width", models.PositiveSmallIntegerField()),
+                ("height", models.PositiveSmallIntegerField()),
+                ("image", models.FileField(upload_to="")),
+                (
+                    "file",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="thumbnails",
+                        to="storage.file",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["size"],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="thumbnail",
+            constraint=models.UniqueConstraint(
+                fields=("file", "size", "format"),
+                name="storage_thumbnail_unique_rendition",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="thumbnail",
+            constraint=models.CheckConstraint(
+                check=models.Q(("format__in", ["png", "webp", "avif"])),
+                name="storage_thumbnail_format_valid",
+            ),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.0 on 2026-10-18 10:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("storage", "0007_storage_deletion"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="uploadsession",
+            name="sha256",
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0 on 2026-10-18 10:55
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("storage", "0008_uploadsession_sha256"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="fileanalytics",
+            name="created_at",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
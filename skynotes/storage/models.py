@@ -1,9 +1,13 @@
 import uuid
 
+from common.hyperloglog import HyperLogLog
 from django.contrib.auth import get_user_model
 from django.contrib.postgres.fields import ArrayField
 from django.core.files.base import ContentFile
-from django.db import models
+from django.db import models, transaction
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from storage.thumbnails import render_thumbnails
 
 User = get_user_model()
 
@@ -29,6 +33,22 @@ class IconChoices(models.TextChoices):
     ARCHIVE = "archive", "archive"
 
 
+class GroupQuerySet(models.QuerySet):
+    def with_files_stats(self):
+        """
+        Annotate the groups with `files_count` and `files_size` of their files, so
+        listing groups takes a single query instead of two more per group.
+        """
+        files = File.objects.filter(group=models.OuterRef("pk")).order_by()
+        files_count = files.values("group").annotate(count=models.Count("id"))
+        files_size = files.values("group").annotate(size=models.Sum("size"))
+
+        return self.annotate(
+            files_count=Coalesce(models.Subquery(files_count.values("count")), 0),
+            files_size=models.Subquery(files_size.values("size")),
+        )
+
+
 class Group(BaseModel):
     name = models.CharField(max_length=128)
     icon = models.CharField(choices=IconChoices.choices, default="default")
@@ -36,6 +56,8 @@ class Group(BaseModel):
 
     owner = models.ForeignKey(User, on_delete=models.CASCADE)
 
+    objects = GroupQuerySet.as_manager()
+
     class Meta:
         ordering = ["name"]
         constraints = [
@@ -49,6 +71,22 @@ class Group(BaseModel):
         return self.name
 
 
+class Blob(models.Model):
+    """
+    Content stored once per distinct SHA-256 digest and shared by all files with
+    the same content. Deleted with its content once no file references it.
+    """
+
+    hash = models.CharField(max_length=64, primary_key=True)
+    file = models.FileField(max_length=255)
+    size = models.PositiveBigIntegerField()  # in bytes
+    references = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"<{self.__class__.__name__} hash={self.hash}>"
+
+
 class File(BaseModel):
     group = models.ForeignKey(Group, on_delete=models.SET_NULL, blank=True, null=True)
     name = models.CharField(max_length=512)
@@ -61,12 +99,31 @@ class File(BaseModel):
         null=True,
     )
 
-    file = models.FileField()
+    file = models.FileField(max_length=255)
+    # Files uploaded before content-addressed storage own their content instead
+    blob = models.ForeignKey(
+        Blob, on_delete=models.PROTECT, blank=True, null=True, related_name="files"
+    )
     size = models.PositiveBigIntegerField()  # in bytes
-    owner = models.ForeignKey(User, on_delete=models.CASCADE)
+    # Indexed as the prefix of `storage_file_listing_idx`
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, db_index=False)
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # Listing files of the user or one of their groups, see `FilesListView`
+            models.Index(
+                name="storage_file_listing_idx",
+                fields=["owner", "group", "-created_at", "-id"],
+            ),
+            # `group IS NULL` does not fix the order of the index above, so files
+            # without a group would have to be sorted
+            models.Index(
+                name="storage_file_ungrouped_idx",
+                fields=["owner", "-created_at", "-id"],
+                condition=models.Q(group__isnull=True),
+            ),
+        ]
         constraints = [
             models.CheckConstraint(
                 name="%(app_label)s_%(class)s_size_valid",
@@ -78,8 +135,125 @@ class File(BaseModel):
         self.file.save(f"{self.id}{extension}", content)
 
     def save_thumbnail(self, content: ContentFile):
+        """
+        Save the thumbnail along with all of its renditions, see `THUMBNAIL_SIZES`
+        and `THUMBNAIL_FORMATS`.
+        """
+        renditions = render_thumbnails(content.read())
+        content.seek(0)
+        self._save_thumbnails(content, renditions)
+
+    def copy_thumbnails(self, source: "File"):
+        """
+        Copy the thumbnail and renditions of a file with the same content, which is
+        much cheaper than generating them again.
+        """
+        renditions = []
+        for thumbnail in source.thumbnails.all():
+            with thumbnail.image.open("rb") as f:
+                data = f.read()
+            renditions.append(
+                (
+                    thumbnail.size,
+                    thumbnail.format,
+                    thumbnail.width,
+                    thumbnail.height,
+                    data,
+                )
+            )
+
+        with source.thumbnail.open("rb") as f:
+            self._save_thumbnails(ContentFile(f.read()), renditions)
+
+    @transaction.atomic
+    def _save_thumbnails(self, content: ContentFile, renditions: list):
+        self.delete_thumbnails()
+
+        thumbnails = []
+        for size, thumbnail_format, width, height, data in renditions:
+            thumbnail = Thumbnail(
+                file=self,
+                size=size,
+                format=thumbnail_format,
+                width=width,
+                height=height,
+            )
+            thumbnail.image.save(
+                f"{self.id}_thumb_{size}.{thumbnail_format}",
+                ContentFile(data),
+                save=False,
+            )
+            thumbnails.append(thumbnail)
+        Thumbnail.objects.bulk_create(thumbnails)
+
+        # Saved last, so the cached metadata is invalidated after the renditions exist
         self.thumbnail.save(f"{self.id}_thumb.png", content)
 
+    def delete_thumbnails(self):
+        """
+        Delete the thumbnail and its renditions. The stored images are deleted
+        later, see `StorageDeletion`.
+        """
+        self.thumbnails.all().delete()
+
+        if self.thumbnail:
+            StorageDeletion.objects.enqueue([self.thumbnail.name])
+            self.thumbnail = None
+
+
+class StorageDeletionQuerySet(models.QuerySet):
+    def enqueue(self, names):
+        return self.bulk_create([self.model(name=name) for name in names if name])
+
+
+class StorageDeletion(models.Model):
+    """
+    Outbox of stored files to delete, written in the same transaction as the rows
+    referencing them are deleted, so a failure in between cannot leave orphans.
+    Processed in the background by `StorageService.process_deletions`.
+    """
+
+    name = models.CharField(max_length=255)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = StorageDeletionQuerySet.as_manager()
+
+    class Meta:
+        ordering = ["id"]
+
+
+class ThumbnailFormat(models.TextChoices):
+    PNG = "png", "png"
+    WEBP = "webp", "webp"
+    AVIF = "avif", "avif"
+
+
+class Thumbnail(BaseModel):
+    """
+    A rendition of the thumbnail of a file, scaled to fit a square of `size` pixels.
+    """
+
+    file = models.ForeignKey(File, on_delete=models.CASCADE, related_name="thumbnails")
+    size = models.PositiveSmallIntegerField()
+    format = models.CharField(max_length=8, choices=ThumbnailFormat.choices)
+    width = models.PositiveSmallIntegerField()
+    height = models.PositiveSmallIntegerField()
+    image = models.FileField()
+
+    class Meta:
+        ordering = ["size"]
+        constraints = [
+            models.UniqueConstraint(
+                name="%(app_label)s_%(class)s_unique_rendition",
+                fields=["file", "size", "format"],
+            ),
+            models.CheckConstraint(
+                name="%(app_label)s_%(class)s_format_valid",
+                check=models.Q(format__in=ThumbnailFormat.values),
+            ),
+        ]
+
 
 class FileShare(BaseModel):
     file = models.ForeignKey(File, on_delete=models.CASCADE)
@@ -90,6 +264,13 @@ class FileShare(BaseModel):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                name="storage_share_active_idx",
+                fields=["file", "token"],
+                condition=models.Q(is_active=True),
+            ),
+        ]
         constraints = [
             models.CheckConstraint(
                 name="%(app_label)s_%(class)s_shared_until_valid",
@@ -99,13 +280,24 @@ class FileShare(BaseModel):
 
 
 class FileAnalytics(BaseModel):
-    file_share = models.ForeignKey(FileShare, on_delete=models.CASCADE)
+    # Indexed as the prefix of `storage_analytics_share_idx`
+    file_share = models.ForeignKey(FileShare, on_delete=models.CASCADE, db_index=False)
     ip = models.GenericIPAddressField()
     user_agent = models.CharField(max_length=512, blank=True, null=True)
     referer = models.URLField(blank=True, null=True)
+    # Set to the time of the download by `flush_file_analytics`
+    created_at = models.DateTimeField(default=timezone.now)
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                name="storage_analytics_share_idx",
+                fields=["file_share", "-created_at"],
+            ),
+            # Reading new rows into the rollups, see `rollup_file_analytics`
+            models.Index(name="storage_analytics_created_idx", fields=["created_at"]),
+        ]
         constraints = [
             models.CheckConstraint(
                 name="%(app_label)s_%(class)s_ip_valid",
@@ -116,3 +308,109 @@ class FileAnalytics(BaseModel):
                 check=models.Q(user_agent__isnull=False),
             ),
         ]
+
+
+class AnalyticsPeriod(models.TextChoices):
+    HOUR = "hour", "hour"
+    DAY = "day", "day"
+
+
+class FileAnalyticsRollup(BaseModel):
+    """
+    Analytics of a share aggregated over an hour or a day, maintained incrementally
+    from `FileAnalytics` rows by the `rollup_file_analytics` task.
+    """
+
+    file_share = models.ForeignKey(FileShare, on_delete=models.CASCADE)
+    period = models.CharField(choices=AnalyticsPeriod.choices, max_length=8)
+    bucket = models.DateTimeField()  # start of the period
+
+    hits = models.PositiveBigIntegerField(default=0)
+    ips_sketch = models.BinaryField()  # HyperLogLog sketch of the client IPs
+    referers = models.JSONField(default=dict)  # top referers with their hits
+    user_agents = models.JSONField(default=dict)  # top user agents with their hits
+
+    class Meta:
+        ordering = ["-bucket"]
+        constraints = [
+            models.UniqueConstraint(
+                name="%(app_label)s_%(class)s_unique_bucket",
+                fields=["file_share", "period", "bucket"],
+            ),
+            models.CheckConstraint(
+                name="%(app_label)s_%(class)s_period_valid",
+                check=models.Q(period__in=AnalyticsPeriod.values),
+            ),
+        ]
+
+    @property
+    def unique_ips(self) -> int:
+        return HyperLogLog.from_bytes(self.ips_sketch).count()
+
+
+class FileAnalyticsRollupCheckpoint(models.Model):
+    """
+    Point in time up to which `FileAnalytics` rows have been added to the rollups.
+    """
+
+    name = models.CharField(max_length=64, primary_key=True)
+    processed_until = models.DateTimeField()
+
+
+class UploadSessionStatus(models.TextChoices):
+    PENDING = "pending", "pending"
+    COMPLETED = "completed", "completed"
+
+
+class UploadSession(BaseModel):
+    group = models.ForeignKey(Group, on_delete=models.SET_NULL, blank=True, null=True)
+    name = models.CharField(max_length=512)
+    description = models.CharField(max_length=1024, blank=True, null=True)
+    tags = ArrayField(
+        models.CharField(max_length=16, null=True, blank=True),
+        size=6,
+        blank=True,
+        null=True,
+    )
+    content_type = models.CharField(max_length=255, blank=True, null=True)
+    # Hex digest announced by the client, required for direct uploads
+    sha256 = models.CharField(max_length=64, blank=True, null=True)
+
+    size = models.PositiveBigIntegerField()  # in bytes, reserved at init time
+    chunk_size = models.PositiveIntegerField()  # in bytes
+    status = models.CharField(
+        choices=UploadSessionStatus.choices, default=UploadSessionStatus.PENDING
+    )
+    expires_at = models.DateTimeField()
+
+    file = models.ForeignKey(File, on_delete=models.SET_NULL, blank=True, null=True)
+    owner = models.ForeignKey(User, on_delete=models.CASCADE)
+
+    class Meta:
+        ordering = ["-created_at"]
+        constraints = [
+            models.CheckConstraint(
+                name="%(app_label)s_%(class)s_size_valid",
+                check=models.Q(size__gt=0),
+            ),
+            models.CheckConstraint(
+                name="%(app_label)s_%(class)s_status_valid",
+                check=models.Q(status__in=UploadSessionStatus.values),
+            ),
+        ]
+
+    @property
+    def chunks_count(self) -> int:
+        return -(-self.size // self.chunk_size)
+
+    def get_chunk_length(self, index: int) -> int:
+        """
+        Get the expected length of the chunk with the given index.
+
+        Parameters:
+            index (int): The zero-based index of the chunk.
+
+        Returns:
+            int: The number of bytes the chunk has to contain.
+        """
+        return min(self.chunk_size, self.size - index * self.chunk_size)
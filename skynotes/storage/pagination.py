@@ -0,0 +1,105 @@
+import uuid
+from base64 import b64decode, b64encode
+from datetime import datetime
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, CursorPagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class FileAnalyticsRollupPagination(CursorPagination):
+    ordering = "-bucket"
+    page_size = 48
+    page_size_query_param = "page_size"
+    max_page_size = 744  # a month of hourly rollups
+
+
+class FileCursorPagination(BasePagination):
+    """
+    Keyset pagination over `(created_at, id)`, the order files are listed in.
+
+    The cursor holds the position of the last file of the page, so every page is
+    read with a single index range scan, however deep into the listing it is.
+    """
+
+    cursor_query_param = "cursor"
+    page_size = 100
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+    ordering = ("-created_at", "-id")
+
+    def is_requested(self, request) -> bool:
+        return (
+            self.cursor_query_param in request.query_params
+            or self.page_size_query_param in request.query_params
+        )
+
+    def get_page_size(self, request) -> int:
+        try:
+            return _positive_int(
+                request.query_params[self.page_size_query_param],
+                strict=True,
+                cutoff=self.max_page_size,
+            )
+        except (KeyError, ValueError):
+            return self.page_size
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+
+        try:
+            created_at, _, file_id = (
+                b64decode(encoded.encode(), validate=True).decode().partition("|")
+            )
+            return datetime.fromisoformat(created_at), uuid.UUID(file_id)
+        except (TypeError, ValueError):
+            raise NotFound("Invalid cursor")
+
+    def encode_cursor(self, file) -> str:
+        return b64encode(f"{file.created_at.isoformat()}|{file.id}".encode()).decode()
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+
+        queryset = queryset.order_by(*self.ordering)
+
+        cursor = self.decode_cursor(request)
+        if cursor:
+            created_at, file_id = cursor
+            queryset = queryset.filter(
+                Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=file_id)
+            )
+
+        page = list(queryset[: page_size + 1])
+        self.has_next = len(page) > page_size
+        self.page = page[:page_size]
+
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.cursor_query_param,
+            self.encode_cursor(self.page[-1]),
+        )
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "results": data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
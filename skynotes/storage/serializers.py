@@ -1,6 +1,22 @@
+import os
+import re
+from urllib.parse import urlencode
+
+from django.conf import settings
 from django.db import models
+from django.urls import reverse
 from rest_framework import serializers
-from storage.models import File, FileAnalytics, FileShare, Group
+from storage.media import sign_media_path
+from storage.models import (
+    AnalyticsPeriod,
+    File,
+    FileAnalytics,
+    FileAnalyticsRollup,
+    FileShare,
+    Group,
+    UploadSession,
+)
+from storage.services import UploadSessionService
 
 
 class GroupSerializer(serializers.ModelSerializer):
@@ -28,6 +44,8 @@ class GroupDetailsSerializer(GroupSerializer):
         Returns:
             int: The total count of files associated with the group.
         """
+        if hasattr(obj, "files_count"):
+            return obj.files_count
         return File.objects.filter(group=obj.id).count()
 
     def get_files_size(self, obj: Group) -> int:
@@ -40,6 +58,8 @@ class GroupDetailsSerializer(GroupSerializer):
         Returns:
             int: The total size of files associated with the group, in bytes.
         """
+        if hasattr(obj, "files_size"):
+            return obj.files_size
         total_sum = File.objects.filter(group=obj.id).aggregate(models.Sum("size"))
         return total_sum["size__sum"]
 
@@ -67,6 +87,64 @@ class FileSerializer(serializers.ModelSerializer):
             "thumbnail",
         ]
 
+    def __init__(self, *args, fields: list = None, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        if fields:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+    @classmethod
+    def parse_fields(cls, value: str):
+        """
+        Parse the comma separated sparse fieldset requested with `?fields=`.
+
+        Returns:
+            list | None: The requested fields, or None if all fields are requested.
+
+        Raises:
+            ValidationError: If any of the fields is unknown.
+        """
+        if not value:
+            return None
+
+        fields = [field.strip() for field in value.split(",") if field.strip()]
+        unknown = set(fields) - set(cls.Meta.fields)
+        if unknown:
+            raise serializers.ValidationError(
+                {"fields": [f"Unknown fields: {', '.join(sorted(unknown))}"]}
+            )
+
+        return fields
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+
+        # Stored names are shared by duplicates, so media is addressed by file ID
+        if data.get("file"):
+            _, extension = os.path.splitext(instance.file.name)
+            data["file"] = self._get_media_url(instance, f"{instance.id}{extension}")
+        if data.get("thumbnail"):
+            data["thumbnail"] = self._get_media_url(
+                instance,
+                f"{instance.id}_thumb.png",
+                {"thumbnail": settings.THUMBNAIL_URL_SIZE},
+            )
+
+        return data
+
+    def _get_media_url(self, instance: File, file_path: str, variant: dict = None):
+        url = reverse("media", kwargs={"file_path": file_path})
+        # Files are only serialized for their owners
+        if settings.MEDIA_SIGNED_URLS:
+            url += "?" + urlencode(
+                sign_media_path(file_path, instance.owner_id, variant)
+            )
+        elif variant:
+            url += "?" + urlencode(variant)
+        request = self.context.get("request")
+        return request.build_absolute_uri(url) if request else url
+
     def _get_file_ext(self, name: str):
         return name.split(".")[-1]
 
@@ -97,6 +175,36 @@ class FileSerializer(serializers.ModelSerializer):
         return super().save(**kwargs)
 
 
+class FileBulkSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.UUIDField(),
+        allow_empty=False,
+        max_length=settings.FILE_BULK_MAX_SIZE,
+    )
+
+
+class FileBulkMoveSerializer(FileBulkSerializer):
+    group = serializers.PrimaryKeyRelatedField(
+        queryset=Group.objects.all(), allow_null=True
+    )
+
+    def validate_group(self, value):
+        request = self.context.get("request")
+        if value and request and value.owner != request.user:
+            raise serializers.ValidationError("Group does not exist.")
+        return value
+
+
+class FileBulkTagsSerializer(FileBulkSerializer):
+    tags = serializers.ListField(
+        child=serializers.CharField(max_length=16), max_length=6
+    )
+
+
+class FileBulkResultSerializer(serializers.Serializer):
+    count = serializers.IntegerField(read_only=True)
+
+
 class FileShareSerializer(serializers.ModelSerializer):
     class Meta:
         model = FileShare
@@ -145,3 +253,103 @@ class FileAnalyticsSerializer(serializers.ModelSerializer):
             "user_agent",
             "referer",
         ]
+
+
+class FileAnalyticsRollupSerializer(serializers.ModelSerializer):
+    unique_ips = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = FileAnalyticsRollup
+        fields = [
+            "period",
+            "bucket",
+            "hits",
+            "unique_ips",
+            "referers",
+            "user_agents",
+        ]
+        read_only_fields = fields
+
+
+class FileAnalyticsRollupFilterSerializer(serializers.Serializer):
+    period = serializers.ChoiceField(
+        choices=AnalyticsPeriod.choices, default=AnalyticsPeriod.HOUR
+    )
+    since = serializers.DateTimeField(required=False)
+    until = serializers.DateTimeField(required=False)
+
+    def validate(self, attrs):
+        since, until = attrs.get("since"), attrs.get("until")
+        if since and until and since >= until:
+            raise serializers.ValidationError("`since` must be earlier than `until`.")
+        return attrs
+
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    received_chunks = serializers.SerializerMethodField()
+    upload = serializers.SerializerMethodField()
+
+    class Meta:
+        model = UploadSession
+        fields = [
+            "id",
+            "created_at",
+            "updated_at",
+            "name",
+            "group",
+            "description",
+            "tags",
+            "content_type",
+            "size",
+            "chunk_size",
+            "status",
+            "expires_at",
+            "file",
+            "received_chunks",
+            "sha256",
+            "upload",
+        ]
+        read_only_fields = [
+            "id",
+            "created_at",
+            "updated_at",
+            "chunk_size",
+            "status",
+            "expires_at",
+            "file",
+            "received_chunks",
+            "upload",
+        ]
+
+    def get_received_chunks(self, obj: UploadSession) -> list[int]:
+        return UploadSessionService.get_received_chunks(obj)
+
+    def get_upload(self, obj: UploadSession) -> dict | None:
+        return UploadSessionService.get_direct_upload(obj)
+
+    def validate_sha256(self, value):
+        if value and not re.fullmatch(r"[0-9a-f]{64}", value):
+            raise serializers.ValidationError(
+                "SHA-256 digest has to be 64 lowercase hex characters."
+            )
+        return value
+
+    def validate_size(self, value):
+        if value <= 0:
+            raise serializers.ValidationError("Size has to be greater than 0.")
+        return value
+
+    def validate_group(self, value):
+        request = self.context.get("request")
+        if value and request and value.owner != request.user:
+            raise serializers.ValidationError("Group does not exist.")
+        return value
+
+    def validate(self, attrs):
+        for key in attrs:
+            if attrs[key] == "":
+                attrs[key] = None
+            if attrs[key] == [""]:
+                attrs[key] = []
+
+        return super().validate(attrs)
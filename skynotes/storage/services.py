@@ -1,26 +1,720 @@
-import base64
+import hashlib
+import json
+import logging
 import mimetypes
+import os
+import posixpath
+import shutil
+import tempfile
+import uuid
+from collections import Counter
+from contextvars import ContextVar
+from datetime import datetime
 
+from botocore.exceptions import BotoCoreError, ClientError
 from common.bus import bus
+from common.hyperloglog import HyperLogLog
+from common.redis_client import get_redis_client
 from common.service import Service
-from django.db.models import Q
-from storage.models import FileAnalytics, FileShare
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import UploadedFile
+from django.db import models, transaction
+from django.db.models import F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+from storage.backends import (
+    copy_file,
+    get_stored_sha256,
+    get_upload_request,
+    supports_presigned_urls,
+)
+from storage.cache import (
+    get_share_metadata,
+    invalidate_file_metadata,
+    invalidate_share_metadata,
+)
+from storage.models import (
+    AnalyticsPeriod,
+    Blob,
+    File,
+    FileAnalytics,
+    FileAnalyticsRollup,
+    FileAnalyticsRollupCheckpoint,
+    FileShare,
+    StorageDeletion,
+    Thumbnail,
+    UploadSession,
+    UploadSessionStatus,
+)
+
+User = get_user_model()
+
+logger = logging.getLogger(__name__)
+
+# Set while `FileService.bulk_delete` deletes files, which does the work of the
+# `post_delete` receivers once for all of them instead
+bulk_deletion = ContextVar("bulk_deletion", default=False)
 
 
 class FileService(Service):
     @staticmethod
     def guess_extension(mimetype: str):
-        return mimetypes.guess_extension(mimetype)
+        return mimetypes.guess_extension(mimetype) if mimetype else None
+
+    @staticmethod
+    def get_user_storage_size(user) -> int:
+        """
+        Calculate the storage used by the user from their files and the space
+        reserved by pending upload sessions.
+
+        This aggregates over all files of the user, so it is only meant for
+        reconciling `User.storage_used`, which is what quota checks read.
+        """
+        files_sum = File.objects.filter(owner=user).aggregate(models.Sum("size"))
+        reserved_sum = UploadSession.objects.filter(
+            owner=user, status=UploadSessionStatus.PENDING
+        ).aggregate(models.Sum("size"))
+
+        return (files_sum["size__sum"] or 0) + (reserved_sum["size__sum"] or 0)
+
+    @staticmethod
+    def reserve_storage(user_id, size: int) -> bool:
+        """
+        Add the size to the storage used by the user if it fits in their limit.
+
+        The check and the increment happen in a single `UPDATE`, so concurrent
+        uploads cannot exceed the limit together.
+
+        Parameters:
+            user_id (UUID): The ID of the user.
+            size (int): The number of bytes to reserve.
+
+        Returns:
+            bool: True if the storage was reserved, False if the limit was exceeded.
+        """
+        return bool(
+            User.objects.filter(
+                id=user_id, storage_used__lte=F("storage_limit") - size
+            ).update(storage_used=F("storage_used") + size)
+        )
+
+    @staticmethod
+    def release_storage(user_id, size: int):
+        User.objects.filter(id=user_id).update(
+            storage_used=Greatest(F("storage_used") - size, 0)
+        )
+
+    @staticmethod
+    def get_content_hash(content: UploadedFile) -> str:
+        hasher = hashlib.sha256()
+        for chunk in content.chunks():
+            hasher.update(chunk)
+        return hasher.hexdigest()
+
+    @staticmethod
+    def get_blob_name(digest: str, extension: str) -> str:
+        return f"blobs/{digest[:2]}/{digest}{extension}"
+
+    @staticmethod
+    def upload_file(file: File, content: UploadedFile, extension: str = None):
+        """
+        Store the uploaded content for the given file and notify listeners.
+
+        Content is stored once per SHA-256 digest, so the file only references the
+        blob of a duplicate. New content is handed to the storage backend as-is, so
+        it is written in chunks (or moved, if Django already spooled it to a
+        temporary file) and only the file id and extension travel on the
+        `file:created` event.
+        """
+        extension = extension or FileService.guess_extension(content.content_type) or ""
+        digest = getattr(content, "sha256", None) or FileService.get_content_hash(
+            content
+        )
+
+        with transaction.atomic():
+            # Locked, so the blob cannot be collected by a concurrent deletion
+            blob, created = Blob.objects.select_for_update().get_or_create(
+                hash=digest, defaults={"size": content.size}
+            )
+            if created:
+                blob.file.save(FileService.get_blob_name(digest, extension), content)
+            Blob.objects.filter(hash=digest).update(references=F("references") + 1)
+
+            file.blob = blob
+            file.file = blob.file.name
+            file.save(update_fields=["blob", "file", "updated_at"])
+
+        bus.emit("file:created", str(file.id), extension)
+
+    @staticmethod
+    def attach_blob(file: File, digest: str, extension: str, staged_name: str):
+        """
+        Reference the blob of content uploaded directly to the storage for the given
+        file, see `UploadSessionService.get_direct_upload`, and notify listeners.
+
+        The staged upload, whose digest has to be verified, is copied to the blob
+        name unless the blob already exists, and then deleted.
+        """
+        name = FileService.get_blob_name(digest, extension)
+
+        with transaction.atomic():
+            blob, created = Blob.objects.select_for_update().get_or_create(
+                hash=digest, defaults={"size": file.size, "file": name}
+            )
+            if created:
+                # A blob with the same content may have been collected before,
+                # whose pending deletion would remove the copy
+                StorageDeletion.objects.filter(name=name).delete()
+                copy_file(default_storage, staged_name, name)
+            StorageDeletion.objects.enqueue([staged_name])
+            Blob.objects.filter(hash=digest).update(references=F("references") + 1)
+
+            file.blob = blob
+            file.file = blob.file.name
+            file.save(update_fields=["blob", "file", "updated_at"])
+
+        bus.emit("file:created", str(file.id), extension)
+
+    @staticmethod
+    def release_blob(blob_id: str):
+        """
+        Drop a reference to the blob, deleting it along with its content once no
+        file references it.
+        """
+        with transaction.atomic():
+            Blob.objects.filter(hash=blob_id, references__gt=0).update(
+                references=F("references") - 1
+            )
+            blob = (
+                Blob.objects.select_for_update()
+                .filter(hash=blob_id, references=0)
+                .first()
+            )
+            if blob is None:
+                return
+
+            StorageDeletion.objects.enqueue([blob.file.name])
+            blob.delete()
+
+    @staticmethod
+    def release_blobs(blob_ids):
+        """
+        Recount the references of the blobs after their files were deleted, and
+        delete the blobs that are not referenced anymore along with their content.
+        """
+        references = (
+            File.objects.filter(blob=OuterRef("hash"))
+            .order_by()
+            .values("blob")
+            .annotate(count=models.Count("id"))
+            .values("count")
+        )
+        Blob.objects.filter(hash__in=blob_ids).update(
+            references=Coalesce(Subquery(references), 0)
+        )
+
+        unreferenced = Blob.objects.filter(hash__in=blob_ids, references=0)
+        StorageDeletion.objects.enqueue(unreferenced.values_list("file", flat=True))
+        unreferenced.delete()
+
+    @staticmethod
+    def bulk_update(owner, ids: list, **values) -> int:
+        """
+        Update the files of the owner with the given IDs in a single `UPDATE`.
+
+        Returns:
+            int: The number of updated files.
+        """
+        with transaction.atomic():
+            count = File.objects.filter(owner=owner, id__in=ids).update(
+                updated_at=timezone.now(), **values
+            )
+            # Media ETags are computed from the cached `updated_at`
+            transaction.on_commit(lambda: invalidate_file_metadata(*ids))
+
+        return count
+
+    @staticmethod
+    def bulk_delete(owner, ids: list) -> int:
+        """
+        Delete the files of the owner with the given IDs.
+
+        Each table is cleaned up with a single statement, and the storage used
+        and blob references are released once for all files. Stored content is
+        deleted in the background, see `StorageDeletion`.
+
+        Returns:
+            int: The number of deleted files.
+        """
+        with transaction.atomic():
+            files = list(
+                File.objects.filter(owner=owner, id__in=ids).values_list(
+                    "id", "size", "blob_id", "file", "thumbnail"
+                )
+            )
+            if not files:
+                return 0
+
+            file_ids = [file_id for file_id, *_ in files]
+            blob_ids = {blob_id for _, _, blob_id, _, _ in files if blob_id}
+            # Files uploaded before content-addressed storage own their content
+            names = [name for _, _, blob_id, name, _ in files if name and not blob_id]
+            names += [thumbnail for *_, thumbnail in files if thumbnail]
+            names += Thumbnail.objects.filter(file_id__in=file_ids).values_list(
+                "image", flat=True
+            )
+            tokens = list(
+                FileShare.objects.filter(file_id__in=file_ids).values_list(
+                    "token", flat=True
+                )
+            )
+
+            token = bulk_deletion.set(True)
+            try:
+                File.objects.filter(id__in=file_ids).delete()
+            finally:
+                bulk_deletion.reset(token)
+
+            FileService.release_storage(owner.id, sum(size for _, size, *_ in files))
+            FileService.release_blobs(blob_ids)
+            StorageDeletion.objects.enqueue(names)
+
+            def on_commit():
+                invalidate_file_metadata(*file_ids)
+                invalidate_share_metadata(*tokens)
+
+            transaction.on_commit(on_commit)
+
+        return len(files)
+
+
+class UploadSessionError(Exception):
+    pass
+
+
+class AssembledUpload(UploadedFile):
+    """
+    Upload assembled from session chunks in a temporary file on disk, which lets
+    the filesystem storage move it into place instead of copying it again.
+    """
+
+    def temporary_file_path(self):
+        return self.file.name
+
+
+class UploadSessionService(Service):
+    COPY_BUFFER_SIZE = 64 * 1024
+
+    @staticmethod
+    def get_chunks_dir(session: UploadSession) -> str:
+        return os.path.join(settings.UPLOAD_SESSIONS_ROOT, str(session.id))
+
+    @staticmethod
+    def get_chunk_path(session: UploadSession, index: int) -> str:
+        return os.path.join(
+            UploadSessionService.get_chunks_dir(session), f"{index:06d}.part"
+        )
+
+    @staticmethod
+    def get_received_chunks(session: UploadSession) -> list[int]:
+        """
+        Get indexes of the chunks that are fully stored for the given session.
+        """
+        chunks_dir = UploadSessionService.get_chunks_dir(session)
+        if not os.path.isdir(chunks_dir):
+            return []
+
+        received = []
+        with os.scandir(chunks_dir) as entries:
+            for entry in entries:
+                index, ext = os.path.splitext(entry.name)
+                if ext != ".part" or not index.isdigit():
+                    continue
+
+                index = int(index)
+                if (
+                    index < session.chunks_count
+                    and entry.stat().st_size == session.get_chunk_length(index)
+                ):
+                    received.append(index)
+        return sorted(received)
+
+    @staticmethod
+    def is_direct(session: UploadSession) -> bool:
+        """
+        Check if the content of the session is uploaded directly to the storage
+        instead of in chunks, which needs its SHA-256 digest to be known upfront.
+        """
+        return (
+            bool(session.sha256)
+            and session.size <= settings.DIRECT_UPLOAD_MAX_SIZE
+            and supports_presigned_urls(default_storage)
+        )
+
+    @staticmethod
+    def get_staging_name(session: UploadSession) -> str:
+        # Never a blob name, so clients cannot overwrite content of other files
+        _, extension = os.path.splitext(session.name)
+        return f"staging/{session.id}{extension}"
+
+    @staticmethod
+    def get_direct_upload(session: UploadSession):
+        """
+        Get the presigned request uploading the content of the session directly to
+        the storage, under a staging name of its own. The session is then finalized
+        as a completion callback.
+
+        Returns:
+            dict | None: The method, URL and headers of the request, or None if the
+            session is uploaded in chunks.
+        """
+        if (
+            session.status != UploadSessionStatus.PENDING
+            or not UploadSessionService.is_direct(session)
+        ):
+            return None
+
+        return get_upload_request(
+            default_storage,
+            UploadSessionService.get_staging_name(session),
+            size=session.size,
+            sha256=session.sha256,
+            content_type=session.content_type,
+            expire=settings.DIRECT_UPLOAD_URL_EXPIRE,
+        )
+
+    @staticmethod
+    def write_chunk(session: UploadSession, index: int, stream, offset: int = None):
+        """
+        Write the chunk with the given index from the request stream to disk.
+
+        The chunk is written to a temporary file first and atomically renamed, so
+        retried or parallel uploads of the same chunk never leave it half written.
+
+        Raises:
+            UploadSessionError: If the chunk index, offset or length is invalid.
+        """
+        if index >= session.chunks_count:
+            raise UploadSessionError("Invalid chunk index")
+
+        if offset is not None and offset != index * session.chunk_size:
+            raise UploadSessionError("Chunk offset does not match its index")
+
+        expected_length = session.get_chunk_length(index)
+        chunks_dir = UploadSessionService.get_chunks_dir(session)
+        os.makedirs(chunks_dir, exist_ok=True)
+
+        chunk_path = UploadSessionService.get_chunk_path(session, index)
+        temp_path = f"{chunk_path}.{uuid.uuid4().hex}"
+
+        written = 0
+        try:
+            with open(temp_path, "wb") as f:
+                while written <= expected_length:
+                    data = stream.read(UploadSessionService.COPY_BUFFER_SIZE)
+                    if not data:
+                        break
+                    written += len(data)
+                    f.write(data)
+
+            if written != expected_length:
+                raise UploadSessionError(
+                    f"Chunk {index} has to be exactly {expected_length} bytes long"
+                )
+
+            os.replace(temp_path, chunk_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+        return written
 
     @staticmethod
-    def upload_file(file_id: str, file: bytes, mimetype: str, extension: str = None):
-        file_bytes = base64.b64encode(file)
-        extension = extension or FileService.guess_extension(mimetype)
+    def finalize(session: UploadSession) -> File:
+        """
+        Assemble the uploaded chunks into a new file.
+
+        Chunks are concatenated and hashed into a temporary file on disk with a
+        bounded buffer, which is then handed to the storage backend.
+
+        Raises:
+            UploadSessionError: If the session is not pending or chunks are missing.
+        """
+        with transaction.atomic():
+            session = UploadSession.objects.select_for_update().get(id=session.id)
+
+            if session.status != UploadSessionStatus.PENDING:
+                raise UploadSessionError("Upload session is not pending")
+
+            if UploadSessionService.is_direct(session):
+                return UploadSessionService._finalize_direct(session)
+
+            received = UploadSessionService.get_received_chunks(session)
+            if len(received) != session.chunks_count:
+                missing = sorted(set(range(session.chunks_count)) - set(received))
+                raise UploadSessionError(f"Missing chunks: {missing}")
+
+            chunks_dir = UploadSessionService.get_chunks_dir(session)
+            hasher = hashlib.sha256()
+            with tempfile.NamedTemporaryFile(dir=chunks_dir, delete=False) as target:
+                for index in range(session.chunks_count):
+                    chunk_path = UploadSessionService.get_chunk_path(session, index)
+                    with open(chunk_path, "rb") as chunk:
+                        while data := chunk.read(UploadSessionService.COPY_BUFFER_SIZE):
+                            hasher.update(data)
+                            target.write(data)
 
-        bus.emit("file:created", file_id, extension, file_bytes)
+            if session.sha256 and hasher.hexdigest() != session.sha256:
+                raise UploadSessionError("Content does not match the SHA-256 digest")
+
+            file = UploadSessionService._create_file(session)
+
+            _, extension = os.path.splitext(session.name)
+            with open(target.name, "rb") as f:
+                content = AssembledUpload(
+                    file=f,
+                    name=session.name,
+                    content_type=session.content_type,
+                    size=session.size,
+                )
+                content.sha256 = hasher.hexdigest()
+                FileService.upload_file(file, content, extension)
+
+            session.status = UploadSessionStatus.COMPLETED
+            session.file = file
+            session.save()
+
+        shutil.rmtree(chunks_dir, ignore_errors=True)
+        return file
+
+    @staticmethod
+    def _create_file(session: UploadSession) -> File:
+        return File.objects.create(
+            owner=session.owner,
+            group=session.group,
+            name=session.name,
+            description=session.description,
+            tags=session.tags,
+            size=session.size,
+        )
+
+    @staticmethod
+    def _finalize_direct(session: UploadSession) -> File:
+        """
+        Create the file from the content uploaded directly to the storage. Has to be
+        called with the session locked.
+
+        The digest of the staged upload is verified before its blob is referenced,
+        so knowing the digest of content is not enough to get a file of it.
+
+        Raises:
+            UploadSessionError: If the content was not uploaded or does not match
+            the digest.
+        """
+        staged_name = UploadSessionService.get_staging_name(session)
+
+        if (
+            not default_storage.exists(staged_name)
+            or default_storage.size(staged_name) != session.size
+        ):
+            raise UploadSessionError("Content was not uploaded")
+
+        if get_stored_sha256(default_storage, staged_name) != session.sha256:
+            raise UploadSessionError("Content does not match the SHA-256 digest")
+
+        _, extension = os.path.splitext(session.name)
+        file = UploadSessionService._create_file(session)
+        FileService.attach_blob(file, session.sha256, extension, staged_name)
+
+        session.status = UploadSessionStatus.COMPLETED
+        session.file = file
+        session.save()
+        return file
+
+    @staticmethod
+    def abort(session: UploadSession):
+        shutil.rmtree(UploadSessionService.get_chunks_dir(session), ignore_errors=True)
+        if UploadSessionService.is_direct(session):
+            StorageDeletion.objects.enqueue(
+                [UploadSessionService.get_staging_name(session)]
+            )
+        session.delete()
+
+        if session.status == UploadSessionStatus.PENDING:
+            FileService.release_storage(session.owner_id, session.size)
+
+    @staticmethod
+    def cleanup_expired_sessions() -> int:
+        sessions = UploadSession.objects.filter(
+            status=UploadSessionStatus.PENDING, expires_at__lte=timezone.now()
+        )
+        count = 0
+        for session in sessions.iterator():
+            UploadSessionService.abort(session)
+            count += 1
+        return count
+
+
+class StorageService(Service):
+    # Stored names and the fields referencing them, see `sweep_orphans`
+    REFERENCES = [
+        (File, "file"),
+        (File, "thumbnail"),
+        (Blob, "file"),
+        (Thumbnail, "image"),
+        (StorageDeletion, "name"),
+    ]
+
+    @staticmethod
+    def process_deletions(batch_size: int = None) -> int:
+        """
+        Delete a batch of stored files queued in `StorageDeletion`.
+
+        Rows are locked with `SKIP LOCKED`, so several workers can process the
+        queue at once. Files that could not be deleted stay queued for a retry.
+
+        Returns:
+            int: The number of deleted files.
+        """
+        batch_size = batch_size or settings.STORAGE_DELETION_BATCH_SIZE
+
+        with transaction.atomic():
+            deletions = list(
+                StorageDeletion.objects.select_for_update(skip_locked=True)[:batch_size]
+            )
+
+            deleted, failed = [], []
+            for deletion in deletions:
+                try:
+                    default_storage.delete(deletion.name)
+                except (OSError, BotoCoreError, ClientError) as e:
+                    logger.warning("Could not delete %s: %s", deletion.name, e)
+                    failed.append(deletion.id)
+                else:
+                    deleted.append(deletion.id)
+
+            StorageDeletion.objects.filter(id__in=deleted).delete()
+            StorageDeletion.objects.filter(id__in=failed).update(
+                attempts=F("attempts") + 1
+            )
+
+        return len(deleted)
+
+    @staticmethod
+    def walk(storage, path: str = ""):
+        """
+        Yield the names of all files in the storage under the given path.
+        """
+        directories, files = storage.listdir(path)
+
+        for name in files:
+            yield posixpath.join(path, name)
+
+        for directory in directories:
+            yield from StorageService.walk(storage, posixpath.join(path, directory))
+
+    @staticmethod
+    def get_orphans(names: list) -> set:
+        referenced = set()
+        for model, field in StorageService.REFERENCES:
+            referenced.update(
+                model.objects.filter(**{f"{field}__in": names}).values_list(
+                    field, flat=True
+                )
+            )
+        return set(names) - referenced
+
+    @staticmethod
+    def sweep_orphans(grace_period=None, dry_run: bool = False) -> list:
+        """
+        Find stored files and upload session directories that nothing references,
+        e.g. left behind by a crash, and queue them for deletion.
+
+        Files modified within the grace period are skipped, as their rows may not
+        be committed yet.
+
+        Returns:
+            list: The names of the orphaned files and directories.
+        """
+        if grace_period is None:
+            grace_period = settings.STORAGE_ORPHAN_GRACE_PERIOD
+        modified_before = timezone.now() - grace_period
+        batch_size = settings.STORAGE_DELETION_BATCH_SIZE
+
+        orphans, batch = [], []
+        for name in StorageService.walk(default_storage):
+            if default_storage.get_modified_time(name) > modified_before:
+                continue
+
+            batch.append(name)
+            if len(batch) >= batch_size:
+                orphans += StorageService.get_orphans(batch)
+                batch = []
+        if batch:
+            orphans += StorageService.get_orphans(batch)
+
+        if not dry_run:
+            StorageDeletion.objects.enqueue(orphans)
+
+        return orphans + StorageService.sweep_upload_sessions(modified_before, dry_run)
+
+    @staticmethod
+    def sweep_upload_sessions(modified_before, dry_run: bool = False) -> list:
+        """
+        Remove chunk directories of upload sessions that are not pending anymore,
+        e.g. deleted along with their owner.
+        """
+        root = settings.UPLOAD_SESSIONS_ROOT
+        if not os.path.isdir(root):
+            return []
+
+        with os.scandir(root) as entries:
+            directories = {
+                entry.name: entry.path
+                for entry in entries
+                if entry.is_dir()
+                and entry.stat().st_mtime < modified_before.timestamp()
+            }
+
+        session_ids = set()
+        for name in directories:
+            try:
+                session_ids.add(uuid.UUID(name))
+            except ValueError:
+                continue
+
+        pending = {
+            str(session_id)
+            for session_id in UploadSession.objects.filter(
+                id__in=session_ids, status=UploadSessionStatus.PENDING
+            ).values_list("id", flat=True)
+        }
+
+        orphans = [path for name, path in directories.items() if name not in pending]
+        if not dry_run:
+            for path in orphans:
+                shutil.rmtree(path, ignore_errors=True)
+
+        return orphans
 
 
 class FileAnalyticsService(Service):
+    QUEUE_KEY = "analytics:queue"
+    COUNTERS_KEY = "analytics:counters"
+    FLUSH_SCHEDULED_KEY = "analytics:flush-scheduled"
+
+    # Pushes the event unless the queue is full, keeping the counters in sync
+    ENQUEUE_SCRIPT = """
+    if redis.call("LLEN", KEYS[1]) >= tonumber(ARGV[2]) then
+        redis.call("HINCRBY", KEYS[2], "dropped", 1)
+        return -1
+    end
+    redis.call("HINCRBY", KEYS[2], "enqueued", 1)
+    return redis.call("RPUSH", KEYS[1], ARGV[1])
+    """
+
     @staticmethod
     def create_file_analytics(token: str, ip: str, user_agent: str, referer: str):
         file_share = FileShare.objects.get(token=token)
@@ -31,9 +725,290 @@ class FileAnalyticsService(Service):
 
         return analytics
 
+    @staticmethod
+    def record_file_analytics(token: str, ip: str, user_agent: str, referer: str):
+        """
+        Record a share download without touching the database on the request path.
+
+        The event is appended to a Redis queue that is flushed in batches by
+        `flush_file_analytics`. Once the queue holds a full batch a flush is
+        requested right away; events are dropped (and counted) while the queue is at
+        `FILE_ANALYTICS_QUEUE_MAX_SIZE`.
+
+        Returns:
+            bool: True if the event was queued, False if it was dropped.
+        """
+        share_metadata = get_share_metadata(token)
+        if share_metadata is None:
+            return False
+
+        event = json.dumps(
+            {
+                "file_share_id": share_metadata["id"],
+                "ip": ip,
+                "user_agent": user_agent or "",
+                "referer": referer,
+                "created_at": timezone.now().isoformat(),
+            }
+        )
+
+        client = get_redis_client()
+        length = client.eval(
+            FileAnalyticsService.ENQUEUE_SCRIPT,
+            2,
+            FileAnalyticsService.QUEUE_KEY,
+            FileAnalyticsService.COUNTERS_KEY,
+            event,
+            settings.FILE_ANALYTICS_QUEUE_MAX_SIZE,
+        )
+
+        if length < 0:
+            return False
+
+        if length >= settings.FILE_ANALYTICS_BATCH_SIZE and client.set(
+            FileAnalyticsService.FLUSH_SCHEDULED_KEY,
+            1,
+            nx=True,
+            ex=settings.FILE_ANALYTICS_FLUSH_INTERVAL,
+        ):
+            bus.emit("analytics:batch_ready")
+
+        return True
+
+    @staticmethod
+    def _parse_event(event: str, not_before) -> dict:
+        data = json.loads(event)
+        created_at = data.get("created_at")
+        data["created_at"] = (
+            max(datetime.fromisoformat(created_at), not_before)
+            if created_at
+            else timezone.now()
+        )
+        return data
+
+    @staticmethod
+    def flush_file_analytics() -> int:
+        """
+        Move queued share analytics events into the database with `bulk_create`.
+
+        Events keep the time they were recorded at, unless queued for more than half
+        of `FILE_ANALYTICS_ROLLUP_LAG`, in which case they would be missed by the
+        rollups and are moved forward. Events of shares deleted in the meantime are
+        discarded. If the insert fails, the batch is put back at the head of the
+        queue.
+
+        Returns:
+            int: The number of stored events.
+        """
+        client = get_redis_client()
+        batch_size = settings.FILE_ANALYTICS_BATCH_SIZE
+        flushed = 0
+        # Rows older than the rollup lag may be behind its checkpoint already
+        not_before = timezone.now() - settings.FILE_ANALYTICS_ROLLUP_LAG / 2
+
+        while True:
+            with client.pipeline() as pipe:
+                pipe.lrange(FileAnalyticsService.QUEUE_KEY, 0, batch_size - 1)
+                pipe.ltrim(FileAnalyticsService.QUEUE_KEY, batch_size, -1)
+                events, _ = pipe.execute()
+
+            if not events:
+                break
+
+            try:
+                events_data = [
+                    FileAnalyticsService._parse_event(event, not_before)
+                    for event in events
+                ]
+                share_ids = {
+                    str(share_id)
+                    for share_id in FileShare.objects.filter(
+                        id__in={data["file_share_id"] for data in events_data}
+                    ).values_list("id", flat=True)
+                }
+
+                analytics = FileAnalytics.objects.bulk_create(
+                    FileAnalytics(**data)
+                    for data in events_data
+                    if data["file_share_id"] in share_ids
+                )
+            except Exception:
+                client.lpush(FileAnalyticsService.QUEUE_KEY, *reversed(events))
+                raise
+
+            client.hincrby(FileAnalyticsService.COUNTERS_KEY, "flushed", len(analytics))
+            flushed += len(analytics)
+
+            if len(events) < batch_size:
+                break
+
+        client.delete(FileAnalyticsService.FLUSH_SCHEDULED_KEY)
+        return flushed
+
+    @staticmethod
+    def get_queue_stats() -> dict:
+        client = get_redis_client()
+        counters = client.hgetall(FileAnalyticsService.COUNTERS_KEY)
+
+        stats = {key.decode(): int(value) for key, value in counters.items()}
+        stats["queued"] = client.llen(FileAnalyticsService.QUEUE_KEY)
+        return stats
+
     @staticmethod
     def get_file_analytics(file_share_id_or_token: str):
         return FileAnalytics.objects.filter(
             Q(file_share__token=file_share_id_or_token)
             | Q(file_share__id=file_share_id_or_token)
         ).all()
+
+    @staticmethod
+    def get_rollup_bucket(created_at, period: str):
+        bucket = created_at.replace(minute=0, second=0, microsecond=0)
+        if period == AnalyticsPeriod.DAY:
+            bucket = bucket.replace(hour=0)
+        return bucket
+
+    @staticmethod
+    def rollup_file_analytics() -> int:
+        """
+        Add `FileAnalytics` rows created since the last run to the hourly and daily
+        rollups.
+
+        Rows younger than `FILE_ANALYTICS_ROLLUP_LAG` are left for the next run, so
+        rows of transactions still in progress are not skipped, and a single run
+        covers at most `FILE_ANALYTICS_ROLLUP_MAX_WINDOW`. Only the
+        `FILE_ANALYTICS_ROLLUP_TOP` most common referers and user agents are kept
+        for each rollup, so their counts are approximate.
+
+        Returns:
+            int: The number of processed rows.
+        """
+        until = timezone.now() - settings.FILE_ANALYTICS_ROLLUP_LAG
+
+        with transaction.atomic():
+            checkpoint = (
+                FileAnalyticsRollupCheckpoint.objects.select_for_update()
+                .filter(name="file_analytics")
+                .first()
+            )
+            if checkpoint is None:
+                earliest = FileAnalytics.objects.aggregate(
+                    earliest=models.Min("created_at")
+                )["earliest"]
+                checkpoint = FileAnalyticsRollupCheckpoint.objects.create(
+                    name="file_analytics", processed_until=earliest or until
+                )
+
+            since = checkpoint.processed_until
+            until = min(until, since + settings.FILE_ANALYTICS_ROLLUP_MAX_WINDOW)
+            if since >= until:
+                return 0
+
+            rows = FileAnalytics.objects.filter(
+                created_at__gte=since, created_at__lt=until
+            ).values_list("file_share_id", "created_at", "ip", "user_agent", "referer")
+
+            rollups = {}
+            processed = 0
+            for share_id, created_at, ip, user_agent, referer in rows.iterator(
+                chunk_size=5000
+            ):
+                processed += 1
+                for period in AnalyticsPeriod:
+                    key = (
+                        share_id,
+                        period.value,
+                        FileAnalyticsService.get_rollup_bucket(created_at, period),
+                    )
+                    rollup = rollups.get(key)
+                    if rollup is None:
+                        rollup = rollups[key] = {
+                            "hits": 0,
+                            "ips": HyperLogLog(),
+                            "referers": Counter(),
+                            "user_agents": Counter(),
+                        }
+
+                    rollup["hits"] += 1
+                    rollup["ips"].add(ip)
+                    if referer:
+                        rollup["referers"][referer] += 1
+                    if user_agent:
+                        rollup["user_agents"][user_agent] += 1
+
+            if rollups:
+                FileAnalyticsService._save_rollups(rollups)
+
+            checkpoint.processed_until = until
+            checkpoint.save(update_fields=["processed_until"])
+
+        return processed
+
+    @staticmethod
+    def _save_rollups(rollups: dict):
+        top = settings.FILE_ANALYTICS_ROLLUP_TOP
+        existing = {
+            (rollup.file_share_id, rollup.period, rollup.bucket): rollup
+            for rollup in FileAnalyticsRollup.objects.filter(
+                file_share_id__in={share_id for share_id, _, _ in rollups},
+                bucket__in={bucket for _, _, bucket in rollups},
+            )
+        }
+
+        to_create, to_update = [], []
+        for (share_id, period, bucket), data in rollups.items():
+            rollup = existing.get((share_id, period, bucket))
+            if rollup is None:
+                rollup = FileAnalyticsRollup(
+                    file_share_id=share_id, period=period, bucket=bucket
+                )
+                to_create.append(rollup)
+            else:
+                data["ips"].merge(HyperLogLog.from_bytes(rollup.ips_sketch))
+                data["referers"].update(rollup.referers)
+                data["user_agents"].update(rollup.user_agents)
+                to_update.append(rollup)
+
+            rollup.hits += data["hits"]
+            rollup.ips_sketch = data["ips"].to_bytes()
+            rollup.referers = dict(data["referers"].most_common(top))
+            rollup.user_agents = dict(data["user_agents"].most_common(top))
+            rollup.updated_at = timezone.now()
+
+        FileAnalyticsRollup.objects.bulk_create(to_create)
+        FileAnalyticsRollup.objects.bulk_update(
+            to_update,
+            ["hits", "ips_sketch", "referers", "user_agents", "updated_at"],
+        )
+
+    @staticmethod
+    def get_file_analytics_rollups(
+        token: str, file_id: str, owner, period: str, since=None, until=None
+    ):
+        """
+        Get the rollups of the share for the given period, newest first.
+
+        Parameters:
+            token (str): The share token.
+            file_id (str): The ID of the shared file.
+            owner (User): The owner of the file.
+            period (str): Either `hour` or `day`.
+            since (datetime, optional): Skip rollups of buckets starting earlier.
+            until (datetime, optional): Skip rollups of buckets starting at or later.
+
+        Returns:
+            QuerySet: The rollups of the share.
+        """
+        rollups = FileAnalyticsRollup.objects.filter(
+            file_share__token=token,
+            file_share__file_id=file_id,
+            file_share__file__owner=owner,
+            period=period,
+        )
+
+        if since:
+            rollups = rollups.filter(bucket__gte=since)
+        if until:
+            rollups = rollups.filter(bucket__lt=until)
+
+        return rollups
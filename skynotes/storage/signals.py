@@ -0,0 +1,54 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from storage.cache import invalidate_file_metadata, invalidate_share_metadata
+from storage.models import File, FileShare, StorageDeletion, Thumbnail
+from storage.services import FileService, bulk_deletion
+
+
+@receiver([post_save, post_delete], sender=File)
+def invalidate_file_cache(sender, instance: File, **kwargs):
+    if bulk_deletion.get():
+        return
+    # Once committed, so concurrent requests do not cache the previous row again
+    transaction.on_commit(partial(invalidate_file_metadata, instance.id))
+
+
+@receiver([post_save, post_delete], sender=FileShare)
+def invalidate_share_cache(sender, instance: FileShare, **kwargs):
+    if bulk_deletion.get():
+        return
+    transaction.on_commit(partial(invalidate_share_metadata, instance.token))
+
+
+@receiver(post_delete, sender=File)
+def release_file_storage(sender, instance: File, **kwargs):
+    if bulk_deletion.get():
+        return
+    FileService.release_storage(instance.owner_id, instance.size)
+
+
+@receiver(post_delete, sender=File)
+def release_file_blob(sender, instance: File, **kwargs):
+    if instance.blob_id and not bulk_deletion.get():
+        FileService.release_blob(instance.blob_id)
+
+
+@receiver(post_delete, sender=File)
+def delete_file_content(sender, instance: File, **kwargs):
+    if bulk_deletion.get():
+        return
+    # Content in blobs is deleted along with the blob, see `release_blob`
+    names = [instance.thumbnail.name] + (
+        [] if instance.blob_id else [instance.file.name]
+    )
+    StorageDeletion.objects.enqueue(names)
+
+
+@receiver(post_delete, sender=Thumbnail)
+def delete_thumbnail_image(sender, instance: Thumbnail, **kwargs):
+    if bulk_deletion.get():
+        return
+    StorageDeletion.objects.enqueue([instance.image.name])
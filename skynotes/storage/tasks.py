@@ -1,53 +1,124 @@
-import base64
+import logging
+import mimetypes
+from functools import wraps
 
+import grpc
 from celery import shared_task
 from common.bus import bus
 from django.conf import settings
 from django.core.files.base import ContentFile
+from django.db.models import Q
 from services.grpc_client import Client
 from storage.models import File
+from storage.services import FileAnalyticsService, StorageService, UploadSessionService
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_GRPC_CODES = {
+    grpc.StatusCode.UNAVAILABLE,
+    grpc.StatusCode.DEADLINE_EXCEEDED,
+    grpc.StatusCode.RESOURCE_EXHAUSTED,
+}
 
 
 def get_file(file_id: str) -> File:
     return File.objects.get(id=file_id)
 
 
-def get_file_data(content: bytes, decode=False) -> ContentFile:
-    if decode:
-        content = base64.b64decode(content.decode(encoding="utf-8"))
-
+def get_file_data(content: bytes) -> ContentFile:
     file_data = ContentFile(content)
     return file_data
 
 
 @shared_task
-def handle_file_upload(file_id: str, extension: str, content: bytes):
+def handle_file_upload(file_id: str, extension: str):
     file = get_file(file_id)
 
-    file_data = get_file_data(content, decode=True)
-    file.save_file(extension, file_data)
+    if not file.file:
+        return
 
-    bus.emit("file:uploaded", file_id, extension, content)
+    bus.emit("file:uploaded", file_id, extension)
 
 
-@shared_task
-def handle_thumbnail_generation(file_id: str, extension: str, content: bytes):
+@shared_task(bind=True, max_retries=5)
+def handle_thumbnail_generation(self, file_id: str, extension: str):
     file = get_file(file_id)
-    file_data = get_file_data(content, decode=True)
+
+    duplicate = (
+        File.objects.filter(blob_id=file.blob_id)
+        .exclude(id=file.id)
+        .exclude(Q(thumbnail="") | Q(thumbnail__isnull=True))
+        .first()
+        if file.blob_id
+        else None
+    )
+    if duplicate:
+        file.copy_thumbnails(duplicate)
+        bus.emit("file:thumbnail_created", file_id, extension)
+        return
 
     try:
-        value = Client(settings.GRPC_ADDR).generate_thumbnail(file_data.read())
+        client = Client(settings.GRPC_ADDR, timeout=settings.GRPC_TIMEOUT)
+        with file.file.open("rb") as f:
+            value = client.generate_thumbnail_stream(
+                f,
+                mimetypes.guess_type(file.file.name)[0],
+                # Renditions are scaled down from the largest one
+                width=max(settings.THUMBNAIL_SIZES),
+                height=max(settings.THUMBNAIL_SIZES),
+            )
+    except grpc.RpcError as e:
+        if e.code() in RETRYABLE_GRPC_CODES:
+            raise self.retry(exc=e, countdown=30 * 2**self.request.retries)
+
+        logger.warning(
+            "Could not generate thumbnail of file %s: %s", file_id, e.details()
+        )
+        return
+
+    file_data = get_file_data(value)
+    file.save_thumbnail(file_data)
+
+    bus.emit("file:thumbnail_created", file_id, extension)
 
-        file_data = get_file_data(value, decode=False)
-        file.save_thumbnail(file_data)
 
-        bus.emit("file:thumbnail_created", file_id, extension, content)
-    except Exception as e:
-        print(e)
+@shared_task
+def flush_file_analytics():
+    return FileAnalyticsService.flush_file_analytics()
+
+
+@shared_task
+def rollup_file_analytics():
+    return FileAnalyticsService.rollup_file_analytics()
+
+
+@shared_task
+def cleanup_upload_sessions():
+    return UploadSessionService.cleanup_expired_sessions()
+
+
+@shared_task
+def process_storage_deletions():
+    while StorageService.process_deletions():
+        pass
+
+
+@shared_task
+def sweep_orphaned_files():
+    StorageService.sweep_orphans()
 
 
 def wrap_celery_task(task):
+    @wraps(task.run)
     def wrapper(*args, **kwargs):
         task.delay(*args, **kwargs)
 
+    def batch(calls: list):
+        # Events relayed together share a connection, but are sent one message
+        # each, so every event is retried on its own
+        with task.app.producer_or_acquire() as producer:
+            for args, kwargs in calls:
+                task.apply_async(args, kwargs, producer=producer)
+
+    wrapper.batch = batch
     return wrapper
@@ -1,15 +1,30 @@
 import os
+import shutil
+import tempfile
+import threading
 
 from authorization.tests.common import force_authenticate
+from common.bus import bus
 from django.contrib.auth import get_user_model
 from django.core.files.base import ContentFile
 from django.core.files.uploadedfile import SimpleUploadedFile
-from rest_framework.test import APITestCase
+from django.db import connection
+from django.test import override_settings
+from rest_framework.test import APITestCase, APITransactionTestCase
 from storage.models import File, Group
 
 User = get_user_model()
 
 
+def use_temporary_media_root(test_case):
+    # Stored files and thumbnails go to a temporary MEDIA_ROOT, removed afterwards
+    test_case.media_root = tempfile.mkdtemp()
+    media_settings = override_settings(MEDIA_ROOT=test_case.media_root)
+    media_settings.enable()
+    test_case.addCleanup(shutil.rmtree, test_case.media_root, ignore_errors=True)
+    test_case.addCleanup(media_settings.disable)
+
+
 class GroupTestCaseBase(APITestCase):
     def setUp(self):
         self.user = User.objects.create_user(email="test@test.com", password="password")
@@ -35,6 +50,7 @@ class GroupTestCaseBase(APITestCase):
 
 class FileTestCaseBase(APITestCase):
     def setUp(self):
+        use_temporary_media_root(self)
         self.user = User.objects.create_user(email="test@test.com", password="password")
         force_authenticate(self.user, client=self.client)
 
@@ -63,3 +79,35 @@ class FileTestCaseBase(APITestCase):
             name=name, file=file, size=file.size, owner=self.user, **kwargs
         )
         return file
+
+
+class FileTransactionTestCaseBase(APITransactionTestCase):
+    """
+    For tests of what other processes, e.g. Celery workers, see of the rows
+    written by a request, which `TestCase` never commits.
+    """
+
+    def setUp(self):
+        use_temporary_media_root(self)
+        self.user = User.objects.create_user(email="test@test.com", password="password")
+        force_authenticate(self.user, client=self.client)
+
+    def _listen_file_created(self) -> list:
+        """
+        Record, for each `file:created` event, whether its file is visible to
+        another connection when the event is dispatched.
+        """
+        visible = []
+
+        def read(file_id):
+            visible.append(File.objects.filter(id=file_id).exists())
+            connection.close()
+
+        def listener(file_id, extension):
+            thread = threading.Thread(target=read, args=(file_id,))
+            thread.start()
+            thread.join()
+
+        bus.register_listener("file:created", listener)
+        self.addCleanup(bus.listeners["file:created"].remove, listener)
+        return visible
@@ -0,0 +1,72 @@
+from io import BytesIO, StringIO
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from PIL import Image
+from services.grpc_client import ThumbnailError
+from storage.models import File
+from storage.tests.common import FileTestCaseBase
+
+
+def get_thumbnail() -> bytes:
+    buffer = BytesIO()
+    Image.new("RGB", (40, 20)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class FakeClient:
+    def __init__(self, *args, **kwargs):
+        self.batches = []
+
+    def generate_thumbnails(self, sources: dict, **options) -> dict:
+        self.batches.append(sorted(sources))
+        return {
+            source_id: (
+                ThumbnailError("unsupported")
+                if content == b"invalid"
+                else get_thumbnail()
+            )
+            for source_id, content in sources.items()
+        }
+
+    def generate_thumbnail_stream(self, file, content_type=None, **options) -> bytes:
+        self.batches.append(["stream"])
+        return get_thumbnail()
+
+
+class BackfillThumbnailsTest(FileTestCaseBase):
+    def _create_stored_file(self, content: bytes) -> File:
+        file = File.objects.create(
+            name="file.txt", file="", size=len(content), owner=self.user
+        )
+        file.save_file(".txt", ContentFile(content))
+        return file
+
+    def test_backfill_thumbnails(self):
+        files = [self._create_stored_file(b"content") for _ in range(3)]
+        invalid = self._create_stored_file(b"invalid")
+        large = self._create_stored_file(b"large content" * 2)
+
+        client = FakeClient()
+        with mock.patch(
+            "storage.management.commands.backfill_thumbnails.Client",
+            return_value=client,
+        ):
+            call_command(
+                "backfill_thumbnails",
+                batch_size=2,
+                max_batch_bytes=len(b"content") * 2,
+                concurrency=2,
+                stdout=StringIO(),
+            )
+
+        # Two batches of small files and the large file streamed on its own
+        self.assertEqual(sorted(map(len, client.batches)), [1, 2, 2])
+
+        for file in files + [large]:
+            file.refresh_from_db()
+            self.assertTrue(file.thumbnail)
+
+        invalid.refresh_from_db()
+        self.assertFalse(invalid.thumbnail)
@@ -0,0 +1,75 @@
+from io import BytesIO
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from PIL import Image
+from storage.models import Blob, File, StorageDeletion
+from storage.services import StorageService
+from storage.tasks import handle_thumbnail_generation
+from storage.tests.common import FileTestCaseBase
+
+CONTENT = b"Lorem ipsum dolor sit amet."
+
+
+class BlobDeduplicationTest(FileTestCaseBase):
+    def _upload(self, content: bytes = CONTENT) -> File:
+        with mock.patch("storage.services.bus.emit"):
+            response = self.client.post(
+                reverse("files"),
+                {"name": "test_file", "file": SimpleUploadedFile("TEST.txt", content)},
+                format="multipart",
+            )
+        return File.objects.get(id=response.data["id"])
+
+    def test_duplicate_shares_blob(self):
+        first = self._upload()
+        second = self._upload()
+        other = self._upload(b"other content")
+
+        self.assertEqual(first.blob_id, second.blob_id)
+        self.assertEqual(first.file.name, second.file.name)
+        self.assertNotEqual(first.blob_id, other.blob_id)
+        self.assertEqual(Blob.objects.get(hash=first.blob_id).references, 2)
+
+    def test_blob_collected_when_unreferenced(self):
+        first = self._upload()
+        second = self._upload()
+        name = first.blob.file.name
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.delete(
+                reverse("file-detail-detail", args=[first.id])
+            )
+
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(Blob.objects.get(hash=second.blob_id).references, 1)
+        self.assertTrue(second.file.storage.exists(name))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(reverse("file-detail-detail", args=[second.id]))
+
+        self.assertFalse(Blob.objects.filter(hash=second.blob_id).exists())
+        self.assertTrue(StorageDeletion.objects.filter(name=name).exists())
+
+        StorageService.process_deletions()
+
+        self.assertFalse(second.file.storage.exists(name))
+
+    def test_duplicate_thumbnails_copied(self):
+        first = self._upload()
+        second = self._upload()
+
+        buffer = BytesIO()
+        Image.new("RGB", (40, 20)).save(buffer, format="PNG")
+        first.save_thumbnail(ContentFile(buffer.getvalue()))
+
+        with mock.patch("storage.tasks.Client") as client:
+            handle_thumbnail_generation(str(second.id), ".txt")
+
+        client.assert_not_called()
+        second.refresh_from_db()
+        self.assertTrue(second.thumbnail)
+        self.assertNotEqual(second.thumbnail.name, first.thumbnail.name)
+        self.assertEqual(second.thumbnails.count(), first.thumbnails.count())
@@ -1,6 +1,20 @@
+import asyncio
+import json
+import threading
+import time
 from unittest import TestCase
 
 from common.bus import EventBus
+from common.models import OutboxEvent
+from common.redis_client import get_redis_client
+from common.transport import RedisTransport
+from django.db import transaction
+from django.test import SimpleTestCase
+from django.test import TestCase as DjangoTestCase
+from django.test import override_settings
+from storage.tasks import handle_thumbnail_generation, wrap_celery_task
+
+from skynotes.celery import app
 
 
 class TestEventBus(TestCase):
@@ -48,3 +62,257 @@ class TestEventBus(TestCase):
 
     def test_unregistered_event(self):
         self.bus.emit("unregistered_event", "test")
+
+
+@override_settings(EVENT_BUS_OUTBOX=True)
+class TestEventBusOutbox(DjangoTestCase):
+    def setUp(self):
+        self.bus = EventBus()
+        self.result = []
+
+    def test_dispatched_on_commit(self):
+        self.bus.register_listener("outbox_commit", self.result.append)
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with transaction.atomic():
+                self.bus.emit("outbox_commit", "first")
+                self.bus.emit("outbox_commit", "second")
+
+                self.assertEqual(self.result, [])
+                self.assertEqual(OutboxEvent.objects.count(), 2)
+
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(self.result, ["first", "second"])
+        self.assertFalse(OutboxEvent.objects.exists())
+
+    def test_discarded_on_rollback(self):
+        self.bus.register_listener("outbox_rollback", self.result.append)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(ValueError):
+                with transaction.atomic():
+                    self.bus.emit("outbox_rollback", "test")
+                    raise ValueError
+
+        self.assertEqual(self.result, [])
+        self.assertFalse(OutboxEvent.objects.exists())
+
+    def test_failed_events_kept(self):
+        def failing(event):
+            raise ValueError
+
+        self.bus.register_listener("outbox_failing", failing)
+        self.bus.register_listener("outbox_other", self.result.append)
+
+        with transaction.atomic():
+            self.bus.emit("outbox_failing", "test")
+            self.bus.emit("outbox_other", "test")
+
+        with self.assertLogs("common.bus", level="ERROR"):
+            self.assertEqual(self.bus.relay(), 1)
+
+        self.assertEqual(self.result, ["test"])
+        event = OutboxEvent.objects.get()
+        self.assertEqual((event.event_type, event.attempts), ("outbox_failing", 1))
+
+    def test_batch_listener(self):
+        def listener(event):
+            self.result.append(event)
+
+        listener.batch = self.result.append
+        self.bus.register_listener("outbox_batch", listener)
+
+        with transaction.atomic():
+            self.bus.emit("outbox_batch", "first")
+            self.bus.emit("outbox_batch", "second")
+
+        self.bus.relay()
+
+        self.assertEqual(self.result, [[(["first"], {}), (["second"], {})]])
+
+
+@override_settings(EVENT_BUS_OUTBOX=False)
+class TestEventBusTransaction(DjangoTestCase):
+    def setUp(self):
+        self.bus = EventBus()
+        self.result = []
+
+    def test_dispatched_on_commit(self):
+        self.bus.register_listener("transaction_commit", self.result.append)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                self.bus.emit("transaction_commit", "test")
+
+                self.assertEqual(self.result, [])
+
+        self.assertEqual(self.result, ["test"])
+
+    def test_discarded_on_rollback(self):
+        self.bus.register_listener("transaction_rollback", self.result.append)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(ValueError):
+                with transaction.atomic():
+                    self.bus.emit("transaction_rollback", "test")
+                    raise ValueError
+
+        self.assertEqual(self.result, [])
+
+
+@override_settings(EVENT_BUS_OUTBOX=False, EVENT_BUS_LISTENER_TIMEOUT=0.2)
+class TestEventBusDispatch(SimpleTestCase):
+    def setUp(self):
+        self.bus = EventBus()
+        self.bus.stats.reset()
+        self.result = []
+
+    def test_errors_isolated(self):
+        def failing(event):
+            raise ValueError
+
+        self.bus.register_listener("dispatch_failing", failing)
+        self.bus.register_listener("dispatch_failing", self.result.append)
+
+        with self.assertLogs("common.bus", level="ERROR"):
+            self.bus.emit("dispatch_failing", "test")
+
+        self.assertEqual(self.result, ["test"])
+        listeners = self.bus.stats.get()["dispatch_failing"]["listeners"]
+        self.assertEqual(
+            [
+                (counters["calls"], counters["errors"])
+                for counters in listeners.values()
+            ],
+            [(1, 1), (1, 0)],
+        )
+
+    @override_settings(EVENT_BUS_DISPATCH="thread")
+    def test_thread_dispatch(self):
+        def slow(event):
+            time.sleep(0.15)
+            self.result.append(event)
+
+        self.bus.register_listener("dispatch_thread", slow)
+        self.bus.register_listener("dispatch_thread", slow)
+
+        start = time.perf_counter()
+        self.assertTrue(self.bus.dispatch("dispatch_thread", [(("test",), {})]))
+
+        self.assertLess(time.perf_counter() - start, 0.3)
+        self.assertEqual(self.result, ["test", "test"])
+
+    @override_settings(EVENT_BUS_DISPATCH="thread")
+    def test_thread_dispatch_timeout(self):
+        self.bus.register_listener("dispatch_timeout", lambda event: time.sleep(0.5))
+
+        start = time.perf_counter()
+        self.assertFalse(self.bus.dispatch("dispatch_timeout", [(("test",), {})]))
+
+        self.assertLess(time.perf_counter() - start, 0.4)
+        listeners = self.bus.stats.get()["dispatch_timeout"]["listeners"]
+        self.assertEqual([counters["timeouts"] for counters in listeners.values()], [1])
+
+    @override_settings(EVENT_BUS_DISPATCH="asyncio")
+    def test_asyncio_dispatch(self):
+        async def listener(event):
+            await asyncio.sleep(0.01)
+            self.result.append(event)
+
+        async def slow(event):
+            await asyncio.sleep(1)
+
+        self.bus.register_listener("dispatch_asyncio", listener)
+        self.bus.register_listener("dispatch_asyncio", self.result.append)
+        self.bus.register_listener("dispatch_asyncio_slow", slow)
+
+        self.assertTrue(self.bus.dispatch("dispatch_asyncio", [(("test",), {})]))
+        self.assertFalse(self.bus.dispatch("dispatch_asyncio_slow", [(("test",), {})]))
+
+        self.assertEqual(sorted(self.result), ["test", "test"])
+        stats = self.bus.stats.get()
+        self.assertEqual(stats["dispatch_asyncio"]["events"], 1)
+        self.assertLess(stats["dispatch_asyncio_slow"]["max_time"], 0.5)
+
+
+@override_settings(EVENT_BUS_OUTBOX=False, EVENT_BUS_BROADCAST=["broadcast:*"])
+class TestEventBusBroadcast(SimpleTestCase):
+    def setUp(self):
+        self.bus = EventBus()
+        self.result = []
+
+    def test_wildcard_listener(self):
+        self.bus.register_listener("wildcard:*", self.result.append)
+
+        self.bus.emit("wildcard:created", "created")
+        self.bus.emit("wildcard", "ignored")
+
+        self.assertEqual(self.result, ["created"])
+
+    def test_broadcast_published(self):
+        pubsub = get_redis_client().pubsub(ignore_subscribe_messages=True)
+        pubsub.psubscribe("events:broadcast:*")
+        self.addCleanup(pubsub.close)
+        # Reads the subscription confirmation
+        pubsub.get_message(timeout=1)
+
+        self.bus.emit("broadcast:published", "test", key="value")
+        self.bus.emit("local:published", "test")
+
+        message = pubsub.get_message(timeout=1)
+        self.assertEqual(message["channel"], b"events:broadcast:published")
+        self.assertEqual(
+            json.loads(message["data"]),
+            {
+                "node": self.bus.transport.node_id,
+                "calls": [[["test"], {"key": "value"}]],
+            },
+        )
+        self.assertIsNone(pubsub.get_message(timeout=0.1))
+
+    def test_broadcast_received(self):
+        received = threading.Event()
+
+        def listener(event):
+            self.result.append(event)
+            received.set()
+
+        self.bus.register_listener("broadcast:received", listener)
+        self.bus.transport.start()
+        self.addCleanup(self.bus.transport.stop)
+        time.sleep(0.1)
+
+        # Another node, whose messages are dispatched to the listeners of this one
+        RedisTransport(self.bus).publish("broadcast:received", [(("remote",), {})])
+        # Messages published by this node were already dispatched locally
+        self.bus.transport.publish("broadcast:received", [(("local",), {})])
+
+        self.assertTrue(received.wait(timeout=2))
+        time.sleep(0.1)
+        self.assertEqual(self.result, ["remote"])
+
+
+class TestCeleryListener(SimpleTestCase):
+    def _drain(self):
+        with app.connection_for_read() as connection:
+            queue = connection.SimpleQueue("celery")
+            messages = []
+            while queue.qsize():
+                message = queue.get(timeout=1)
+                messages.append((message.headers["task"], message.payload[0]))
+                message.ack()
+            queue.close()
+        return messages
+
+    def test_batch_published_per_event(self):
+        self._drain()
+        listener = wrap_celery_task(handle_thumbnail_generation)
+
+        listener.batch([(("first", ".png"), {}), (("second", ".png"), {})])
+
+        # One message per event, so a retry of one does not affect the others
+        task = handle_thumbnail_generation.name
+        self.assertEqual(
+            self._drain(),
+            [(task, ["first", ".png"]), (task, ["second", ".png"])],
+        )
@@ -0,0 +1,108 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from common.redis_client import get_redis_client
+from django.core.files.base import ContentFile
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from storage.models import FileAnalytics, FileShare
+from storage.services import FileAnalyticsService
+from storage.tests.common import FileTestCaseBase
+
+
+class FileAnalyticsBufferTest(FileTestCaseBase):
+    def setUp(self):
+        super().setUp()
+        get_redis_client().delete(
+            FileAnalyticsService.QUEUE_KEY,
+            FileAnalyticsService.COUNTERS_KEY,
+            FileAnalyticsService.FLUSH_SCHEDULED_KEY,
+        )
+
+        self.file = self._create_file("test_file.txt", simple_file=True)
+        self.file.file.save(f"{self.file.id}.txt", ContentFile(b"content"))
+        self.share = FileShare.objects.create(file=self.file)
+        self.url = reverse("media", kwargs={"file_path": self.file.file.name})
+        self.client.logout()
+
+    def _download(self):
+        return self.client.get(
+            f"{self.url}?token={self.share.token}", HTTP_USER_AGENT="test"
+        )
+
+    def test_download_is_queued_and_flushed(self):
+        response = self._download()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(FileAnalytics.objects.exists())
+        self.assertEqual(FileAnalyticsService.get_queue_stats()["queued"], 1)
+
+        self.assertEqual(FileAnalyticsService.flush_file_analytics(), 1)
+
+        analytics = FileAnalytics.objects.get()
+        self.assertEqual(analytics.file_share_id, self.share.id)
+        self.assertEqual(analytics.user_agent, "test")
+
+        stats = FileAnalyticsService.get_queue_stats()
+        self.assertEqual(stats["queued"], 0)
+        self.assertEqual(stats["flushed"], 1)
+
+    @override_settings(FILE_ANALYTICS_QUEUE_MAX_SIZE=2)
+    def test_events_dropped_when_queue_full(self):
+        for _ in range(3):
+            self._download()
+
+        stats = FileAnalyticsService.get_queue_stats()
+        self.assertEqual(stats["queued"], 2)
+        self.assertEqual(stats["enqueued"], 2)
+        self.assertEqual(stats["dropped"], 1)
+
+    @override_settings(FILE_ANALYTICS_BATCH_SIZE=2)
+    def test_flush_requested_once_batch_is_full(self):
+        with patch("storage.services.bus.emit") as emit:
+            for _ in range(3):
+                self._download()
+
+        emit.assert_called_once_with("analytics:batch_ready")
+
+    def test_flush_skips_deleted_shares(self):
+        self._download()
+        self.share.delete()
+
+        self.assertEqual(FileAnalyticsService.flush_file_analytics(), 0)
+        self.assertEqual(FileAnalyticsService.get_queue_stats()["queued"], 0)
+
+    @override_settings(FILE_ANALYTICS_ROLLUP_LAG=timedelta(minutes=1))
+    def test_flush_keeps_download_time(self):
+        downloaded_at = timezone.now() - timedelta(hours=1)
+        with patch("storage.services.timezone.now", return_value=downloaded_at):
+            self._download()
+            self._download()
+
+        with patch(
+            "storage.services.timezone.now",
+            return_value=downloaded_at + timedelta(seconds=20),
+        ):
+            FileAnalyticsService.flush_file_analytics()
+
+        self.assertEqual(
+            list(FileAnalytics.objects.values_list("created_at", flat=True)),
+            [downloaded_at, downloaded_at],
+        )
+
+    @override_settings(FILE_ANALYTICS_ROLLUP_LAG=timedelta(minutes=1))
+    def test_flush_moves_late_events_forward(self):
+        downloaded_at = timezone.now() - timedelta(hours=1)
+        with patch("storage.services.timezone.now", return_value=downloaded_at):
+            self._download()
+
+        flushed_at = downloaded_at + timedelta(minutes=10)
+        with patch("storage.services.timezone.now", return_value=flushed_at):
+            FileAnalyticsService.flush_file_analytics()
+
+        # Otherwise behind the checkpoint of the rollups already
+        self.assertEqual(
+            FileAnalytics.objects.get().created_at, flushed_at - timedelta(seconds=30)
+        )
@@ -0,0 +1,102 @@
+from datetime import timedelta
+
+from common.hyperloglog import HyperLogLog
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from storage.models import FileAnalytics, FileAnalyticsRollup, FileShare
+from storage.services import FileAnalyticsService
+from storage.tests.common import FileTestCaseBase
+
+User = get_user_model()
+
+
+class HyperLogLogTest(FileTestCaseBase):
+    def test_count_and_merge(self):
+        first, second = HyperLogLog(), HyperLogLog()
+        for i in range(1000):
+            first.add(f"10.0.{i // 256}.{i % 256}")
+            second.add(f"10.1.{i // 256}.{i % 256}")
+
+        self.assertAlmostEqual(first.count(), 1000, delta=100)
+
+        first.merge(HyperLogLog.from_bytes(second.to_bytes()))
+        self.assertAlmostEqual(first.count(), 2000, delta=200)
+
+
+class FileAnalyticsRollupTest(FileTestCaseBase):
+    def setUp(self):
+        super().setUp()
+        self.file = self._create_file("test_file.txt", simple_file=True)
+        self.share = FileShare.objects.create(file=self.file)
+        self.hour = timezone.now().replace(minute=0, second=0, microsecond=0)
+        self.url = reverse(
+            "file-detail-share-analytics-rollups",
+            kwargs={"pk": self.file.id, "token": self.share.token},
+        )
+
+    def _create_analytics(self, created_at, ip="127.0.0.1", referer=None):
+        analytics = FileAnalytics.objects.create(
+            file_share=self.share, ip=ip, user_agent="test", referer=referer
+        )
+        FileAnalytics.objects.filter(id=analytics.id).update(created_at=created_at)
+
+    @override_settings(FILE_ANALYTICS_ROLLUP_LAG=timedelta(0))
+    def test_rollup_is_incremental(self):
+        for i in range(3):
+            self._create_analytics(
+                self.hour - timedelta(hours=2), ip=f"10.0.0.{i}", referer="https://a"
+            )
+        self._create_analytics(self.hour - timedelta(hours=3))
+
+        self.assertEqual(FileAnalyticsService.rollup_file_analytics(), 4)
+        self.assertEqual(FileAnalyticsService.rollup_file_analytics(), 0)
+
+        FileAnalytics.objects.create(
+            file_share=self.share, ip="10.0.0.0", user_agent="test"
+        )
+        self.assertEqual(FileAnalyticsService.rollup_file_analytics(), 1)
+
+        hourly = FileAnalyticsRollup.objects.get(
+            period="hour", bucket=self.hour - timedelta(hours=2)
+        )
+        self.assertEqual(hourly.hits, 3)
+        self.assertEqual(hourly.unique_ips, 3)
+        self.assertEqual(hourly.referers, {"https://a": 3})
+
+        daily = FileAnalyticsRollup.objects.filter(period="day")
+        self.assertEqual(sum(rollup.hits for rollup in daily), 5)
+
+    def test_rollups_api(self):
+        for hours in range(1, 4):
+            self._create_analytics(self.hour - timedelta(hours=hours))
+        FileAnalyticsService.rollup_file_analytics()
+
+        response = self.client.get(self.url, {"page_size": 2})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 2)
+        self.assertEqual(
+            response.data["results"][0]["bucket"],
+            (self.hour - timedelta(hours=1)).isoformat().replace("+00:00", "Z"),
+        )
+        self.assertIsNotNone(response.data["next"])
+
+        response = self.client.get(
+            self.url, {"since": (self.hour - timedelta(hours=2)).isoformat()}
+        )
+        self.assertEqual(len(response.data["results"]), 2)
+
+    def test_rollups_api_not_owner(self):
+        self._create_analytics(self.hour - timedelta(hours=1))
+        FileAnalyticsService.rollup_file_analytics()
+
+        user = User.objects.create_user(email="test2@test.com", password="password")
+        self.client.force_authenticate(user)
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["results"], [])
@@ -0,0 +1,108 @@
+from unittest import mock
+
+from authorization.tests.common import force_authenticate
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from storage.models import Blob, File, FileShare, Group, StorageDeletion
+from storage.tests.common import FileTestCaseBase
+
+User = get_user_model()
+
+
+class FileBulkTest(FileTestCaseBase):
+    def _upload(self, content: bytes) -> File:
+        with mock.patch("storage.services.bus.emit"):
+            response = self.client.post(
+                reverse("files"),
+                {"name": "test_file", "file": SimpleUploadedFile("TEST.txt", content)},
+                format="multipart",
+            )
+        return File.objects.get(id=response.data["id"])
+
+    def _post(self, action: str, data: dict):
+        return self.client.post(
+            reverse(f"file-detail-bulk-{action}"), data, format="json"
+        )
+
+    def test_bulk_move(self):
+        files = [self._upload(b"content %d" % i) for i in range(3)]
+        group = Group.objects.create(name="group", owner=self.user)
+
+        response = self._post(
+            "move", {"ids": [files[0].id, files[1].id], "group": group.id}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 2)
+        self.assertEqual(File.objects.filter(group=group).count(), 2)
+
+        response = self._post("move", {"ids": [files[0].id], "group": None})
+
+        self.assertEqual(response.data["count"], 1)
+        self.assertEqual(File.objects.filter(group=group).count(), 1)
+
+    def test_bulk_move_foreign_group(self):
+        file = self._upload(b"content")
+        user = User.objects.create_user(email="test2@test.com", password="password")
+        group = Group.objects.create(name="group", owner=user)
+
+        response = self._post("move", {"ids": [file.id], "group": group.id})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_tags(self):
+        files = [self._upload(b"content %d" % i) for i in range(2)]
+
+        response = self._post(
+            "tags", {"ids": [file.id for file in files], "tags": ["a", "b"]}
+        )
+
+        self.assertEqual(response.data["count"], 2)
+        for file in files:
+            file.refresh_from_db()
+            self.assertEqual(file.tags, ["a", "b"])
+
+    def test_bulk_delete(self):
+        kept = self._upload(b"duplicate")
+        files = [self._upload(b"duplicate"), self._upload(b"unique")]
+        FileShare.objects.create(file=files[1])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self._post("delete", {"ids": [file.id for file in files]})
+
+        self.assertEqual(response.data["count"], 2)
+        self.assertEqual(list(File.objects.values_list("id", flat=True)), [kept.id])
+        self.assertFalse(FileShare.objects.exists())
+
+        self.assertEqual(Blob.objects.get(hash=kept.blob_id).references, 1)
+        self.assertFalse(Blob.objects.filter(hash=files[1].blob_id).exists())
+        self.assertEqual(
+            list(StorageDeletion.objects.values_list("name", flat=True)),
+            [files[1].file.name],
+        )
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.storage_used, len(b"duplicate"))
+
+    def test_bulk_delete_queries_constant(self):
+        def count_queries(files_count: int) -> int:
+            ids = [self._upload(b"content %d" % i).id for i in range(files_count)]
+            with CaptureQueriesContext(connection) as queries:
+                self._post("delete", {"ids": ids})
+            return len(queries)
+
+        self.assertEqual(count_queries(2), count_queries(10))
+
+    def test_bulk_delete_other_owner(self):
+        file = self._upload(b"content")
+        user = User.objects.create_user(email="test2@test.com", password="password")
+        force_authenticate(user, client=self.client)
+
+        response = self._post("delete", {"ids": [file.id]})
+
+        self.assertEqual(response.data["count"], 0)
+        self.assertTrue(File.objects.filter(id=file.id).exists())
@@ -1,5 +1,9 @@
+from unittest import mock
+from urllib.parse import urlsplit
+
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.urls import reverse
+from storage.models import File
 from storage.tests.common import FileTestCaseBase
 
 
@@ -30,3 +34,28 @@ class FileCreateViewTest(FileTestCaseBase):
         self.assertEqual(response.status_code, 202)
         self.assertEqual(response.data["name"], "test_file.txt")
         self.assertEqual(response.data["size"], 445)
+
+    def test_file_create_view_stores_content(self):
+        """
+        Test if the uploaded content is written to storage during the request and
+        only the file id and extension are emitted on the event bus.
+        """
+        url = reverse("files")
+        content = b"Lorem ipsum dolor sit amet."
+        data = {
+            "name": "test_file",
+            "file": SimpleUploadedFile("TEST.txt", content),
+        }
+
+        with mock.patch("storage.services.bus.emit") as emit:
+            response = self.client.post(url, data, format="multipart")
+
+        self.assertEqual(response.status_code, 202)
+
+        file = File.objects.get(id=response.data["id"])
+        self.assertEqual(file.file.name, file.blob.file.name)
+        self.assertEqual(urlsplit(response.data["file"]).path, f"/media/{file.id}.txt")
+        with file.file.open("rb") as f:
+            self.assertEqual(f.read(), content)
+
+        emit.assert_called_once_with("file:created", str(file.id), ".txt")
@@ -0,0 +1,63 @@
+from datetime import timedelta
+
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from storage.models import File
+from storage.tests.common import FileTestCaseBase
+
+
+class FileListViewTest(FileTestCaseBase):
+    def setUp(self):
+        super().setUp()
+        created_at = timezone.now()
+        for i in range(5):
+            file = File.objects.create(
+                name=f"file_{i}.txt", file=f"file_{i}.txt", size=i + 1, owner=self.user
+            )
+            # Two files share the timestamp, so the id has to break the tie
+            File.objects.filter(id=file.id).update(
+                created_at=created_at - timedelta(seconds=min(i, 3))
+            )
+
+        self.expected_ids = [
+            str(file_id)
+            for file_id in File.objects.order_by("-created_at", "-id").values_list(
+                "id", flat=True
+            )
+        ]
+
+    def test_list_files_unpaginated(self):
+        response = self.client.get(reverse("files"))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 5)
+
+    def test_list_files_paginated(self):
+        ids = []
+        url = f"{reverse('files')}?page_size=2"
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(response.data["results"]), 2)
+
+            ids += [file["id"] for file in response.data["results"]]
+            url = response.data["next"]
+
+        self.assertEqual(ids, self.expected_ids)
+
+    def test_list_files_invalid_cursor(self):
+        response = self.client.get(reverse("files"), {"cursor": "invalid"})
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_list_files_sparse_fieldset(self):
+        response = self.client.get(reverse("files"), {"fields": "id,name,size"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(response.data[0]), {"id", "name", "size"})
+
+    def test_list_files_unknown_field(self):
+        response = self.client.get(reverse("files"), {"fields": "id,owner"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
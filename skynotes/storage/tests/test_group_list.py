@@ -1,5 +1,6 @@
 from django.contrib.auth import get_user_model
 from django.urls import reverse
+from storage.models import File
 
 from .common import GroupTestCaseBase
 
@@ -22,6 +23,30 @@ class GroupListViewTest(GroupTestCaseBase):
         self.assertEqual(len(response.data), 1)
         self.assertEqual(response.data[0]["name"], "Test Group")
 
+    def test_list_groups_files_stats(self):
+        group = self._create_group(name="Another Group", owner=self.user)
+        for size in (10, 20):
+            File.objects.create(
+                name="file.txt",
+                file="file.txt",
+                size=size,
+                group=group,
+                owner=self.user,
+            )
+
+        # One query authenticates the user, the other lists the groups
+        with self.assertNumQueries(2):
+            response = self.client.get(
+                reverse("groups"),
+                content_type="application/json",
+            )
+
+        groups = {group["name"]: group for group in response.data}
+        self.assertEqual(groups["Another Group"]["files"], 2)
+        self.assertEqual(groups["Another Group"]["size"], 30)
+        self.assertEqual(groups["Test Group"]["files"], 0)
+        self.assertIsNone(groups["Test Group"]["size"])
+
     def test_list_groups_unauthenticated(self):
         self.client.force_authenticate(user=None)
         response = self.client.get(
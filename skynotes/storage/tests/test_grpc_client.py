@@ -0,0 +1,58 @@
+import io
+from concurrent import futures
+
+import grpc
+from django.test import SimpleTestCase
+from services.grpc_client import STREAM_CHUNK_SIZE, ChannelPool, Client
+from thumbnailer import thumbnailer_pb2, thumbnailer_pb2_grpc
+
+
+class ChannelPoolTest(SimpleTestCase):
+    def test_channel_reused(self):
+        pool = ChannelPool()
+
+        channel = pool.get("localhost:50051")
+
+        self.assertIs(pool.get("localhost:50051"), channel)
+        self.assertIsNot(pool.get("localhost:50052"), channel)
+
+        pool.close()
+        self.assertIsNot(pool.get("localhost:50051"), channel)
+        pool.close()
+
+
+class EchoThumbnailServicer(thumbnailer_pb2_grpc.ThumbnailServiceServicer):
+    def GenerateThumbnailStream(self, request_iterator, context):
+        chunks = list(request_iterator)
+        self.options = chunks[0].options
+        self.chunks_count = len(chunks)
+        return thumbnailer_pb2.ThumbnailResponse(
+            thumbnail=b"".join(chunk.content for chunk in chunks)
+        )
+
+
+class ClientStreamTest(SimpleTestCase):
+    def setUp(self):
+        self.servicer = EchoThumbnailServicer()
+        self.server = grpc.server(futures.ThreadPoolExecutor(max_workers=1))
+        thumbnailer_pb2_grpc.add_ThumbnailServiceServicer_to_server(
+            self.servicer, self.server
+        )
+        port = self.server.add_insecure_port("localhost:0")
+        self.server.start()
+        self.client = Client(f"localhost:{port}", timeout=10)
+
+    def tearDown(self):
+        self.server.stop(None)
+
+    def test_generate_thumbnail_stream(self):
+        content = b"x" * (STREAM_CHUNK_SIZE * 2 + 10)
+
+        thumbnail = self.client.generate_thumbnail_stream(
+            io.BytesIO(content), "video/mp4"
+        )
+
+        self.assertEqual(thumbnail, content)
+        self.assertEqual(self.servicer.options.content_type, "video/mp4")
+        # Options are sent on their own, followed by three content chunks
+        self.assertEqual(self.servicer.chunks_count, 4)
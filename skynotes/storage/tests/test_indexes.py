@@ -0,0 +1,58 @@
+from django.db import connection
+from storage.models import File, FileAnalytics, FileShare, Group
+from storage.tests.common import FileTestCaseBase
+
+
+class QueryPlanTest(FileTestCaseBase):
+    """
+    Check the hot lookups are served by their indexes. Sequential scans are
+    disabled, as they would win on the tiny test tables.
+    """
+
+    def setUp(self):
+        super().setUp()
+        with connection.cursor() as cursor:
+            cursor.execute("SET enable_seqscan = off")
+
+    def tearDown(self):
+        with connection.cursor() as cursor:
+            cursor.execute("RESET enable_seqscan")
+        super().tearDown()
+
+    def assertUsesIndex(self, queryset, index_name: str):
+        plan = queryset.explain()
+        self.assertIn(index_name, plan, plan)
+        self.assertNotIn("Sort", plan, plan)
+
+    def test_file_listing(self):
+        group = Group.objects.create(name="Test Group", owner=self.user)
+        files = File.objects.filter(owner=self.user, group=group).order_by(
+            "-created_at", "-id"
+        )
+        self.assertUsesIndex(files[:100], "storage_file_listing_idx")
+
+    def test_ungrouped_file_listing(self):
+        files = File.objects.filter(owner=self.user, group=None).order_by(
+            "-created_at", "-id"
+        )
+        self.assertUsesIndex(files[:100], "storage_file_ungrouped_idx")
+
+    def test_ungrouped_file_listing_not_ordered_by_listing_index(self):
+        # Rolled back with the test transaction
+        with connection.cursor() as cursor:
+            cursor.execute("DROP INDEX storage_file_ungrouped_idx")
+
+        files = File.objects.filter(owner=self.user, group=None).order_by(
+            "-created_at", "-id"
+        )
+        self.assertIn("Sort", files[:100].explain())
+
+    def test_share_analytics(self):
+        analytics = FileAnalytics.objects.filter(file_share_id=self.user.id)
+        self.assertUsesIndex(analytics[:100], "storage_analytics_share_idx")
+
+    def test_active_share(self):
+        shares = FileShare.objects.filter(
+            file_id=self.user.id, token=self.user.id, is_active=True
+        ).order_by()
+        self.assertIn("storage_share_active_idx", shares.explain())
@@ -0,0 +1,371 @@
+import time
+from io import BytesIO
+from unittest import mock
+from urllib.parse import urlsplit
+
+from authorization.tests.common import force_authenticate
+from common.redis_client import get_redis_client
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.test import AsyncRequestFactory, override_settings
+from django.urls import reverse
+from PIL import Image
+from rest_framework import status
+from rest_framework_simplejwt.tokens import RefreshToken
+from storage.cache import get_file_metadata
+from storage.media import sign_media_path
+from storage.models import File, FileShare
+from storage.tests.common import FileTestCaseBase
+from storage.tests.test_thumbnails import get_image
+from storage.views import AsyncMediaView
+
+User = get_user_model()
+
+CONTENT = b"0123456789abcdefghijklmnopqrstuvwxyz"
+
+
+class MediaViewRangeTest(FileTestCaseBase):
+    def setUp(self):
+        super().setUp()
+        self.file = self._create_file("test_file.txt", simple_file=True)
+        self.file.file.save(f"{self.file.id}.txt", ContentFile(CONTENT))
+        self.url = reverse("media", kwargs={"file_path": self.file.file.name})
+
+    def _get(self, **headers):
+        return self.client.get(self.url, **headers)
+
+    def test_media_full_response(self):
+        response = self._get()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(b"".join(response.streaming_content), CONTENT)
+        self.assertEqual(response.headers["Accept-Ranges"], "bytes")
+        self.assertIn("ETag", response.headers)
+        self.assertIn("Last-Modified", response.headers)
+        # Authorized by the cookie, so never stored by shared caches
+        self.assertEqual(response.headers["Cache-Control"], "private, no-cache")
+        self.assertNotIn("Expires", response.headers)
+
+    def test_media_single_range(self):
+        response = self._get(HTTP_RANGE="bytes=10-19")
+
+        self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT)
+        self.assertEqual(b"".join(response.streaming_content), CONTENT[10:20])
+        self.assertEqual(
+            response.headers["Content-Range"], f"bytes 10-19/{len(CONTENT)}"
+        )
+        self.assertEqual(response.headers["Content-Length"], "10")
+
+    def test_media_suffix_range(self):
+        response = self._get(HTTP_RANGE="bytes=-6")
+
+        self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT)
+        self.assertEqual(b"".join(response.streaming_content), CONTENT[-6:])
+
+    def test_media_multiple_ranges(self):
+        response = self._get(HTTP_RANGE="bytes=0-1,5-7")
+
+        self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT)
+        self.assertTrue(
+            response.headers["Content-Type"].startswith("multipart/byteranges")
+        )
+        body = b"".join(response.streaming_content)
+        self.assertEqual(len(body), int(response.headers["Content-Length"]))
+        self.assertIn(b"Content-Range: bytes 0-1/36\r\n\r\n01\r\n", body)
+        self.assertIn(b"Content-Range: bytes 5-7/36\r\n\r\n567\r\n", body)
+
+    def test_media_unsatisfiable_range(self):
+        response = self._get(HTTP_RANGE="bytes=100-200")
+
+        self.assertEqual(
+            response.status_code, status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE
+        )
+        self.assertEqual(response.headers["Content-Range"], f"bytes */{len(CONTENT)}")
+        self.assertNotIn("Cache-Control", response.headers)
+
+    def test_media_not_modified(self):
+        etag = self._get().headers["ETag"]
+
+        response = self._get(HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.headers["Cache-Control"], "private, no-cache")
+
+    def test_media_if_range_mismatch(self):
+        response = self._get(HTTP_RANGE="bytes=0-1", HTTP_IF_RANGE='"outdated"')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(b"".join(response.streaming_content), CONTENT)
+
+    @override_settings(MEDIA_OFFLOAD="x-accel-redirect")
+    def test_media_offload(self):
+        response = self._get(HTTP_RANGE="bytes=0-1")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(
+            response.headers["X-Accel-Redirect"],
+            f"/protected-media/{self.file.file.name}",
+        )
+
+
+class MediaViewAccessTest(FileTestCaseBase):
+    def setUp(self):
+        super().setUp()
+        self.file = self._create_file("test_file.txt", simple_file=True)
+        self.file.file.save(f"{self.file.id}.txt", ContentFile(CONTENT))
+        self.url = reverse("media", kwargs={"file_path": self.file.file.name})
+        self.share = FileShare.objects.create(file=self.file)
+
+    def test_media_metadata_cached(self):
+        self.client.get(self.url)
+
+        with self.assertNumQueries(0):
+            self.assertIsNotNone(get_file_metadata(str(self.file.id)))
+
+    def test_media_revoked_share(self):
+        url = f"{self.url}?token={self.share.token}"
+        self.client.logout()
+
+        response = self.client.get(url, HTTP_USER_AGENT="test")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # Revalidated on every use, so revoking the share takes effect
+        self.assertEqual(response.headers["Cache-Control"], "private, no-cache")
+
+        self.share.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.share.save()
+
+        response = self.client.get(url, HTTP_USER_AGENT="test")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_media_deleted_file(self):
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.delete(
+                reverse("file-detail-detail", kwargs={"pk": self.file.id})
+            )
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+        self.assertEqual(
+            self.client.get(self.url).status_code, status.HTTP_404_NOT_FOUND
+        )
+
+    def test_media_metadata_invalidated_on_commit(self):
+        self.client.get(self.url)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            File.objects.get(id=self.file.id).save()
+            # Kept until commit, so it is not cached again from the previous row
+            with self.assertNumQueries(0):
+                get_file_metadata(str(self.file.id))
+
+        self.assertEqual(len(callbacks), 1)
+        callbacks[0]()
+        with self.assertNumQueries(2):
+            get_file_metadata(str(self.file.id))
+
+    def test_media_not_owner(self):
+        user = User.objects.create_user(email="test2@test.com", password="password")
+        force_authenticate(user, client=self.client)
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class MediaSignedUrlTest(FileTestCaseBase):
+    def setUp(self):
+        super().setUp()
+        self.file = self._create_file("test_file.txt", simple_file=True)
+        self.file.file.save(f"{self.file.id}.txt", ContentFile(CONTENT))
+
+        response = self.client.get(
+            reverse("file-detail-detail", kwargs={"pk": self.file.id})
+        )
+        self.url = urlsplit(response.data["file"])
+        self.client.credentials()
+        self.client.cookies.clear()
+
+    def test_signed_url_served(self):
+        url = f"{self.url.path}?{self.url.query}"
+        self.client.get(url)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(b"".join(response.streaming_content), CONTENT)
+        cache_control, max_age = response.headers["Cache-Control"].split("max-age=")
+        self.assertEqual(cache_control, "public, ")
+        self.assertLessEqual(int(max_age), 60 * 20)
+        self.assertNotIn("Expires", response.headers)
+
+    @override_settings(THUMBNAIL_SIZES=(64, 256), THUMBNAIL_FORMATS=("png",))
+    def test_signed_thumbnail(self):
+        self.file.save_thumbnail(ContentFile(get_image(400, 200)))
+        force_authenticate(self.user, client=self.client)
+        response = self.client.get(
+            reverse("file-detail-detail", kwargs={"pk": self.file.id})
+        )
+        url = urlsplit(response.data["thumbnail"])
+        self.client.credentials()
+        self.client.cookies.clear()
+
+        response = self.client.get(f"{url.path}?{url.query}")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        image = Image.open(BytesIO(b"".join(response.streaming_content)))
+        self.assertEqual(image.size, (256, 128))
+
+        # The variant is signed too
+        query = url.query.replace("thumbnail=256", "thumbnail=64")
+        response = self.client.get(f"{url.path}?{query}")
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_signed_url_stable(self):
+        with mock.patch("storage.media.time.time", return_value=600):
+            first = sign_media_path(self.url.path, self.user.id)
+        with mock.patch("storage.media.time.time", return_value=899):
+            second = sign_media_path(self.url.path, self.user.id)
+
+        self.assertEqual(first, second)
+
+    def test_signed_url_tampered(self):
+        other = self._create_file("other.txt", simple_file=True)
+        other_path = reverse("media", kwargs={"file_path": f"{other.id}.txt"})
+
+        response = self.client.get(f"{other_path}?{self.url.query}")
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_signed_url_expired(self):
+        with mock.patch("storage.media.time.time", return_value=time.time() + 3600):
+            response = self.client.get(f"{self.url.path}?{self.url.query}")
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class MediaRateLimitTest(FileTestCaseBase):
+    def setUp(self):
+        super().setUp()
+        self.file = self._create_file("test_file.txt", simple_file=True)
+        self.file.file.save(f"{self.file.id}.txt", ContentFile(CONTENT))
+        self.url = reverse("media", kwargs={"file_path": self.file.file.name})
+
+        client = get_redis_client()
+        for key in client.scan_iter("ratelimit:media:*"):
+            client.delete(key)
+
+    @override_settings(
+        MEDIA_RATE_LIMITS={"user": {"requests": {"rate": 0.01, "burst": 2}}}
+    )
+    def test_requests_limited(self):
+        for _ in range(2):
+            self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response.headers["Retry-After"], "100")
+
+    @override_settings(MEDIA_RATE_LIMITS={"user": {"bytes": {"rate": 1, "burst": 10}}})
+    def test_bytes_limited(self):
+        # A transfer larger than the burst is served, the next waits for the debt
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+
+        response = self.client.get(self.url, HTTP_RANGE="bytes=0-1")
+
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response.headers["Retry-After"], str(len(CONTENT) - 10 + 1))
+
+    @override_settings(
+        MEDIA_RATE_LIMITS={
+            "share": {"requests": {"rate": 0.01, "burst": 1}},
+            "ip": {"requests": {"rate": 0.01, "burst": 2}},
+        }
+    )
+    def test_shares_limited(self):
+        self.client.logout()
+        shares = [FileShare.objects.create(file=self.file) for _ in range(3)]
+
+        def get(share, ip):
+            url = f"{self.url}?token={share.token}"
+            return self.client.get(url, REMOTE_ADDR=ip).status_code
+
+        self.assertEqual(get(shares[0], "10.0.0.1"), status.HTTP_200_OK)
+        self.assertEqual(get(shares[0], "10.0.0.2"), status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(get(shares[1], "10.0.0.1"), status.HTTP_200_OK)
+        self.assertEqual(get(shares[2], "10.0.0.1"), status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(get(shares[2], "10.0.0.2"), status.HTTP_200_OK)
+
+
+class AsyncMediaViewTest(FileTestCaseBase):
+    def setUp(self):
+        super().setUp()
+        self.file = self._create_file("test_file.txt", simple_file=True)
+        self.file.file.save(f"{self.file.id}.txt", ContentFile(CONTENT))
+        self.share = FileShare.objects.create(file=self.file)
+        self.token = RefreshToken.for_user(self.user).access_token
+
+    async def _get(self, data=None, **headers):
+        request = AsyncRequestFactory().get(
+            reverse("media", kwargs={"file_path": self.file.file.name}),
+            data,
+            headers=headers,
+        )
+        return await AsyncMediaView.as_view()(request, file_path=self.file.file.name)
+
+    async def _read(self, response):
+        return b"".join([chunk async for chunk in response.streaming_content])
+
+    async def test_async_media_full_response(self):
+        response = await self._get(Authorization=f"Bearer {self.token}")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.is_async)
+        self.assertEqual(await self._read(response), CONTENT)
+        self.assertEqual(response.headers["Content-Length"], str(len(CONTENT)))
+
+    async def test_async_media_range(self):
+        response = await self._get(
+            Authorization=f"Bearer {self.token}", Range="bytes=10-19"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT)
+        self.assertEqual(await self._read(response), CONTENT[10:20])
+
+    async def test_async_media_share(self):
+        response = await self._get({"token": str(self.share.token)})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(await self._read(response), CONTENT)
+
+    async def test_async_media_signed(self):
+        response = await self._get(sign_media_path(self.file.file.name, self.user.id))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(await self._read(response), CONTENT)
+
+    @override_settings(
+        MEDIA_RATE_LIMITS={"user": {"requests": {"rate": 0.01, "burst": 1}}}
+    )
+    async def test_async_media_rate_limited(self):
+        client = get_redis_client()
+        for key in client.scan_iter("ratelimit:media:*"):
+            client.delete(key)
+
+        response = await self._get(Authorization=f"Bearer {self.token}")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        await self._read(response)
+
+        response = await self._get(Authorization=f"Bearer {self.token}")
+
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    async def test_async_media_unauthenticated(self):
+        response = await self._get()
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
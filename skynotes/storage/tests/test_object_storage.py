@@ -0,0 +1,159 @@
+import hashlib
+import json
+from unittest import mock
+from urllib.parse import parse_qs, urlsplit
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from storage.models import File, StorageDeletion
+from storage.tests.common import FileTestCaseBase, FileTransactionTestCaseBase
+
+CONTENT = b"Lorem ipsum dolor sit amet, consectetur adipiscing elit."
+DIGEST = hashlib.sha256(CONTENT).hexdigest()
+
+# Presigned URLs are signed locally, so no MinIO server has to be running
+s3_storage = override_settings(
+    STORAGES={
+        "default": {"BACKEND": "storages.backends.s3.S3Storage"},
+        "staticfiles": {
+            "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"
+        },
+    },
+    AWS_STORAGE_BUCKET_NAME="skynotes",
+    AWS_S3_ENDPOINT_URL="http://minio:9000",
+    AWS_S3_ACCESS_KEY_ID="skynotes",
+    AWS_S3_SECRET_ACCESS_KEY="skynotes",
+    AWS_S3_REGION_NAME="us-east-1",
+    AWS_S3_ADDRESSING_STYLE="path",
+)
+
+
+class PresignedMediaTest(FileTestCaseBase):
+    def setUp(self):
+        super().setUp()
+        self.file = self._create_file("test_file.txt", simple_file=True)
+        self.file.file.save(f"{self.file.id}.txt", ContentFile(CONTENT))
+        self.url = reverse("media", kwargs={"file_path": self.file.file.name})
+
+    @s3_storage
+    @override_settings(MEDIA_PRESIGNED_URL_EXPIRE=60)
+    def test_media_redirect(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_302_FOUND)
+        self.assertEqual(response.headers["Cache-Control"], "private, max-age=30")
+
+        location = urlsplit(response.headers["Location"])
+        query = parse_qs(location.query)
+        self.assertEqual(location.netloc, "minio:9000")
+        self.assertEqual(location.path, f"/skynotes/{self.file.file.name}")
+        self.assertEqual(query["X-Amz-Expires"], ["60"])
+        self.assertEqual(query["response-content-type"], ["text/plain"])
+        self.assertIn("X-Amz-Signature", query)
+
+    @s3_storage
+    def test_media_redirect_after_access_check(self):
+        self.client.logout()
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class DirectUploadTestMixin:
+    def _create_session(self, **kwargs):
+        data = {"name": "test_file.txt", "size": len(CONTENT), **kwargs}
+        return self.client.post(
+            reverse("upload-session-list"),
+            data=json.dumps(data),
+            content_type="application/json",
+        )
+
+    def _finalize(self, session_id):
+        return self.client.post(reverse("upload-session-finalize", args=[session_id]))
+
+
+class DirectUploadTest(DirectUploadTestMixin, FileTestCaseBase):
+    @s3_storage
+    def test_direct_upload_request(self):
+        response = self._create_session(sha256=DIGEST, content_type="text/plain")
+
+        upload = response.data["upload"]
+        self.assertEqual(upload["method"], "PUT")
+        self.assertEqual(
+            urlsplit(upload["url"]).path,
+            f"/skynotes/staging/{response.data['id']}.txt",
+        )
+        self.assertEqual(
+            upload["headers"],
+            {
+                "Content-Length": str(len(CONTENT)),
+                "Content-Type": "text/plain",
+                "x-amz-checksum-sha256": "pY3YaAI0wfjMLvKzJaQ3M2BafxbyiOBy3o6ugf2NZDM=",
+            },
+        )
+
+        # Without a digest the content is uploaded in chunks
+        self.assertIsNone(self._create_session().data["upload"])
+
+    @mock.patch("storage.services.supports_presigned_urls", return_value=True)
+    def test_direct_upload_finalize(self, _supports_presigned_urls):
+        session_id = self._create_session(sha256=DIGEST).data["id"]
+
+        response = self._finalize(session_id)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        # Uploaded by the client with the presigned request
+        staged_name = f"staging/{session_id}.txt"
+        default_storage.save(staged_name, ContentFile(CONTENT))
+
+        response = self._finalize(session_id)
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        file = File.objects.get(id=response.data["id"])
+        name = f"blobs/{DIGEST[:2]}/{DIGEST}.txt"
+        self.assertEqual(file.blob_id, DIGEST)
+        self.assertEqual(file.file.name, name)
+        self.assertEqual(file.blob.references, 1)
+        with default_storage.open(name) as f:
+            self.assertEqual(f.read(), CONTENT)
+        self.assertTrue(StorageDeletion.objects.filter(name=staged_name).exists())
+
+    @mock.patch("storage.services.supports_presigned_urls", return_value=True)
+    def test_direct_upload_digest_verified(self, _supports_presigned_urls):
+        # Content of another user, whose digest and size are known
+        other = self._create_session(sha256=DIGEST).data["id"]
+        default_storage.save(f"staging/{other}.txt", ContentFile(CONTENT))
+        self.assertEqual(self._finalize(other).status_code, status.HTTP_202_ACCEPTED)
+
+        session_id = self._create_session(sha256=DIGEST).data["id"]
+
+        response = self._finalize(session_id)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        forged = CONTENT.upper()
+        default_storage.save(f"staging/{session_id}.txt", ContentFile(forged))
+
+        response = self._finalize(session_id)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(File.objects.filter(blob_id=DIGEST).count(), 1)
+
+
+class DirectUploadCommitTest(DirectUploadTestMixin, FileTransactionTestCaseBase):
+    @mock.patch("storage.services.supports_presigned_urls", return_value=True)
+    def test_direct_upload_finalize_committed(self, _supports_presigned_urls):
+        visible = self._listen_file_created()
+        session_id = self._create_session(sha256=DIGEST).data["id"]
+        default_storage.save(f"staging/{session_id}.txt", ContentFile(CONTENT))
+
+        response = self._finalize(session_id)
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        # The thumbnail task only runs once the file is committed
+        self.assertEqual(visible, [True])
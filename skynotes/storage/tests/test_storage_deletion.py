@@ -0,0 +1,94 @@
+import os
+import shutil
+import tempfile
+import uuid
+from datetime import timedelta
+from io import StringIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from storage.models import File, StorageDeletion, UploadSession
+from storage.services import StorageService
+from storage.tests.common import FileTestCaseBase
+
+
+class StorageDeletionTest(FileTestCaseBase):
+    def setUp(self):
+        super().setUp()
+        self.uploads_root = tempfile.mkdtemp()
+        self.settings = override_settings(UPLOAD_SESSIONS_ROOT=self.uploads_root)
+        self.settings.enable()
+
+    def tearDown(self):
+        self.settings.disable()
+        shutil.rmtree(self.uploads_root)
+        super().tearDown()
+
+    def _create_stored_file(self) -> File:
+        file = self._create_file("test_file.txt", simple_file=True)
+        file.thumbnail.save(f"{file.id}_thumb.png", ContentFile(b"thumbnail"))
+        return file
+
+    def test_destroy_queues_deletion(self):
+        file = self._create_stored_file()
+        names = {file.file.name, file.thumbnail.name}
+
+        response = self.client.delete(reverse("file-detail-detail", args=[file.id]))
+
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(
+            set(StorageDeletion.objects.values_list("name", flat=True)), names
+        )
+        self.assertTrue(all(default_storage.exists(name) for name in names))
+
+        self.assertEqual(StorageService.process_deletions(), 2)
+
+        self.assertFalse(StorageDeletion.objects.exists())
+        self.assertFalse(any(default_storage.exists(name) for name in names))
+
+    def test_owner_deletion_queues_deletion(self):
+        file = self._create_stored_file()
+
+        self.user.delete()
+
+        self.assertTrue(StorageDeletion.objects.filter(name=file.file.name).exists())
+
+    def test_sweep_orphans(self):
+        file = self._create_stored_file()
+        orphan = default_storage.save("orphan.txt", ContentFile(b"orphan"))
+
+        self.assertEqual(StorageService.sweep_orphans(dry_run=True), [])
+
+        orphans = StorageService.sweep_orphans(grace_period=timedelta(0))
+
+        self.assertEqual(orphans, [orphan])
+        self.assertEqual(
+            list(StorageDeletion.objects.values_list("name", flat=True)), [orphan]
+        )
+
+        StorageService.process_deletions()
+
+        self.assertFalse(default_storage.exists(orphan))
+        self.assertTrue(default_storage.exists(file.file.name))
+
+    def test_sweep_upload_sessions(self):
+        session = UploadSession.objects.create(
+            owner=self.user,
+            name="test_file",
+            size=16,
+            chunk_size=16,
+            expires_at=timezone.now() + timedelta(hours=1),
+        )
+        pending = os.path.join(self.uploads_root, str(session.id))
+        orphan = os.path.join(self.uploads_root, str(uuid.uuid4()))
+        os.makedirs(pending)
+        os.makedirs(orphan)
+
+        call_command("sweep_orphaned_files", grace_period=0, stdout=StringIO())
+
+        self.assertTrue(os.path.isdir(pending))
+        self.assertFalse(os.path.isdir(orphan))
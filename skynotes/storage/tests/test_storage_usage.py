@@ -0,0 +1,78 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from storage.models import UploadSession
+from storage.services import FileService, UploadSessionService
+from storage.tests.common import FileTestCaseBase
+
+CONTENT = b"Lorem ipsum dolor sit amet."
+
+
+class StorageUsageTest(FileTestCaseBase):
+    def _upload(self):
+        with mock.patch("storage.services.bus.emit"):
+            return self.client.post(
+                reverse("files"),
+                {"name": "test_file", "file": SimpleUploadedFile("TEST.txt", CONTENT)},
+                format="multipart",
+            )
+
+    def test_upload_and_delete_update_storage_used(self):
+        response = self._upload()
+        self.assertEqual(response.status_code, 202)
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.storage_used, len(CONTENT))
+
+        self.client.delete(reverse("file-detail-detail", args=[response.data["id"]]))
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.storage_used, 0)
+
+    def test_upload_storage_limit(self):
+        self.user.storage_used = self.user.storage_limit - len(CONTENT) + 1
+        self.user.save()
+
+        response = self._upload()
+
+        self.assertEqual(response.status_code, 400)
+        self.user.refresh_from_db()
+        self.assertEqual(
+            self.user.storage_used, self.user.storage_limit - len(CONTENT) + 1
+        )
+
+    def test_reserve_storage(self):
+        self.assertTrue(FileService.reserve_storage(self.user.id, 100))
+        self.assertFalse(FileService.reserve_storage(self.user.id, 1 << 40))
+
+        FileService.release_storage(self.user.id, 200)
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.storage_used, 0)
+
+    def test_aborted_session_releases_storage(self):
+        FileService.reserve_storage(self.user.id, 100)
+        session = UploadSession.objects.create(
+            name="test.txt",
+            size=100,
+            chunk_size=16,
+            expires_at=timezone.now(),
+            owner=self.user,
+        )
+
+        UploadSessionService.abort(session)
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.storage_used, 0)
+
+    def test_reconcile_storage_usage(self):
+        file = self._create_file("test_file", simple_file=True)
+
+        call_command("reconcile_storage_usage", stdout=StringIO())
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.storage_used, file.size)
@@ -0,0 +1,105 @@
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+from rest_framework import status
+from storage.tests.common import FileTestCaseBase
+from storage.thumbnails import negotiate_format, select_thumbnail
+
+
+def get_image(width: int, height: int) -> bytes:
+    buffer = BytesIO()
+    Image.new("RGB", (width, height)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class ThumbnailNegotiationTest(SimpleTestCase):
+    def test_negotiate_format(self):
+        formats = {"webp", "png"}
+
+        self.assertEqual(
+            negotiate_format("image/avif,image/webp,image/*,*/*;q=0.8", formats),
+            "webp",
+        )
+        self.assertEqual(negotiate_format("image/webp;q=0,*/*", formats), "png")
+        self.assertEqual(negotiate_format("*/*", formats), "png")
+        self.assertEqual(negotiate_format(None, formats), "png")
+
+    def test_select_thumbnail(self):
+        thumbnails = [(64, "png", "64.png"), (256, "png", "256.png")]
+
+        self.assertEqual(select_thumbnail(thumbnails, 32, "png"), "64.png")
+        self.assertEqual(select_thumbnail(thumbnails, 100, "png"), "256.png")
+        self.assertEqual(select_thumbnail(thumbnails, 2048, "png"), "256.png")
+        self.assertIsNone(select_thumbnail(thumbnails, 64, "webp"))
+
+
+@override_settings(THUMBNAIL_SIZES=(64, 256, 1024), THUMBNAIL_FORMATS=("webp", "png"))
+class ThumbnailRenditionsTest(FileTestCaseBase):
+    def setUp(self):
+        super().setUp()
+        self.file = self._create_file("test_file.txt", simple_file=True)
+        self.file.file.save(f"{self.file.id}.txt", ContentFile(b"content"))
+        self.file.save_thumbnail(ContentFile(get_image(400, 200)))
+        self.url = reverse("media", kwargs={"file_path": self.file.file.name})
+
+    def test_renditions_saved(self):
+        renditions = sorted(
+            self.file.thumbnails.values_list("size", "format", "width", "height")
+        )
+
+        # 1024 is larger than the source, so only its resolution is kept
+        self.assertEqual(
+            renditions,
+            [
+                (64, "png", 64, 32),
+                (64, "webp", 64, 32),
+                (256, "png", 256, 128),
+                (256, "webp", 256, 128),
+                (1024, "png", 400, 200),
+                (1024, "webp", 400, 200),
+            ],
+        )
+        self.assertTrue(self.file.thumbnail)
+
+    def test_rendition_negotiated(self):
+        response = self.client.get(
+            self.url, {"thumbnail": "100"}, HTTP_ACCEPT="image/webp,*/*"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("Accept", response.headers["Vary"])
+        image = Image.open(BytesIO(b"".join(response.streaming_content)))
+        self.assertEqual((image.format, image.size), ("WEBP", (256, 128)))
+
+    def test_rendition_format_requested(self):
+        response = self.client.get(
+            self.url,
+            {"thumbnail": "64", "format": "png"},
+            HTTP_ACCEPT="image/webp,*/*",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("Accept", response.headers["Vary"])
+        image = Image.open(BytesIO(b"".join(response.streaming_content)))
+        self.assertEqual((image.format, image.size), ("PNG", (64, 32)))
+
+    def test_rendition_invalid_format(self):
+        response = self.client.get(self.url, {"thumbnail": "64", "format": "gif"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_legacy_thumbnail(self):
+        response = self.client.get(self.url, {"thumbnail": "true"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        image = Image.open(BytesIO(b"".join(response.streaming_content)))
+        self.assertEqual(image.size, (400, 200))
+
+    def test_renditions_deleted(self):
+        self.file.delete_thumbnails()
+
+        self.assertFalse(self.file.thumbnails.exists())
+        self.assertFalse(self.file.thumbnail)
@@ -0,0 +1,159 @@
+import json
+import shutil
+import tempfile
+
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from storage.models import File, UploadSession
+from storage.tests.common import FileTestCaseBase, FileTransactionTestCaseBase
+
+CONTENT = b"Lorem ipsum dolor sit amet, consectetur adipiscing elit."
+
+
+class UploadSessionTestMixin:
+    def setUp(self):
+        super().setUp()
+        self.uploads_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(
+            UPLOAD_SESSIONS_ROOT=self.uploads_root, UPLOAD_CHUNK_SIZE=16
+        )
+        self.settings_override.enable()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.uploads_root, ignore_errors=True)
+        super().tearDown()
+
+    def _create_session(self, **kwargs):
+        data = {"name": "test_file.txt", "size": len(CONTENT), **kwargs}
+        return self.client.post(
+            reverse("upload-session-list"),
+            data=json.dumps(data),
+            content_type="application/json",
+        )
+
+    def _upload_chunk(self, session_id, index, content, **headers):
+        return self.client.put(
+            reverse("upload-session-upload-chunk", args=[session_id, index]),
+            data=content,
+            content_type="application/octet-stream",
+            **headers,
+        )
+
+    def _chunks(self):
+        return [CONTENT[i : i + 16] for i in range(0, len(CONTENT), 16)]
+
+
+class UploadSessionViewTest(UploadSessionTestMixin, FileTestCaseBase):
+    def test_upload_session_create(self):
+        response = self._create_session()
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["chunk_size"], 16)
+        self.assertEqual(response.data["received_chunks"], [])
+
+    def test_upload_session_storage_limit(self):
+        response = self._create_session(size=self.user.storage_limit + 1)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_upload_session_reserves_storage(self):
+        self._create_session(size=self.user.storage_limit - 10)
+
+        response = self._create_session(size=11)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_upload_session_finalize(self):
+        session_id = self._create_session().data["id"]
+
+        # Chunks can be uploaded in any order
+        for index, chunk in reversed(list(enumerate(self._chunks()))):
+            response = self._upload_chunk(session_id, index, chunk)
+            self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+        response = self.client.get(reverse("upload-session-detail", args=[session_id]))
+        self.assertEqual(response.data["received_chunks"], [0, 1, 2, 3])
+
+        response = self.client.post(
+            reverse("upload-session-finalize", args=[session_id])
+        )
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+
+        file = File.objects.get(id=response.data["id"])
+        self.assertEqual(file.name, "test_file.txt")
+        self.assertEqual(file.size, len(CONTENT))
+        with file.file.open("rb") as f:
+            self.assertEqual(f.read(), CONTENT)
+
+        session = UploadSession.objects.get(id=session_id)
+        self.assertEqual(session.file, file)
+
+    def test_upload_session_finalize_missing_chunks(self):
+        session_id = self._create_session().data["id"]
+        self._upload_chunk(session_id, 0, self._chunks()[0])
+
+        response = self.client.post(
+            reverse("upload-session-finalize", args=[session_id])
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(File.objects.exists())
+
+    def test_upload_session_finalize_digest_mismatch(self):
+        session_id = self._create_session(sha256="0" * 64).data["id"]
+        for index, chunk in enumerate(self._chunks()):
+            self._upload_chunk(session_id, index, chunk)
+
+        response = self.client.post(
+            reverse("upload-session-finalize", args=[session_id])
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(File.objects.exists())
+
+    def test_upload_chunk_invalid_length(self):
+        session_id = self._create_session().data["id"]
+
+        response = self._upload_chunk(session_id, 0, b"too short")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_upload_chunk_offset_mismatch(self):
+        session_id = self._create_session().data["id"]
+
+        response = self._upload_chunk(
+            session_id,
+            1,
+            self._chunks()[1],
+            HTTP_CONTENT_RANGE=f"bytes 0-15/{len(CONTENT)}",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_upload_session_abort(self):
+        session_id = self._create_session().data["id"]
+
+        response = self.client.delete(
+            reverse("upload-session-detail", args=[session_id])
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(UploadSession.objects.filter(id=session_id).exists())
+
+
+class UploadSessionCommitTest(UploadSessionTestMixin, FileTransactionTestCaseBase):
+    def test_upload_session_finalize_committed(self):
+        visible = self._listen_file_created()
+        session_id = self._create_session().data["id"]
+        for index, chunk in enumerate(self._chunks()):
+            self._upload_chunk(session_id, index, chunk)
+
+        response = self.client.post(
+            reverse("upload-session-finalize", args=[session_id])
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        # The thumbnail task only runs once the file is committed
+        self.assertEqual(visible, [True])
@@ -0,0 +1,131 @@
+from io import BytesIO
+
+from django.conf import settings
+from PIL import Image
+
+CONTENT_TYPES = {
+    "avif": "image/avif",
+    "webp": "image/webp",
+    "png": "image/png",
+}
+
+# Preferred when the client accepts several formats equally, smallest files first
+FORMATS_PREFERENCE = ["avif", "webp", "png"]
+
+# Served when the client does not ask for a format we have
+DEFAULT_FORMAT = "png"
+
+
+def get_thumbnail_formats() -> list:
+    """
+    Get the configured thumbnail formats that can be encoded by the Pillow build.
+    """
+    Image.init()
+    return [
+        thumbnail_format
+        for thumbnail_format in settings.THUMBNAIL_FORMATS
+        if thumbnail_format.upper() in Image.SAVE
+    ]
+
+
+def render_thumbnails(content: bytes) -> list:
+    """
+    Render all the renditions of a thumbnail in one pass, scaling the image down
+    from the largest size to the smallest.
+
+    Sizes larger than the source are skipped, except the smallest of them which
+    keeps the source resolution.
+
+    Parameters:
+        content (bytes): The source thumbnail.
+
+    Returns:
+        list: Tuples of (size, format, width, height, content) of the renditions.
+    """
+    image = Image.open(BytesIO(content))
+    image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+
+    sizes = sorted(settings.THUMBNAIL_SIZES)
+    fitting = [size for size in sizes if size < max(image.size)]
+    sizes = fitting + sizes[len(fitting) : len(fitting) + 1]
+
+    formats = get_thumbnail_formats()
+    renditions = []
+
+    for size in reversed(sizes):
+        image.thumbnail((size, size), Image.LANCZOS)
+
+        for thumbnail_format in formats:
+            buffer = BytesIO()
+            image.save(buffer, format=thumbnail_format.upper())
+            renditions.append((size, thumbnail_format, *image.size, buffer.getvalue()))
+
+    return renditions
+
+
+def negotiate_format(accept: str, formats) -> str:
+    """
+    Choose the thumbnail format to serve from the `Accept` header. Only formats
+    listed explicitly count, as browsers send `*/*` with every image request.
+
+    Parameters:
+        accept (str): The value of the `Accept` header.
+        formats (Iterable[str]): The available formats.
+
+    Returns:
+        str: The best available format accepted by the client, or `DEFAULT_FORMAT`.
+    """
+    qualities = {}
+
+    for media_range in (accept or "").split(","):
+        media_type, *params = [part.strip() for part in media_range.split(";")]
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[media_type.lower()] = quality
+
+    accepted = [
+        thumbnail_format
+        for thumbnail_format in FORMATS_PREFERENCE
+        if thumbnail_format in formats
+        and qualities.get(CONTENT_TYPES[thumbnail_format], 0) > 0
+    ]
+    if not accepted:
+        return DEFAULT_FORMAT
+
+    return max(
+        accepted,
+        key=lambda thumbnail_format: qualities[CONTENT_TYPES[thumbnail_format]],
+    )
+
+
+def select_thumbnail(thumbnails: list, size: int, thumbnail_format: str):
+    """
+    Select the smallest rendition that covers the requested size, or the largest
+    one if none does.
+
+    Parameters:
+        thumbnails (list): Tuples of (size, format, name) of the renditions.
+        size (int): The requested size, in pixels.
+        thumbnail_format (str): The requested format.
+
+    Returns:
+        str | None: The name of the rendition, or None if there is none in the format.
+    """
+    candidates = sorted(
+        (thumbnail_size, name)
+        for thumbnail_size, rendition_format, name in thumbnails
+        if rendition_format == thumbnail_format
+    )
+    if not candidates:
+        return None
+
+    for thumbnail_size, name in candidates:
+        if thumbnail_size >= size:
+            return name
+    return candidates[-1][1]
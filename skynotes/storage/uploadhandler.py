@@ -0,0 +1,44 @@
+import hashlib
+
+from django.core.files.uploadhandler import (
+    MemoryFileUploadHandler,
+    TemporaryFileUploadHandler,
+)
+
+
+class HashingUploadHandlerMixin:
+    """
+    Compute the SHA-256 digest of uploaded files while they are received, so
+    content-addressed storage does not have to read them again.
+
+    The digest is set as `sha256` on the uploaded file.
+    """
+
+    def new_file(self, *args, **kwargs):
+        # Set first, the in-memory handler raises `StopFutureHandlers` when active
+        self.hasher = hashlib.sha256()
+        super().new_file(*args, **kwargs)
+
+    def receive_data_chunk(self, raw_data, start):
+        # The in-memory handler passes uploads too large for it to the next one
+        if getattr(self, "activated", True):
+            self.hasher.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        file = super().file_complete(file_size)
+        if file is not None:
+            file.sha256 = self.hasher.hexdigest()
+        return file
+
+
+class HashingMemoryFileUploadHandler(
+    HashingUploadHandlerMixin, MemoryFileUploadHandler
+):
+    pass
+
+
+class HashingTemporaryFileUploadHandler(
+    HashingUploadHandlerMixin, TemporaryFileUploadHandler
+):
+    pass
@@ -6,10 +6,12 @@ from storage.views import (
     FilesListView,
     GroupListCreateView,
     GroupRetrieveUpdateDestroyView,
+    UploadSessionView,
 )
 
 file_details_router = DefaultRouter()
 file_details_router.register(r"file", FileDetailsView, basename="file-detail")
+file_details_router.register(r"uploads", UploadSessionView, basename="upload-session")
 
 urlpatterns = [
     path("files/", FilesListView.as_view(), name="files"),
@@ -1,33 +1,77 @@
+import re
+import time
 import uuid
 from http import HTTPMethod
 
+from asgiref.sync import sync_to_async
 from authorization.authentication import JWTCookiesAuthentication
+from authorization.cache import build_user
+from django.conf import settings
+from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
-from django.db import models
 from django.http import Http404, HttpResponseBadRequest, HttpResponseForbidden
-from django.http.response import FileResponse
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
-from django.utils.decorators import method_decorator
+from django.utils.cache import patch_vary_headers
 from django.views import View
-from django.views.decorators.cache import cache_page
-from drf_spectacular.utils import extend_schema
+from drf_spectacular.utils import OpenApiParameter, extend_schema
 from rest_framework import mixins, parsers, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.exceptions import AuthenticationFailed
 from rest_framework.generics import ListCreateAPIView, RetrieveUpdateDestroyAPIView
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from storage.models import File, FileShare, Group
+from storage.cache import (
+    aget_file_metadata,
+    aget_share_metadata,
+    get_file_metadata,
+    get_share_metadata,
+)
+from storage.media import (
+    aserve_media,
+    discard_media,
+    get_media_etag,
+    get_transfer_size,
+    is_range_continuation,
+    limit_media_rate,
+    redirect_media,
+    serve_media,
+    verify_media_signature,
+)
+from storage.models import (
+    File,
+    FileShare,
+    Group,
+    Thumbnail,
+    ThumbnailFormat,
+    UploadSession,
+    UploadSessionStatus,
+)
+from storage.pagination import FileAnalyticsRollupPagination, FileCursorPagination
 from storage.serializers import (
+    FileAnalyticsRollupFilterSerializer,
+    FileAnalyticsRollupSerializer,
     FileAnalyticsSerializer,
+    FileBulkMoveSerializer,
+    FileBulkResultSerializer,
+    FileBulkSerializer,
+    FileBulkTagsSerializer,
     FileSerializer,
     FileShareSerializer,
     FileShareUrlSerializer,
     GroupDetailsSerializer,
     GroupSerializer,
+    UploadSessionSerializer,
 )
-from storage.services import FileAnalyticsService, FileService
+from storage.services import (
+    FileAnalyticsService,
+    FileService,
+    UploadSessionError,
+    UploadSessionService,
+)
+from storage.thumbnails import negotiate_format, select_thumbnail
+
+User = get_user_model()
 
 
 @extend_schema(tags=["files"])
@@ -57,12 +101,58 @@ class FileDetailsView(
 
     @extend_schema(description="Delete file")
     def destroy(self, request, *args, **kwargs):
-        file = self.get_object()
-        file.file.delete()
-        if file.thumbnail:
-            file.thumbnail.delete()
+        # Stored content is deleted in the background, see `StorageDeletion`
         return super().destroy(request, *args, **kwargs)
 
+    @extend_schema(
+        description="Move many files to a group, or out of any group with `null`",
+        request=FileBulkMoveSerializer,
+        responses={200: FileBulkResultSerializer},
+    )
+    @action(detail=False, methods=[HTTPMethod.POST], url_path="bulk/move")
+    def bulk_move(self, request):
+        serializer = FileBulkMoveSerializer(
+            data=request.data, context={"request": request}
+        )
+        serializer.is_valid(raise_exception=True)
+
+        count = FileService.bulk_update(
+            request.user,
+            serializer.validated_data["ids"],
+            group=serializer.validated_data["group"],
+        )
+        return Response({"count": count})
+
+    @extend_schema(
+        description="Replace the tags of many files",
+        request=FileBulkTagsSerializer,
+        responses={200: FileBulkResultSerializer},
+    )
+    @action(detail=False, methods=[HTTPMethod.POST], url_path="bulk/tags")
+    def bulk_tags(self, request):
+        serializer = FileBulkTagsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        count = FileService.bulk_update(
+            request.user,
+            serializer.validated_data["ids"],
+            tags=serializer.validated_data["tags"],
+        )
+        return Response({"count": count})
+
+    @extend_schema(
+        description="Delete many files",
+        request=FileBulkSerializer,
+        responses={200: FileBulkResultSerializer},
+    )
+    @action(detail=False, methods=[HTTPMethod.POST], url_path="bulk/delete")
+    def bulk_delete(self, request):
+        serializer = FileBulkSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        count = FileService.bulk_delete(request.user, serializer.validated_data["ids"])
+        return Response({"count": count})
+
     # Todo: refactor this method to another view for better separation of concerns
     @extend_schema(
         request=FileShareSerializer,
@@ -135,24 +225,62 @@ class FileDetailsView(
 
         return Response(serializer.data)
 
+    @extend_schema(
+        description="Retrieve hourly or daily analytics of the share, newest first",
+        parameters=[FileAnalyticsRollupFilterSerializer],
+        responses={200: FileAnalyticsRollupSerializer(many=True)},
+    )
+    @action(
+        detail=True,
+        methods=[HTTPMethod.GET],
+        url_path="share/(?P<token>[^/.]+)/analytics/rollups",
+        pagination_class=FileAnalyticsRollupPagination,
+    )
+    def share_analytics_rollups(self, request, pk=None, token=None):
+        filters = FileAnalyticsRollupFilterSerializer(data=request.query_params)
+        filters.is_valid(raise_exception=True)
+
+        rollups = FileAnalyticsService.get_file_analytics_rollups(
+            token, pk, request.user, **filters.validated_data
+        )
+        page = self.paginate_queryset(rollups)
+        serializer = FileAnalyticsRollupSerializer(page, many=True)
+
+        return self.get_paginated_response(serializer.data)
+
 
 @extend_schema(tags=["files"])
 class FilesListView(APIView):
     parser_classes = (parsers.MultiPartParser,)
 
     @extend_schema(
-        description="Retrieve files without any associated group",
+        description=(
+            "Retrieve files without any associated group. Files are paginated "
+            "when `cursor` or `page_size` is given, and `fields` selects the "
+            "returned fields, e.g. `?fields=id,name,size`."
+        ),
+        parameters=[
+            OpenApiParameter("fields", str),
+            OpenApiParameter("cursor", str),
+            OpenApiParameter("page_size", int),
+        ],
         responses={200: FileSerializer(many=True)},
     )
     def get(self, request, group=None, *args, **kwargs):
-        files = File.objects.filter(owner=request.user, group=group).all()
-        serializer = FileSerializer(files, many=True)
+        fields = FileSerializer.parse_fields(request.query_params.get("fields"))
 
-        return Response(serializer.data)
+        files = File.objects.filter(owner=request.user, group=group)
+        if fields:
+            files = files.only("created_at", "owner", *fields)
 
-    def __get_user_storage_size(self, user):
-        total_sum = File.objects.filter(owner=user).aggregate(models.Sum("size"))
-        return total_sum["size__sum"] if total_sum["size__sum"] else 0
+        paginator = FileCursorPagination()
+        if paginator.is_requested(request):
+            page = paginator.paginate_queryset(files, request, view=self)
+            serializer = FileSerializer(page, many=True, fields=fields)
+            return paginator.get_paginated_response(serializer.data)
+
+        serializer = FileSerializer(files, many=True, fields=fields)
+        return Response(serializer.data)
 
     @extend_schema(
         description="Upload file",
@@ -162,9 +290,7 @@ class FilesListView(APIView):
     def post(self, request, *args, **kwargs):
         file = request.data["file"]
 
-        total_sum = self.__get_user_storage_size(request.user)
-
-        if total_sum + file.size > request.user.storage_limit:
+        if not FileService.reserve_storage(request.user.id, file.size):
             return Response(
                 {"error": "Storage limit exceeded"}, status=status.HTTP_400_BAD_REQUEST
             )
@@ -174,18 +300,147 @@ class FilesListView(APIView):
         serializer = FileSerializer(data=request.data)
 
         if serializer.is_valid():
-            serializer.save(owner=request.user, size=file.size)
+            try:
+                instance = serializer.save(owner=request.user, size=file.size)
+            except Exception:
+                FileService.release_storage(request.user.id, file.size)
+                raise
 
             extension = "." + file.name.split(".")[-1] if "." in file.name else None
 
-            FileService.upload_file(
-                serializer.data["id"], file.read(), file.content_type, extension
-            )
+            FileService.upload_file(instance, file, extension)
 
             return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
+
+        FileService.release_storage(request.user.id, file.size)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+@extend_schema(tags=["uploads"])
+class UploadSessionView(
+    mixins.CreateModelMixin,
+    mixins.RetrieveModelMixin,
+    mixins.DestroyModelMixin,
+    viewsets.GenericViewSet,
+):
+    queryset = UploadSession.objects.all()
+    serializer_class = UploadSessionSerializer
+
+    CONTENT_RANGE_RE = re.compile(r"^bytes (\d+)-(\d+)/(\d+)$")
+
+    def get_queryset(self):
+        return UploadSession.objects.filter(
+            owner=self.request.user,
+            status=UploadSessionStatus.PENDING,
+            expires_at__gt=timezone.now(),
+        )
+
+    @extend_schema(
+        description=(
+            "Start upload session and reserve storage for it. Sessions with a "
+            "SHA-256 digest are uploaded directly to object storages with the "
+            "returned `upload` request instead of in chunks"
+        ),
+        request=UploadSessionSerializer,
+        responses={201: UploadSessionSerializer},
+    )
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+
+        if serializer.is_valid():
+            size = serializer.validated_data["size"]
+
+            if not FileService.reserve_storage(request.user.id, size):
+                return Response(
+                    {"error": "Storage limit exceeded"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+            try:
+                serializer.save(
+                    owner=request.user,
+                    chunk_size=settings.UPLOAD_CHUNK_SIZE,
+                    expires_at=timezone.now() + settings.UPLOAD_SESSION_LIFETIME,
+                )
+            except Exception:
+                FileService.release_storage(request.user.id, size)
+                raise
+            return Response(serializer.data, status=status.HTTP_201_CREATED)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    @extend_schema(description="Retrieve upload session with its received chunks")
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+    @extend_schema(description="Abort upload session and release reserved storage")
+    def destroy(self, request, *args, **kwargs):
+        UploadSessionService.abort(self.get_object())
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    def _get_chunk_offset(self, request, session):
+        """
+        Get the chunk offset from the optional `Content-Range` header.
+
+        Raises:
+            UploadSessionError: If the header is malformed or does not match the
+            upload session.
+        """
+        content_range = request.headers.get("Content-Range")
+        if not content_range:
+            return None
+
+        match = self.CONTENT_RANGE_RE.match(content_range)
+        if not match:
+            raise UploadSessionError("Invalid Content-Range header")
+
+        start, _end, total = map(int, match.groups())
+        if total != session.size:
+            raise UploadSessionError("Content-Range total does not match session")
+
+        return start
+
+    @extend_schema(
+        description="Upload chunk with the given index as raw request body",
+        request={"application/octet-stream": bytes},
+        responses={204: None},
+    )
+    @action(detail=True, methods=[HTTPMethod.PUT], url_path=r"chunks/(?P<index>\d+)")
+    def upload_chunk(self, request, pk=None, index=None):
+        session = self.get_object()
+
+        if request.stream is None:
+            return Response(
+                {"error": "Chunk is empty"}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            offset = self._get_chunk_offset(request, session)
+            UploadSessionService.write_chunk(
+                session, int(index), request.stream, offset
+            )
+        except UploadSessionError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @extend_schema(
+        description="Create file from the uploaded chunks or direct upload",
+        request=None,
+        responses={202: FileSerializer},
+    )
+    @action(detail=True, methods=[HTTPMethod.POST])
+    def finalize(self, request, pk=None):
+        session = self.get_object()
+
+        try:
+            file = UploadSessionService.finalize(session)
+        except UploadSessionError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        serializer = FileSerializer(file)
+        return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
+
+
 class FilesGroupedListView(APIView):
     @extend_schema(
         description="Retrieve files with associated groups",
@@ -200,7 +455,7 @@ class GroupListCreateView(ListCreateAPIView):
     serializer_class = GroupDetailsSerializer
 
     def get_queryset(self):
-        return Group.objects.filter(owner=self.request.user)
+        return Group.objects.filter(owner=self.request.user).with_files_stats()
 
     @extend_schema(
         description="Retrieve all user groups",
@@ -224,146 +479,269 @@ class GroupRetrieveUpdateDestroyView(RetrieveUpdateDestroyAPIView):
     lookup_field = "id"
 
     def get_queryset(self):
-        return Group.objects.filter(owner=self.request.user)
+        return Group.objects.filter(owner=self.request.user).with_files_stats()
 
 
 class MediaView(View):
-    def __user_permissions_to_file(self, user, file):
+    def __user_permissions_to_file(self, user, file_metadata):
         """
         A function that checks if the given user has permissions to access the file.
 
         Parameters:
             user (User): The user object representing the user.
-            file (File): The file object representing the file.
+            file_metadata (dict): The cached metadata of the file.
 
         Returns:
             bool: True if the user has permissions to access the file, False otherwise.
         """
-        return file.owner == user
+        return file_metadata["owner_id"] == str(user.id)
 
-    def _check_file_access(self, request, file_id, *, get_thumbnail=False):
+    def _authenticate(self, request):
         """
-        Checks the file access for the given user and file ID.
+        Authenticates the user of the request with the JWT cookie or header.
 
         Parameters:
             request (HttpRequest): The HTTP request object.
-            file_id (int): The ID of the file to check access for.
 
         Returns:
-            tuple: A tuple containing a boolean value indicating whether the user
-            has access to the file, and the file object if access is granted,
-            otherwise None.
+            HttpResponse | None: The response to return if the user could not be
+            authenticated, otherwise None.
         """
-        user = request.user
+        jwt_auth = JWTCookiesAuthentication()
+        try:
+            user_auth_tuple = jwt_auth.authenticate(request)
+        except AuthenticationFailed:
+            return HttpResponseForbidden("Invalid authentication.")
 
-        if not user or not user.is_authenticated:
-            return False, None
+        if user_auth_tuple is None:
+            return HttpResponseForbidden("You are not authorized to access this media.")
 
-        file_object = get_object_or_404(File, id=file_id)
-        if get_thumbnail:
-            file = file_object.thumbnail
-        else:
-            file = file_object.file
+        request.user, request.auth = user_auth_tuple
+        return None
 
-        if user.is_staff or user.is_superuser:
-            return True, file
+    def _authenticate_signature(self, request, file_path):
+        """
+        Authenticates the user of the request with the signature of the media URL,
+        see `sign_media_path`, without querying the database.
 
-        if self.__user_permissions_to_file(user, file_object):
-            return True, file
+        Parameters:
+            request (HttpRequest): The HTTP request object.
+            file_path (str): The requested media path.
+
+        Returns:
+            int | None: The expiry timestamp of the signed URL, or None if it is not
+            validly signed.
+        """
+        signed = verify_media_signature(file_path, request.GET)
+        if signed is None:
+            return None
 
-        return False, None
+        user_id, expires = signed
+        request.user = build_user({"id": User._meta.pk.to_python(user_id)})
+        return expires
 
-    def _check_token_access(self, file_id, token, *, password=None):
+    def _check_file_access(self, user, file_metadata):
         """
-        Checks the file access for the given token and file ID.
+        Checks the file access for the given user.
 
         Parameters:
-            file_id (int): The ID of the file to check access for.
-            token (str): The token to check access for.
+            user (User): The user object representing the user.
+            file_metadata (dict): The cached metadata of the file.
 
         Returns:
-            tuple: A tuple containing a boolean value indicating whether the token
-            has access to the file, and the file object if access is granted,
-            otherwise None.
+            bool: True if the user has access to the file, False otherwise.
         """
-        try:
-            token = uuid.UUID(token, version=4)
-        except ValueError:
-            return False, None
+        if not user or not user.is_authenticated:
+            return False
 
-        file_object = get_object_or_404(File, id=file_id)
-        file_share_object = get_object_or_404(
-            FileShare, file=file_object, token=token, is_active=True
-        )
+        # Owners first, users of signed URLs have their other fields deferred
+        if self.__user_permissions_to_file(user, file_metadata):
+            return True
+
+        return user.is_staff or user.is_superuser
+
+    def _check_token_access(self, file_metadata, share_metadata, *, password=None):
+        """
+        Checks the file access for the given share.
+
+        Parameters:
+            file_metadata (dict): The cached metadata of the file.
+            share_metadata (dict | None): The cached metadata of the share.
+            password (str): The password of the share, if any.
+
+        Returns:
+            bool: True if the share grants access to the file, False otherwise.
+        """
+        if (
+            share_metadata is None
+            or share_metadata["file_id"] != file_metadata["id"]
+            or not share_metadata["is_active"]
+        ):
+            raise Http404("File share not found.")
 
         if (
-            file_share_object.shared_until
-            and file_share_object.shared_until < timezone.now()
+            share_metadata["shared_until"]
+            and share_metadata["shared_until"] < timezone.now()
         ):
-            return False, None
+            return False
+
+        if share_metadata["password"] and share_metadata["password"] != password:
+            return False
+
+        return True
+
+    def _get_media(self, request, file_metadata, token):
+        """
+        Selects the media to serve, the file itself or one of its thumbnails.
+
+        Parameters:
+            request (HttpRequest): The HTTP request object.
+            file_metadata (dict): The cached metadata of the file.
+            token (str): The share token, thumbnails are not shared.
+
+        Returns:
+            tuple: The storage holding the media, its name, and whether the choice
+            depends on the `Accept` header.
+        """
+        thumbnail = request.GET.get("thumbnail") if not token else None
+        thumbnail_format = request.GET.get("format")
+        vary_accept = False
+
+        field = File._meta.get_field("file")
+        name = file_metadata["file"]
+
+        if thumbnail is not None:
+            field = File._meta.get_field("thumbnail")
+            name = file_metadata["thumbnail"]
+
+            renditions = file_metadata.get("thumbnails")
+            if thumbnail.isdigit() and renditions:
+                if not thumbnail_format:
+                    vary_accept = True
+                    thumbnail_format = negotiate_format(
+                        request.headers.get("Accept"),
+                        {rendition[1] for rendition in renditions},
+                    )
+
+                field = Thumbnail._meta.get_field("image")
+                name = select_thumbnail(renditions, int(thumbnail), thumbnail_format)
+
+        if not name:
+            raise Http404("File not found.")
+
+        return field.storage, name, vary_accept
+
+    def _should_record_analytics(self, request, token):
+        # Seeking in media players issues many range requests for one download
+        return bool(token) and not is_range_continuation(request)
+
+    def _record_analytics(self, request, token):
+        if settings.FILE_ANALYTICS_BUFFERED:
+            record_analytics = FileAnalyticsService.record_file_analytics
+        else:
+            record_analytics = FileAnalyticsService.create_file_analytics
+
+        record_analytics(
+            token,
+            request.META.get("REMOTE_ADDR"),
+            request.META.get("HTTP_USER_AGENT"),
+            request.META.get("HTTP_REFERER"),
+        )
+
+    def _limit_rate(self, request, share_token, file_metadata, name, response):
+        """
+        Applies the rate limits of the client to the response, see
+        `MEDIA_RATE_LIMITS`.
+
+        Parameters:
+            request (HttpRequest): The HTTP request object.
+            share_token (UUID | None): The share token of the request.
+            file_metadata (dict): The cached metadata of the file.
+            name (str): The name of the served media.
+            response (HttpResponse): The response serving the media.
+
+        Returns:
+            HttpResponse | None: The response to return if a limit is exceeded,
+            otherwise None.
+        """
+        if not settings.MEDIA_RATE_LIMITING:
+            return None
+
+        if share_token:
+            identities = {"share": share_token, "ip": request.META.get("REMOTE_ADDR")}
+        else:
+            identities = {"user": request.user.id}
 
-        if file_share_object.password and file_share_object.password != password:
-            return False, None
+        # Thumbnails are small, and their size is only known to the storage
+        size = file_metadata.get("size", 0) if name == file_metadata["file"] else 0
 
-        if file_share_object.token == token:
-            return True, file_object.file
+        return limit_media_rate(identities, get_transfer_size(request, response, size))
 
-        return False, None
+    def _get_max_age(self, expires):
+        # Only signed URLs are cached publicly, and not beyond their expiry
+        return max(int(expires - time.time()), 0) if expires else None
+
+    def _get_validators(self, file_metadata, name):
+        updated_at = file_metadata["updated_at"]
+        return {
+            "etag": get_media_etag(name, updated_at),
+            "last_modified": int(updated_at.timestamp()),
+        }
 
-    @method_decorator(cache_page(60 * 15))
     def get(self, request, file_path, *args, **kwargs):
         try:
             file_id = self._get_file_id(file_path)
+            share_token = self._parse_query(request)
         except ValidationError as e:
             return HttpResponseBadRequest(e.message)
 
         token = request.GET.get("token")
-        password = request.GET.get("password")
+        expires = not token and self._authenticate_signature(request, file_path)
 
-        if not token:
-            jwt_auth = JWTCookiesAuthentication()
-            try:
-                user_auth_tuple = jwt_auth.authenticate(request)
-                if user_auth_tuple is not None:
-                    request.user, request.auth = user_auth_tuple
-                else:
-                    return HttpResponseForbidden(
-                        "You are not authorized to access this media."
-                    )
-            except AuthenticationFailed:
-                return HttpResponseForbidden("Invalid authentication.")
+        if not token and not expires and (error := self._authenticate(request)):
+            return error
 
-        get_thumbnail = "thumbnail" in request.GET
+        file_metadata = get_file_metadata(file_id)
+        if file_metadata is None:
+            raise Http404("File not found.")
 
         if token:
-            access, file = self._check_token_access(file_id, token, password=password)
-        else:
-            access, file = self._check_file_access(
-                request, file_id, get_thumbnail=get_thumbnail
+            access = share_token is not None and self._check_token_access(
+                file_metadata,
+                get_share_metadata(share_token),
+                password=request.GET.get("password"),
             )
+        else:
+            access = self._check_file_access(request.user, file_metadata)
 
-        if access:
-            if not file:
-                return Http404("File not found.")
+        if not access:
+            return HttpResponseForbidden("You are not authorized to access this media.")
 
-            if token:
-                FileAnalyticsService.create_file_analytics(
-                    token,
-                    request.META.get("REMOTE_ADDR"),
-                    request.META.get("HTTP_USER_AGENT"),
-                    request.META.get("HTTP_REFERER"),
-                )
+        storage, name, vary_accept = self._get_media(request, file_metadata, token)
 
-            response = FileResponse(file, filename=file.name)
+        response = redirect_media(storage, name) or serve_media(
+            request,
+            storage,
+            name,
+            max_age=self._get_max_age(expires),
+            **self._get_validators(file_metadata, name),
+        )
+
+        if limited := self._limit_rate(
+            request, share_token, file_metadata, name, response
+        ):
+            discard_media(response)
+            return limited
 
-            response.headers["Cache-Control"] = "public, max-age=31536000"
-            response.headers["Expires"] = "31536000"
+        if self._should_record_analytics(request, token):
+            self._record_analytics(request, token)
 
-            return response
-        return HttpResponseForbidden("You are not authorized to access this media.")
+        if vary_accept:
+            patch_vary_headers(response, ["Accept"])
+        return response
 
     def _get_file_id(self, file_path):
-        file_id = file_path.split(".")[0].rstrip("_thumb")
+        file_id = file_path.split(".")[0].removesuffix("_thumb")
 
         try:
             uuid.UUID(file_id, version=4)
@@ -371,3 +749,87 @@ class MediaView(View):
             raise ValidationError("Invalid ID format")
 
         return file_id
+
+    def _parse_query(self, request):
+        """
+        Validates the query parameters of the request.
+
+        Returns:
+            UUID | None: The share token, or None if there is no valid one.
+
+        Raises:
+            ValidationError: If the requested thumbnail format is invalid.
+        """
+        thumbnail_format = request.GET.get("format")
+        if thumbnail_format and thumbnail_format not in ThumbnailFormat.values:
+            raise ValidationError("Invalid thumbnail format.")
+
+        try:
+            return uuid.UUID(request.GET.get("token", ""), version=4)
+        except ValueError:
+            return None
+
+
+class AsyncMediaView(MediaView):
+    """
+    MediaView for ASGI servers, see `MEDIA_ASYNC`.
+
+    Files are streamed without holding a thread for the whole transfer, so a single
+    worker serves many slow downloads at once.
+    """
+
+    async def get(self, request, file_path, *args, **kwargs):
+        try:
+            file_id = self._get_file_id(file_path)
+            share_token = self._parse_query(request)
+        except ValidationError as e:
+            return HttpResponseBadRequest(e.message)
+
+        token = request.GET.get("token")
+        expires = not token and self._authenticate_signature(request, file_path)
+
+        if (
+            not token
+            and not expires
+            and (error := await sync_to_async(self._authenticate)(request))
+        ):
+            return error
+
+        file_metadata = await aget_file_metadata(file_id)
+        if file_metadata is None:
+            raise Http404("File not found.")
+
+        if token:
+            access = share_token is not None and self._check_token_access(
+                file_metadata,
+                await aget_share_metadata(share_token),
+                password=request.GET.get("password"),
+            )
+        else:
+            access = self._check_file_access(request.user, file_metadata)
+
+        if not access:
+            return HttpResponseForbidden("You are not authorized to access this media.")
+
+        storage, name, vary_accept = self._get_media(request, file_metadata, token)
+
+        response = redirect_media(storage, name) or await aserve_media(
+            request,
+            storage,
+            name,
+            max_age=self._get_max_age(expires),
+            **self._get_validators(file_metadata, name),
+        )
+
+        if limited := await sync_to_async(self._limit_rate)(
+            request, share_token, file_metadata, name, response
+        ):
+            discard_media(response)
+            return limited
+
+        if self._should_record_analytics(request, token):
+            await sync_to_async(self._record_analytics)(request, token)
+
+        if vary_accept:
+            patch_vary_headers(response, ["Accept"])
+        return response
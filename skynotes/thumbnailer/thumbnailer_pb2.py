@@ -14,7 +14,7 @@ _sym_db = _symbol_database.Default()
 
 
 DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(
-    b'\n\x11thumbnailer.proto\x12\x0bthumbnailer"#\n\x10ThumbnailRequest\x12\x0f\n\x07\x63ontent\x18\x01 \x01(\x0c"&\n\x11ThumbnailResponse\x12\x11\n\tthumbnail\x18\x01 \x01(\x0c\x32\x66\n\x10ThumbnailService\x12R\n\x11GenerateThumbnail\x12\x1d.thumbnailer.ThumbnailRequest\x1a\x1e.thumbnailer.ThumbnailResponseB\x08Z\x06./grpcb\x06proto3'  # noqa
+    b'\n\x11thumbnailer.proto\x12\x0bthumbnailer"#\n\x10ThumbnailRequest\x12\x0f\n\x07\x63ontent\x18\x01 \x01(\x0c"&\n\x11ThumbnailResponse\x12\x11\n\tthumbnail\x18\x01 \x01(\x0c"G\n\x10ThumbnailOptions\x12\x14\n\x0c\x63ontent_type\x18\x01 \x01(\t\x12\r\n\x05width\x18\x02 \x01(\r\x12\x0e\n\x06height\x18\x03 \x01(\r"Q\n\x0eThumbnailChunk\x12.\n\x07options\x18\x01 \x01(\x0b\x32\x1d.thumbnailer.ThumbnailOptions\x12\x0f\n\x07\x63ontent\x18\x02 \x01(\x0c",\n\rThumbnailItem\x12\n\n\x02id\x18\x01 \x01(\t\x12\x0f\n\x07\x63ontent\x18\x02 \x01(\x0c"?\n\x0fThumbnailResult\x12\n\n\x02id\x18\x01 \x01(\t\x12\x11\n\tthumbnail\x18\x02 \x01(\x0c\x12\r\n\x05\x65rror\x18\x03 \x01(\t"r\n\x15\x42\x61tchThumbnailRequest\x12)\n\x05items\x18\x01 \x03(\x0b\x32\x1a.thumbnailer.ThumbnailItem\x12.\n\x07options\x18\x02 \x01(\x0b\x32\x1d.thumbnailer.ThumbnailOptions"G\n\x16\x42\x61tchThumbnailResponse\x12-\n\x07results\x18\x01 \x03(\x0b\x32\x1c.thumbnailer.ThumbnailResult2\x9f\x02\n\x10ThumbnailService\x12R\n\x11GenerateThumbnail\x12\x1d.thumbnailer.ThumbnailRequest\x1a\x1e.thumbnailer.ThumbnailResponse\x12X\n\x17GenerateThumbnailStream\x12\x1b.thumbnailer.ThumbnailChunk\x1a\x1e.thumbnailer.ThumbnailResponse(\x01\x12]\n\x12GenerateThumbnails\x12".thumbnailer.BatchThumbnailRequest\x1a#.thumbnailer.BatchThumbnailResponseB\x08Z\x06./grpcb\x06proto3'  # noqa
 )
 
 _globals = globals()
@@ -27,6 +27,18 @@ if _descriptor._USE_C_DESCRIPTORS == False:  # noqa
     _globals["_THUMBNAILREQUEST"]._serialized_end = 69
     _globals["_THUMBNAILRESPONSE"]._serialized_start = 71
     _globals["_THUMBNAILRESPONSE"]._serialized_end = 109
-    _globals["_THUMBNAILSERVICE"]._serialized_start = 111
-    _globals["_THUMBNAILSERVICE"]._serialized_end = 213
+    _globals["_THUMBNAILOPTIONS"]._serialized_start = 111
+    _globals["_THUMBNAILOPTIONS"]._serialized_end = 182
+    _globals["_THUMBNAILCHUNK"]._serialized_start = 184
+    _globals["_THUMBNAILCHUNK"]._serialized_end = 265
+    _globals["_THUMBNAILITEM"]._serialized_start = 267
+    _globals["_THUMBNAILITEM"]._serialized_end = 311
+    _globals["_THUMBNAILRESULT"]._serialized_start = 313
+    _globals["_THUMBNAILRESULT"]._serialized_end = 376
+    _globals["_BATCHTHUMBNAILREQUEST"]._serialized_start = 378
+    _globals["_BATCHTHUMBNAILREQUEST"]._serialized_end = 492
+    _globals["_BATCHTHUMBNAILRESPONSE"]._serialized_start = 494
+    _globals["_BATCHTHUMBNAILRESPONSE"]._serialized_end = 565
+    _globals["_THUMBNAILSERVICE"]._serialized_start = 568
+    _globals["_THUMBNAILSERVICE"]._serialized_end = 855
 # @@protoc_insertion_point(module_scope)
@@ -18,6 +18,16 @@ class ThumbnailServiceStub(object):
             request_serializer=thumbnailer__pb2.ThumbnailRequest.SerializeToString,
             response_deserializer=thumbnailer__pb2.ThumbnailResponse.FromString,
         )
+        self.GenerateThumbnailStream = channel.stream_unary(
+            "/thumbnailer.ThumbnailService/GenerateThumbnailStream",
+            request_serializer=thumbnailer__pb2.ThumbnailChunk.SerializeToString,
+            response_deserializer=thumbnailer__pb2.ThumbnailResponse.FromString,
+        )
+        self.GenerateThumbnails = channel.unary_unary(
+            "/thumbnailer.ThumbnailService/GenerateThumbnails",
+            request_serializer=thumbnailer__pb2.BatchThumbnailRequest.SerializeToString,
+            response_deserializer=thumbnailer__pb2.BatchThumbnailResponse.FromString,
+        )
 
 
 class ThumbnailServiceServicer(object):
@@ -29,6 +39,18 @@ class ThumbnailServiceServicer(object):
         context.set_details("Method not implemented!")
         raise NotImplementedError("Method not implemented!")
 
+    def GenerateThumbnailStream(self, request_iterator, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details("Method not implemented!")
+        raise NotImplementedError("Method not implemented!")
+
+    def GenerateThumbnails(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details("Method not implemented!")
+        raise NotImplementedError("Method not implemented!")
+
 
 def add_ThumbnailServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -37,6 +59,16 @@ def add_ThumbnailServiceServicer_to_server(servicer, server):
             request_deserializer=thumbnailer__pb2.ThumbnailRequest.FromString,
             response_serializer=thumbnailer__pb2.ThumbnailResponse.SerializeToString,
         ),
+        "GenerateThumbnailStream": grpc.stream_unary_rpc_method_handler(
+            servicer.GenerateThumbnailStream,
+            request_deserializer=thumbnailer__pb2.ThumbnailChunk.FromString,
+            response_serializer=thumbnailer__pb2.ThumbnailResponse.SerializeToString,
+        ),
+        "GenerateThumbnails": grpc.unary_unary_rpc_method_handler(
+            servicer.GenerateThumbnails,
+            request_deserializer=thumbnailer__pb2.BatchThumbnailRequest.FromString,
+            response_serializer=thumbnailer__pb2.BatchThumbnailResponse.SerializeToString,  # noqa: E501
+        ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
         "thumbnailer.ThumbnailService", rpc_method_handlers
@@ -76,3 +108,61 @@ class ThumbnailService(object):
             timeout,
             metadata,
         )
+
+    @staticmethod
+    def GenerateThumbnailStream(
+        request_iterator,
+        target,
+        options=(),
+        channel_credentials=None,
+        call_credentials=None,
+        insecure=False,
+        compression=None,
+        wait_for_ready=None,
+        timeout=None,
+        metadata=None,
+    ):
+        return grpc.experimental.stream_unary(
+            request_iterator,
+            target,
+            "/thumbnailer.ThumbnailService/GenerateThumbnailStream",
+            thumbnailer__pb2.ThumbnailChunk.SerializeToString,
+            thumbnailer__pb2.ThumbnailResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+        )
+
+    @staticmethod
+    def GenerateThumbnails(
+        request,
+        target,
+        options=(),
+        channel_credentials=None,
+        call_credentials=None,
+        insecure=False,
+        compression=None,
+        wait_for_ready=None,
+        timeout=None,
+        metadata=None,
+    ):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            "/thumbnailer.ThumbnailService/GenerateThumbnails",
+            thumbnailer__pb2.BatchThumbnailRequest.SerializeToString,
+            thumbnailer__pb2.BatchThumbnailResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+        )